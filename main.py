@@ -6,17 +6,40 @@ import os
 import platform
 import sys
 
-from src.config.constants import CLIENT_JAR, LIBRARIES_DIR, ASSETS_DIR
-from src.utils.logging import initialize_logging, log, close_log
-from src.ui.menu import show_menu
-from src.downloader.downloader import set_download_complete
+from src.utils.import_profile import (
+    import_profile_requested,
+    start_import_profile,
+    write_import_profile,
+)
+
+# Diagnóstico de arranque: medir las importaciones antes de cargar el resto
+if import_profile_requested():
+    start_import_profile()
+
+from src.config.constants import LOGS_DIR
+from src.config.settings import get_setting, subscribe
+from src.utils.events import close_events, initialize_events
+from src.utils.logging import initialize_logging, log, close_log, set_log_level
+from src.downloader.install_state import detect_existing_install
 
 
 def main():
     """Función principal que inicia el lanzador"""
+    # Con argumentos se usa la línea de comandos, sin cargar el menú
+    if len(sys.argv) > 1:
+        from src.cli import run_cli
+
+        return run_cli(sys.argv[1:])
+
     try:
         # Inicializar sistema de logging
         log_filename = initialize_logging()
+        set_log_level(get_setting("log_level", "info"))
+        subscribe("log_level", lambda key, value: set_log_level(value))
+
+        # Registro de eventos estructurados (opcional, para telemetría)
+        if get_setting("event_log", False):
+            log(f"Registro de eventos: {initialize_events()}")
 
         # Mostrar información del sistema
         log(f"Sistema: {platform.system()} {platform.release()}")
@@ -24,9 +47,13 @@ def main():
         log(f"Directorio actual: {os.getcwd()}")
 
         # Verificar descarga existente
-        if CLIENT_JAR.exists() and LIBRARIES_DIR.exists() and ASSETS_DIR.exists():
+        if detect_existing_install():
             log("Instalación existente de Minecraft detectada")
-            set_download_complete(True)
+
+        from src.ui.menu import show_menu
+
+        if import_profile_requested():
+            log(f"Perfil de importaciones: {write_import_profile(LOGS_DIR)}")
 
         # Mostrar menú principal
         show_menu()
@@ -35,8 +62,9 @@ def main():
         log(f"Error crítico: {e}", error=True)
     finally:
         log("Aplicación finalizada")
+        close_events()
         close_log()
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""
+Benchmarks de descarga, verificación y lanzamiento contra un CDN local
+"""
+
+from src.bench.runner import print_results, run_benchmarks
+from src.bench.startup import print_startup_results, run_startup_benchmark
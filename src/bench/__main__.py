@@ -0,0 +1,69 @@
+"""
+Ejecuta los benchmarks: python -m src.bench [opciones]
+"""
+
+import argparse
+import json
+import sys
+
+from src.bench.runner import print_results, run_benchmarks
+from src.bench.startup import print_startup_results, run_startup_benchmark
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.bench",
+        description="Benchmarks de LLauncher contra un CDN local sintético",
+    )
+    parser.add_argument(
+        "--workers",
+        default="4,10,32",
+        help="Números de workers a comparar, separados por comas (por defecto: 4,10,32)",
+    )
+    parser.add_argument("--engine", choices=["threads", "async"], default="threads")
+    parser.add_argument("--assets", type=int, default=1000)
+    parser.add_argument("--asset-size", type=int, default=16 * 1024)
+    parser.add_argument("--libraries", type=int, default=40)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--keep", action="store_true", help="Conservar el directorio de trabajo"
+    )
+    parser.add_argument(
+        "--startup",
+        action="store_true",
+        help="Medir solo el arranque (importación de main) en procesos nuevos",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Arranques medidos con --startup"
+    )
+    parser.add_argument("--json", help="Guardar los resultados en este archivo JSON")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        results = run_startup_benchmark(runs=args.runs)
+        if results is None:
+            return 1
+        print_startup_results(results)
+    else:
+        results = run_benchmarks(
+            workers=[int(value) for value in args.workers.split(",")],
+            engine=args.engine,
+            assets=args.assets,
+            asset_size=args.asset_size,
+            libraries=args.libraries,
+            latency_ms=args.latency_ms,
+            error_rate=args.error_rate,
+            seed=args.seed,
+            keep=args.keep,
+        )
+        print_results(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+CDN local para los benchmarks: genera un manifest, un índice de assets, librerías
+y objetos sintéticos y los sirve por HTTP con latencia y errores configurables
+"""
+
+import functools
+import hashlib
+import http.server
+import io
+import json
+import random
+import re
+import threading
+import time
+import zipfile
+
+from src.config.constants import OS_NAME
+
+# Clave de natives del manifest según el sistema operativo
+NATIVE_KEYS = {
+    "windows": "natives-windows",
+    "linux": "natives-linux",
+    "darwin": "natives-osx",
+}
+# Extensión de las librerías nativas incluidas en los JAR de natives
+NATIVE_EXTENSIONS = {"windows": ".dll", "linux": ".so", "darwin": ".dylib"}
+
+
+class MockCDNHandler(http.server.SimpleHTTPRequestHandler):
+    """Sirve el directorio del CDN con soporte de Range, latencia y errores inyectados"""
+
+    latency = 0.0  # Segundos de espera antes de cada respuesta
+    error_rate = 0.0  # Probabilidad de responder 503 con Retry-After
+
+    def log_message(self, format, *args):
+        pass  # Sin registro por petición: solo añadiría ruido a la medición
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+        if self.error_rate and random.random() < self.error_rate:
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        range_header = self.headers.get("Range")
+        path = self.translate_path(self.path)
+        match = re.match(r"bytes=(\d+)-", range_header or "")
+        if not match:
+            return super().do_GET()
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self.send_error(404)
+            return
+
+        start = int(match.group(1))
+        if start >= len(data):
+            self.send_response(416)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(206)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        self.end_headers()
+        self.wfile.write(data[start:])
+
+
+def start_server(root, latency_ms=0, error_rate=0.0):
+    """Arranca el CDN en un puerto libre. Devuelve (servidor, URL base)"""
+    handler = type(
+        "ConfiguredMockCDNHandler",
+        (MockCDNHandler,),
+        {"latency": latency_ms / 1000, "error_rate": error_rate},
+    )
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(handler, directory=str(root))
+    )
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def _write_blob(path, data):
+    """Escribe un archivo del CDN y devuelve (sha1, tamaño)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return hashlib.sha1(data).hexdigest(), len(data)
+
+
+def _make_native_jar(natives, native_size, rng):
+    """Genera el contenido de un JAR de natives con natives librerías del SO actual"""
+    buffer = io.BytesIO()
+    extension = NATIVE_EXTENSIONS.get(OS_NAME, ".so")
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as jar:
+        jar.writestr("META-INF/MANIFEST.MF", "Manifest-Version: 1.0\n")
+        for i in range(natives):
+            jar.writestr(f"libbench{i}{extension}", rng.randbytes(native_size))
+    return buffer.getvalue()
+
+
+def build_dataset(
+    root,
+    base_url,
+    assets=1000,
+    asset_size=16 * 1024,
+    libraries=40,
+    library_size=256 * 1024,
+    natives=8,
+    native_size=128 * 1024,
+    client_size=8 * 1024 * 1024,
+    seed=0,
+):
+    """Genera los archivos sintéticos del CDN y devuelve la URL del manifest"""
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+
+    # Assets con tamaños variados alrededor de asset_size
+    objects = {}
+    for i in range(assets):
+        data = rng.randbytes(rng.randint(asset_size // 4, asset_size * 2))
+        sha1 = hashlib.sha1(data).hexdigest()
+        size = len(data)
+        _write_blob(root / "objects" / sha1[:2] / sha1, data)
+        objects[f"minecraft/textures/block/bench_{i}.png"] = {
+            "hash": sha1,
+            "size": size,
+        }
+
+    index_data = json.dumps({"objects": objects}).encode()
+    index_sha1, index_size = _write_blob(root / "indexes" / "bench.json", index_data)
+
+    # Librerías normales y un JAR de natives para el SO actual
+    library_entries = []
+    for i in range(libraries):
+        lib_path = f"bench/lib{i}/1.0/lib{i}-1.0.jar"
+        sha1, size = _write_blob(
+            root / "libraries" / lib_path, rng.randbytes(library_size)
+        )
+        library_entries.append(
+            {
+                "name": f"bench:lib{i}:1.0",
+                "downloads": {
+                    "artifact": {
+                        "path": lib_path,
+                        "url": f"{base_url}/libraries/{lib_path}",
+                        "sha1": sha1,
+                        "size": size,
+                    }
+                },
+            }
+        )
+
+    native_key = NATIVE_KEYS.get(OS_NAME)
+    if native_key and natives:
+        native_path = f"bench/natives/1.0/natives-1.0-{native_key}.jar"
+        sha1, size = _write_blob(
+            root / "libraries" / native_path,
+            _make_native_jar(natives, native_size, rng),
+        )
+        library_entries.append(
+            {
+                "name": "bench:natives:1.0",
+                "downloads": {
+                    "classifiers": {
+                        native_key: {
+                            "path": native_path,
+                            "url": f"{base_url}/libraries/{native_path}",
+                            "sha1": sha1,
+                            "size": size,
+                        }
+                    }
+                },
+            }
+        )
+
+    client_sha1, client_size = _write_blob(
+        root / "client.jar", rng.randbytes(client_size)
+    )
+
+    manifest = {
+        "id": "bench",
+        "assetIndex": {
+            "id": "bench",
+            "url": f"{base_url}/indexes/bench.json",
+            "sha1": index_sha1,
+            "size": index_size,
+        },
+        "downloads": {
+            "client": {
+                "url": f"{base_url}/client.jar",
+                "sha1": client_sha1,
+                "size": client_size,
+            }
+        },
+        "libraries": library_entries,
+    }
+    (root / "manifest.json").write_text(json.dumps(manifest))
+    return f"{base_url}/manifest.json"
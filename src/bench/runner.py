@@ -0,0 +1,184 @@
+"""
+Orquestador de los benchmarks: prepara el CDN local y lanza una instalación aislada
+por cada número de workers a comparar
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from src.bench.mock_cdn import build_dataset, start_server
+from src.config.constants import CONFIG_FILE
+from src.utils.logging import log
+
+# Raíz del proyecto (para que el proceso hijo encuentre el paquete src)
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+# Tiempo máximo de cada instalación medida
+RUN_TIMEOUT = 1800
+
+
+def _run_worker(run_dir, env, micro):
+    """Ejecuta una instalación medida en un proceso aislado y devuelve sus resultados"""
+    result_file = run_dir / "result.json"
+    command = [sys.executable, "-m", "src.bench.worker", str(result_file)]
+    if micro:
+        command.append("--micro")
+
+    with open(run_dir / "bench.log", "w") as output:
+        process = subprocess.run(
+            command,
+            cwd=run_dir,
+            env=env,
+            stdout=output,
+            stderr=subprocess.STDOUT,
+            timeout=RUN_TIMEOUT,
+        )
+
+    if process.returncode != 0 or not result_file.exists():
+        log(f"El benchmark falló, revisa {run_dir / 'bench.log'}", error=True)
+        return None
+    with open(result_file, "r") as f:
+        return json.load(f)
+
+
+def run_benchmarks(
+    workers=(4, 10, 32),
+    engine="threads",
+    assets=1000,
+    asset_size=16 * 1024,
+    libraries=40,
+    latency_ms=0,
+    error_rate=0.0,
+    seed=0,
+    keep=False,
+):
+    """Mide la instalación completa para cada número de workers contra un CDN local"""
+    work_dir = Path(tempfile.mkdtemp(prefix="llauncher_bench_"))
+    results = {
+        "config": {
+            "engine": engine,
+            "assets": assets,
+            "asset_size": asset_size,
+            "libraries": libraries,
+            "latency_ms": latency_ms,
+            "error_rate": error_rate,
+            "seed": seed,
+        },
+        "download": [],
+    }
+
+    server, base_url = start_server(work_dir / "cdn", latency_ms, error_rate)
+    try:
+        log(f"Generando datos sintéticos del CDN en {work_dir}...")
+        manifest_url = build_dataset(
+            work_dir / "cdn",
+            base_url,
+            assets=assets,
+            asset_size=asset_size,
+            libraries=libraries,
+            seed=seed,
+        )
+
+        for i, max_workers in enumerate(workers):
+            log(f"Midiendo instalación con {max_workers} workers ({engine})...")
+            run_dir = work_dir / f"run_{max_workers}"
+            config_file = run_dir / CONFIG_FILE
+            config_file.parent.mkdir(parents=True, exist_ok=True)
+            config_file.write_text(
+                json.dumps(
+                    {
+                        "max_workers": max_workers,
+                        "download_engine": engine,
+                        "async_concurrency": max_workers,
+                        "shared_store": False,
+                        "log_level": "error",
+                    }
+                )
+            )
+
+            env = dict(os.environ)
+            env.update(
+                {
+                    "PYTHONPATH": str(PROJECT_ROOT),
+                    "LLAUNCHER_MANIFEST_URL": manifest_url,
+                    "LLAUNCHER_RESOURCES_URL": f"{base_url}/objects",
+                    "LLAUNCHER_STORE": str(run_dir / "store"),
+                }
+            )
+
+            # Las mediciones de verificación, extracción y classpath solo una vez
+            run = _run_worker(run_dir, env, micro=i == 0)
+            if run is None:
+                results["download"].append({"workers": max_workers, "ok": False})
+                continue
+            results["download"].append({"workers": max_workers, **run["download"]})
+            for key in ("verify", "extract", "classpath"):
+                if key in run:
+                    results[key] = run[key]
+    finally:
+        server.shutdown()
+        server.server_close()
+        if not keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+def print_results(results):
+    """Muestra los resultados de los benchmarks en tablas"""
+    console = Console()
+    config = results["config"]
+
+    table = Table(
+        title=f"Instalación ({config['engine']}, {config['assets']} assets, "
+        f"{config['latency_ms']} ms de latencia, {config['error_rate']:.0%} errores)"
+    )
+    for column in [
+        "Workers",
+        "Frío (s)",
+        "Caliente (s)",
+        "Archivos",
+        "MB",
+        "MB/s",
+        "OK",
+    ]:
+        table.add_column(column, justify="right")
+    for run in results["download"]:
+        if "cold_s" not in run:
+            table.add_row(str(run["workers"]), "-", "-", "-", "-", "-", "✗")
+            continue
+        table.add_row(
+            str(run["workers"]),
+            f"{run['cold_s']:.2f}",
+            f"{run['warm_s']:.2f}",
+            str(run["files"]),
+            f"{run['bytes'] / 1048576:.1f}",
+            f"{run['mb_per_s']:.1f}",
+            "✓" if run["ok"] else "✗",
+        )
+    console.print(table)
+
+    if "verify" in results:
+        verify = results["verify"]
+        console.print(
+            f"Verificación: {verify['hash_mb_per_s']} MB/s calculando SHA1, "
+            f"{verify['indexed_files_per_s']} archivos/s con el índice"
+        )
+    if "extract" in results:
+        extract = results["extract"]
+        console.print(
+            f"Extracción de natives: {extract['ms_per_round']} ms ({extract['jars']} JAR)"
+        )
+    if "classpath" in results:
+        classpath = results["classpath"]
+        console.print(
+            f"Classpath: {classpath['ms_per_call']} ms por llamada "
+            f"({classpath['libraries']} librerías)"
+        )
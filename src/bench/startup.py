@@ -0,0 +1,103 @@
+"""
+Benchmark de arranque: importa main en procesos nuevos y resume el tiempo total y
+los módulos más lentos según el perfil de importaciones
+"""
+
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from src.bench.runner import PROJECT_ROOT
+from src.utils.logging import log
+
+# Arranques medidos y módulos más lentos a mostrar
+STARTUP_RUNS = 5
+TOP_MODULES = 15
+RUN_TIMEOUT = 120
+
+
+def _profile_startup(work_dir, run):
+    """Importa main en un proceso nuevo y devuelve su perfil de importaciones"""
+    result_file = work_dir / f"imports_{run}.json"
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(PROJECT_ROOT)
+    env.pop("LLAUNCHER_IMPORT_PROFILE", None)
+
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "src.utils.import_profile",
+            "main",
+            "--json",
+            str(result_file),
+        ],
+        cwd=work_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=RUN_TIMEOUT,
+    )
+    if process.returncode != 0 or not result_file.exists():
+        log(f"Error al medir el arranque: {process.stderr.strip()}", error=True)
+        return None
+    with open(result_file, "r") as f:
+        return json.load(f)
+
+
+def run_startup_benchmark(runs=STARTUP_RUNS, top=TOP_MODULES):
+    """Mide el tiempo de importación de main en runs procesos nuevos"""
+    work_dir = Path(tempfile.mkdtemp(prefix="llauncher_startup_"))
+    try:
+        profiles = [_profile_startup(work_dir, run) for run in range(runs)]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    profiles = [profile for profile in profiles if profile is not None]
+    if not profiles:
+        return None
+
+    # Módulos más lentos (mediana del acumulado entre todos los arranques)
+    cumulative = {}
+    for profile in profiles:
+        for name, _, cumulative_us, _ in profile["modules"]:
+            cumulative.setdefault(name, []).append(cumulative_us)
+    slowest = sorted(
+        ((name, statistics.median(values)) for name, values in cumulative.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:top]
+
+    times = [profile["import_ms"] for profile in profiles]
+    return {
+        "runs": len(profiles),
+        "median_ms": round(statistics.median(times), 1),
+        "min_ms": round(min(times), 1),
+        "modules": len(profiles[-1]["modules"]),
+        "slowest": [[name, round(us / 1000, 1)] for name, us in slowest],
+    }
+
+
+def print_startup_results(results):
+    """Muestra los resultados del benchmark de arranque"""
+    console = Console()
+    console.print(
+        f"Arranque (import main): {results['median_ms']} ms de mediana, "
+        f"{results['min_ms']} ms mínimo, {results['modules']} módulos "
+        f"({results['runs']} procesos)"
+    )
+
+    table = Table(title="Importaciones más lentas (acumulado)")
+    table.add_column("Módulo")
+    table.add_column("ms", justify="right")
+    for name, ms in results["slowest"]:
+        table.add_row(name, f"{ms:.1f}")
+    console.print(table)
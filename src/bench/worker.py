@@ -0,0 +1,122 @@
+"""
+Proceso hijo de los benchmarks: instala contra el CDN local (desde el directorio de
+trabajo actual) y mide cada etapa, escribiendo los resultados en un JSON
+"""
+
+import argparse
+import json
+import time
+
+from src.config.constants import ASSETS_DIR, LIBRARIES_DIR
+from src.config.game_version import manifest_path
+from src.downloader import downloader
+from src.downloader.natives import extract_natives
+from src.downloader.progress import get_progress
+from src.downloader.verifier import compute_sha1, set_deep_verify, verify_file_hash
+from src.launcher.game_launcher import get_required_libraries
+
+# Repeticiones de las mediciones más rápidas para obtener tiempos estables
+EXTRACT_ROUNDS = 5
+CLASSPATH_ROUNDS = 200
+
+
+def bench_download():
+    """Instalación completa en frío y repetida en caliente (todo ya presente)"""
+    start = time.perf_counter()
+    ok = downloader.download_minecraft(progress="none")
+    cold = time.perf_counter() - start
+    stats = get_progress()
+    files = stats["files"]
+    transferred = stats["bytes"]
+
+    start = time.perf_counter()
+    warm_ok = downloader.download_minecraft(progress="none")
+    warm = time.perf_counter() - start
+
+    return {
+        "ok": bool(ok and warm_ok),
+        "cold_s": round(cold, 3),
+        "warm_s": round(warm, 3),
+        "files": files,
+        "bytes": transferred,
+        "mb_per_s": round(transferred / 1048576 / cold, 2) if cold else 0,
+    }
+
+
+def bench_verify():
+    """Rendimiento del hash SHA1 (sin índice) y de la verificación con índice"""
+    objects = [path for path in (ASSETS_DIR / "objects").rglob("*") if path.is_file()]
+    total = sum(path.stat().st_size for path in objects)
+
+    start = time.perf_counter()
+    for path in objects:
+        compute_sha1(path)
+    hashing = time.perf_counter() - start
+
+    set_deep_verify(False)
+    start = time.perf_counter()
+    for path in objects:
+        verify_file_hash(path, path.name)
+    indexed = time.perf_counter() - start
+
+    return {
+        "files": len(objects),
+        "bytes": total,
+        "hash_mb_per_s": round(total / 1048576 / hashing, 2) if hashing else 0,
+        "indexed_files_per_s": round(len(objects) / indexed) if indexed else 0,
+    }
+
+
+def bench_extract():
+    """Tiempo medio de extracción de los JAR de natives"""
+    jars = [path for path in LIBRARIES_DIR.rglob("*.jar") if "natives" in path.name]
+    start = time.perf_counter()
+    for _ in range(EXTRACT_ROUNDS):
+        for jar in jars:
+            extract_natives(jar)
+    elapsed = time.perf_counter() - start
+    return {
+        "jars": len(jars),
+        "ms_per_round": round(elapsed * 1000 / EXTRACT_ROUNDS, 2),
+    }
+
+
+def bench_classpath():
+    """Tiempo medio de construcción de la lista de librerías del classpath"""
+    with open(manifest_path(), "r") as f:
+        manifest = json.load(f)
+
+    start = time.perf_counter()
+    for _ in range(CLASSPATH_ROUNDS):
+        libraries = get_required_libraries(manifest)
+    elapsed = time.perf_counter() - start
+    return {
+        "libraries": len(libraries),
+        "ms_per_call": round(elapsed * 1000 / CLASSPATH_ROUNDS, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Proceso de medición de benchmarks")
+    parser.add_argument(
+        "result_file", help="Archivo JSON donde escribir los resultados"
+    )
+    parser.add_argument(
+        "--micro",
+        action="store_true",
+        help="Medir también verificación, extracción y classpath",
+    )
+    args = parser.parse_args()
+
+    results = {"download": bench_download()}
+    if args.micro:
+        results["verify"] = bench_verify()
+        results["extract"] = bench_extract()
+        results["classpath"] = bench_classpath()
+
+    with open(args.result_file, "w") as f:
+        json.dump(results, f)
+
+
+if __name__ == "__main__":
+    main()
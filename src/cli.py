@@ -0,0 +1,332 @@
+"""
+Interfaz de línea de comandos sin menú, para instalar, comprobar y lanzar el juego
+desde scripts: códigos de salida estables y salida en texto o JSON (un evento por línea)
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from src.config.game_version import get_game_version, installed_versions, manifest_path
+from src.config.settings import get_setting, update_settings
+from src.downloader.install_state import detect_existing_install, is_download_complete
+from src.utils.events import close_events, initialize_events
+from src.utils.logging import initialize_logging, log, set_log_level
+
+# Códigos de salida
+EXIT_OK = 0
+EXIT_ERROR = 1  # Error inesperado o la operación falló
+EXIT_USAGE = 2  # Argumentos incorrectos (argparse)
+EXIT_INCOMPLETE = 3  # Instalación incompleta o archivos que faltan o están dañados
+EXIT_NOT_INSTALLED = 4  # No hay una instalación sobre la que actuar
+EXIT_NO_JAVA = 5  # No hay un Java funcional para lanzar el juego
+
+# Archivos con problemas que se listan en la salida de texto de verify
+MAX_LISTED_PROBLEMS = 20
+
+# En modo JSON, stdout original (el resto de la salida se desvía a stderr)
+_json_output = None
+
+
+def _emit(event, **fields):
+    """Escribe un evento: una línea JSON en modo JSON o una línea de texto"""
+    if _json_output is not None:
+        _json_output.write(json.dumps({"event": event, **fields}) + "\n")
+        _json_output.flush()
+        return
+
+    details = ", ".join(
+        f"{key}={value}"
+        for key, value in fields.items()
+        if not isinstance(value, (list, dict))
+    )
+    print(f"[{event}] {details}", flush=True)
+
+
+def _run_download(deep_verify=None):
+    """Descarga o completa la instalación, informando del progreso"""
+    # Importación diferida: la pila de descargas solo se carga si hace falta
+    from src.downloader.downloader import download_minecraft
+    from src.downloader.progress import (
+        JsonProgressSink,
+        PlainProgressSink,
+        get_progress,
+    )
+
+    # Progreso como eventos JSON o como líneas de texto (sin animaciones)
+    if _json_output is not None:
+        sink = JsonProgressSink(_json_output)
+    else:
+        sink = PlainProgressSink()
+    ok = download_minecraft(deep_verify=deep_verify, progress=sink)
+
+    stats = get_progress()
+    result = {"files": stats["files"], "bytes": stats["bytes"]}
+    return (EXIT_OK if ok else EXIT_INCOMPLETE), result
+
+
+def _select_version(version):
+    """Guarda version como la versión activa ("latest" y "snapshot" se resuelven)"""
+    from src.downloader.versions import resolve_version_id
+
+    version_id = resolve_version_id(version)
+    if version_id is None:
+        raise ValueError(f"No se pudo resolver la versión '{version}'")
+    update_settings({"game_version": version_id})
+    detect_existing_install()
+    return version_id
+
+
+def cmd_install(args):
+    """Instala o completa la instalación"""
+    # Las opciones indicadas se guardan en la configuración, como desde el menú
+    changes = {
+        key: value
+        for key, value in (
+            ("graphics_quality", args.quality),
+            ("max_workers", args.workers),
+            ("download_engine", args.engine),
+        )
+        if value is not None
+    }
+    if changes:
+        update_settings(changes)
+    return _run_download(deep_verify=True if args.deep else None)
+
+
+def cmd_repair(args):
+    """Recalcula el hash de todo y vuelve a descargar lo que falte o esté dañado"""
+    # Basta con que exista el manifest: lo demás es lo que se repara
+    if not manifest_path().exists():
+        return EXIT_NOT_INSTALLED, {}
+    return _run_download(deep_verify=True)
+
+
+def cmd_verify(args):
+    """Comprueba la instalación sin descargar ni modificar nada"""
+    from src.downloader.integrity import check_installation
+
+    checked = check_installation(deep=args.deep)
+    if checked is None:
+        return EXIT_NOT_INSTALLED, {}
+
+    total, problems = checked
+    if _json_output is None:
+        for path in problems[:MAX_LISTED_PROBLEMS]:
+            print(f"✗ {path}")
+        if len(problems) > MAX_LISTED_PROBLEMS:
+            print(f"... y {len(problems) - MAX_LISTED_PROBLEMS} más")
+    result = {"checked": total, "problem_count": len(problems), "problems": problems}
+    return (EXIT_INCOMPLETE if problems else EXIT_OK), result
+
+
+def cmd_launch(args):
+    """Lanza el juego y espera a que termine"""
+    from src.launcher.game_launcher import launch_minecraft
+    from src.launcher.launch_profile import load_launch_profile, refresh_launch_profile
+
+    if not is_download_complete():
+        return EXIT_NOT_INSTALLED, {}
+    # Comprobar el mismo Java que se lanzará: el del perfil, elegido según la
+    # versión mayor que pide el manifest (refresh lo guarda para launch_minecraft)
+    profile = load_launch_profile() or refresh_launch_profile()
+    if profile["java_version"] is None:
+        return EXIT_NO_JAVA, {"java_path": profile["java_path"]}
+
+    username = args.username or get_setting("username", "Player")
+    ok = launch_minecraft(username)
+    return (EXIT_OK if ok else EXIT_ERROR), {"username": username}
+
+
+def cmd_prune(args):
+    """Libera los objetos del almacén compartido que ya no usa ninguna instalación"""
+    from src.downloader.object_store import prune_store
+
+    removed, freed = prune_store()
+    return EXIT_OK, {"removed": removed, "freed_bytes": freed}
+
+
+def cmd_versions(args):
+    """Lista las versiones instaladas y, con --available, las publicadas por Mojang"""
+    active = get_game_version()
+    installed = installed_versions()
+    result = {"active": active, "installed": installed}
+    if _json_output is None:
+        for version in installed:
+            print(f"{'*' if version == active else ' '} {version}")
+
+    if args.available:
+        from src.downloader.versions import list_versions
+
+        available = [entry["id"] for entry in list_versions(args.type)]
+        if not available:
+            return EXIT_ERROR, result
+        result["available"] = available
+        if _json_output is None:
+            print(f"Publicadas ({args.type}): {', '.join(available)}")
+    return EXIT_OK, result
+
+
+def cmd_bench(args):
+    """Ejecuta los benchmarks (mismas opciones que python -m src.bench)"""
+    from src.bench.__main__ import main as bench_main
+
+    return (bench_main(args.bench_args) or EXIT_OK), {}
+
+
+def _build_parser():
+    """Parser con un subcomando por operación"""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--json",
+        action="store_true",
+        help="Salida como eventos JSON, uno por línea (los logs van a stderr)",
+    )
+    common.add_argument(
+        "--quiet", action="store_true", help="Mostrar solo los errores del log"
+    )
+    # Opción de los subcomandos que actúan sobre una versión concreta
+    versioned = argparse.ArgumentParser(add_help=False)
+    versioned.add_argument(
+        "--version",
+        help="Versión del juego, 'latest' o 'snapshot' (se guarda como la activa)",
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="llauncher",
+        description="LLauncher sin menú interactivo. Códigos de salida: 0 correcto, "
+        "1 error, 2 argumentos incorrectos, 3 instalación incompleta o dañada, "
+        "4 sin instalación, 5 sin Java",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    install = subparsers.add_parser(
+        "install",
+        parents=[common, versioned],
+        help="Instalar o completar la instalación",
+    )
+    install.add_argument("--quality", help="Perfil de calidad gráfica (se guarda)")
+    install.add_argument("--workers", type=int, help="Descargas paralelas (se guarda)")
+    install.add_argument(
+        "--engine", choices=["threads", "async"], help="Motor de descarga (se guarda)"
+    )
+    install.add_argument(
+        "--deep", action="store_true", help="Recalcular el hash de todos los archivos"
+    )
+    install.set_defaults(handler=cmd_install)
+
+    repair = subparsers.add_parser(
+        "repair",
+        parents=[common, versioned],
+        help="Volver a descargar lo que falte o esté dañado",
+    )
+    repair.set_defaults(handler=cmd_repair)
+
+    verify = subparsers.add_parser(
+        "verify",
+        parents=[common, versioned],
+        help="Comprobar la instalación sin descargar nada",
+    )
+    verify.add_argument(
+        "--deep",
+        action="store_true",
+        help="Recalcular el hash de todos los archivos (sin usar el índice)",
+    )
+    verify.set_defaults(handler=cmd_verify)
+
+    launch = subparsers.add_parser(
+        "launch",
+        parents=[common, versioned],
+        help="Lanzar el juego y esperar a que termine",
+    )
+    launch.add_argument(
+        "--username", help="Nombre de usuario (por defecto el guardado)"
+    )
+    launch.set_defaults(handler=cmd_launch)
+
+    prune = subparsers.add_parser(
+        "prune", parents=[common], help="Liberar objetos compartidos sin uso"
+    )
+    prune.set_defaults(handler=cmd_prune)
+
+    versions = subparsers.add_parser(
+        "versions", parents=[common], help="Listar las versiones instaladas"
+    )
+    versions.add_argument(
+        "--available",
+        action="store_true",
+        help="Listar también las versiones publicadas por Mojang",
+    )
+    versions.add_argument(
+        "--type",
+        default="release",
+        choices=["release", "snapshot", "old_beta", "old_alpha", "all"],
+        help="Tipo de las versiones publicadas a listar",
+    )
+    versions.set_defaults(handler=cmd_versions)
+
+    bench = subparsers.add_parser(
+        "bench", parents=[common], help="Ejecutar los benchmarks"
+    )
+    bench.add_argument(
+        "bench_args", nargs=argparse.REMAINDER, help="Opciones de python -m src.bench"
+    )
+    bench.set_defaults(handler=cmd_bench)
+
+    return parser
+
+
+def run_cli(argv=None):
+    """Ejecuta un subcomando y devuelve su código de salida"""
+    global _json_output
+
+    args = _build_parser().parse_args(argv)
+
+    # En modo JSON, stdout queda reservado para los eventos
+    stdout = sys.stdout
+    if args.json:
+        _json_output = stdout
+        sys.stdout = sys.stderr
+
+    try:
+        return _run_command(args)
+    finally:
+        # Quien llame a run_cli (main.py, pruebas...) recupera su stdout
+        sys.stdout = stdout
+        _json_output = None
+
+
+def _run_command(args):
+    """Prepara el registro, ejecuta el subcomando y emite el evento de resultado"""
+    initialize_logging()
+    set_log_level("error" if args.quiet else get_setting("log_level", "info"))
+    if get_setting("event_log", False):
+        initialize_events()
+    detect_existing_install()
+
+    start = time.perf_counter()
+    try:
+        if getattr(args, "version", None):
+            _select_version(args.version)
+        exit_code, result = args.handler(args)
+    except Exception as e:
+        log(f"Error al ejecutar {args.command}: {e}", error=True)
+        exit_code, result = EXIT_ERROR, {"error": str(e)}
+    finally:
+        close_events()
+
+    _emit(
+        "result",
+        command=args.command,
+        game_version=get_game_version(),
+        ok=exit_code == EXIT_OK,
+        exit_code=exit_code,
+        duration_s=round(time.perf_counter() - start, 3),
+        **result,
+    )
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(run_cli())
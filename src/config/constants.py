@@ -1,20 +1,38 @@
+import os
 import platform
 from pathlib import Path
 
 # Configuraciones iniciales
-MANIFEST_FILE = "1.21.5.json"
-MANIFEST_URL = "https://piston-meta.mojang.com/v1/packages/a0645da8cf4e89da6baaab8e08b7ca64b7f4b0cf/1.21.5.json"
+DEFAULT_GAME_VERSION = "1.21.5"
+# Las URLs se pueden redirigir (p. ej. a un CDN local para los benchmarks)
+VERSION_MANIFEST_URL = os.environ.get(
+    "LLAUNCHER_VERSION_MANIFEST_URL",
+    "https://piston-meta.mojang.com/mc/game/version_manifest_v2.json",
+)
+# Manifest fijo para cualquier versión (sin consultar la lista de versiones)
+MANIFEST_URL = os.environ.get("LLAUNCHER_MANIFEST_URL")
+RESOURCES_URL = os.environ.get(
+    "LLAUNCHER_RESOURCES_URL", "https://resources.download.minecraft.net"
+)
 BASE_DIR = Path("llauncher")
 GAME_DIR = BASE_DIR / Path(".minecraft")
-MANIFEST_DIR = GAME_DIR / "manifest"
-MANIFEST_JSON = MANIFEST_DIR / MANIFEST_FILE
+# Librerías y assets se comparten entre versiones; el resto va en versions/<versión>
 LIBRARIES_DIR = GAME_DIR / "libraries"
 ASSETS_DIR = GAME_DIR / "assets"
-NATIVES_DIR = GAME_DIR / "natives"
-CLIENT_JAR = GAME_DIR / "client.jar"
+VERSIONS_DIR = GAME_DIR / "versions"
 LOGS_DIR = BASE_DIR / "ll_logs"
 CONFIG_DIR = BASE_DIR / "config"
 CONFIG_FILE = CONFIG_DIR / "settings.json"
+QUALITY_PROFILES_FILE = CONFIG_DIR / "quality_profiles.json"
+CACHE_DIR = BASE_DIR / "cache"
+VERIFY_INDEX_FILE = CACHE_DIR / "verify_index.json"
+JAVA_RUNTIMES_FILE = CACHE_DIR / "java_runtimes.json"
+VERSION_MANIFEST_FILE = CACHE_DIR / "version_manifest_v2.json"
+
+# Almacén de objetos compartido (por SHA1) entre todas las instalaciones del usuario
+SHARED_STORE_DIR = Path(
+    os.environ.get("LLAUNCHER_STORE", Path.home() / ".llauncher" / "objects")
+)
 
 # Configuración de descargas paralelas
 MAX_WORKERS = 10  # Número máximo de descargas simultáneas
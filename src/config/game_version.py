@@ -0,0 +1,55 @@
+"""
+Versión del juego seleccionada y rutas propias de cada versión instalada (las
+librerías y los assets son comunes a todas)
+"""
+
+from src.config.constants import DEFAULT_GAME_VERSION, VERSIONS_DIR
+from src.config.settings import get_setting
+
+
+def get_game_version():
+    """Versión del juego seleccionada en la configuración"""
+    return get_setting("game_version", DEFAULT_GAME_VERSION) or DEFAULT_GAME_VERSION
+
+
+def version_dir(version=None):
+    """Carpeta de una versión (la seleccionada si no se indica)"""
+    return VERSIONS_DIR / (version or get_game_version())
+
+
+def manifest_path(version=None):
+    """Manifest de una versión: versions/<versión>/<versión>.json"""
+    version = version or get_game_version()
+    return version_dir(version) / f"{version}.json"
+
+
+def client_jar_path(version=None):
+    """client.jar de una versión: versions/<versión>/<versión>.jar"""
+    version = version or get_game_version()
+    return version_dir(version) / f"{version}.jar"
+
+
+def natives_dir(version=None):
+    """Natives extraídas para una versión"""
+    return version_dir(version) / "natives"
+
+
+def install_plan_path(version=None):
+    """Plan de la última instalación completada de una versión"""
+    return version_dir(version) / "install_plan.json"
+
+
+def launch_profile_path(version=None):
+    """Perfil de lanzamiento precalculado de una versión"""
+    return version_dir(version) / "launch_profile.json"
+
+
+def installed_versions():
+    """Versiones con manifest y client.jar en disco, ordenadas por nombre"""
+    if not VERSIONS_DIR.is_dir():
+        return []
+    return sorted(
+        path.name
+        for path in VERSIONS_DIR.iterdir()
+        if manifest_path(path.name).exists() and client_jar_path(path.name).exists()
+    )
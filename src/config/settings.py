@@ -1,12 +1,15 @@
+import contextlib
 import json
 import os
+import threading
 from pathlib import Path
 
-from src.config.constants import CONFIG_DIR, CONFIG_FILE
+from src.config.constants import CONFIG_DIR, CONFIG_FILE, DEFAULT_GAME_VERSION
 from src.utils.logging import log
 
 # Valores predeterminados de configuración
 DEFAULT_SETTINGS = {
+    "game_version": DEFAULT_GAME_VERSION,  # Versión del juego que se instala y se lanza
     "max_workers": 10,
     "theme": "default",
     "logs_to_keep": 20,
@@ -14,23 +17,49 @@ DEFAULT_SETTINGS = {
     "graphics_quality": "high",
     "memory_mb": 2048,
     "java_path": "java",  # Por defecto usamos el comando 'java' del PATH
+    "connect_timeout": 10,  # Segundos para establecer la conexión HTTP
+    "read_timeout": 30,  # Segundos máximos de espera entre datos recibidos
+    "download_engine": "threads",  # threads (ThreadPoolExecutor) o async (asyncio)
+    "async_concurrency": 128,  # Descargas simultáneas del motor asíncrono
+    "async_per_host": 32,  # Conexiones simultáneas por host del motor asíncrono
+    "max_bandwidth_kbps": 0,  # Límite global de descarga en KB/s (0 = sin límite)
+    "max_per_host": 0,  # Conexiones simultáneas por host (0 = sin límite)
+    "max_retries": 3,  # Reintentos con backoff de cada descarga fallida
+    "deep_verify": False,  # Recalcular el hash de todos los archivos ignorando el índice
+    "shared_store": True,  # Compartir archivos entre instalaciones (enlaces duros por SHA1)
+    "disk_space_policy": "abort",  # Sin espacio suficiente: abort, warn u off
+    "log_level": "info",  # Nivel mínimo del log: debug, info o error
+    "event_log": False,  # Registrar eventos estructurados (JSONL) en ll_events_*.jsonl
+    "progress_display": "rich",  # Progreso de las descargas: rich, plain, json o none
 }
 
 
+# Caché en memoria de la configuración (se invalida si cambia el mtime del archivo)
+_settings_cache = None
+_settings_mtime = None
+_settings_lock = threading.RLock()
+# Serializa las escrituras (leer, combinar y guardar) sin bloquear a los lectores
+_save_lock = threading.RLock()
+
+# Cambios pendientes de un settings_batch() (por hilo) y suscriptores por clave
+_batch_state = threading.local()
+_subscribers = {}
+
+
 def ensure_config_dir():
     """Asegura que el directorio de configuración exista"""
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def load_settings():
-    """Carga la configuración del archivo. Si no existe, crea un archivo con valores predeterminados."""
+def _read_settings_file():
+    """Lee la configuración del archivo. Si no existe, crea un archivo con valores predeterminados."""
     ensure_config_dir()
 
     if not CONFIG_FILE.exists():
         log(
             "Archivo de configuración no encontrado. Creando uno con valores predeterminados."
         )
-        save_settings(DEFAULT_SETTINGS)
+        _write_settings_file(dict(DEFAULT_SETTINGS))
         return DEFAULT_SETTINGS.copy()
 
     try:
@@ -46,23 +75,74 @@ def load_settings():
     except json.JSONDecodeError as e:
         log(f"Error de formato en el archivo de configuración: {e}", error=True)
         log("Restaurando valores predeterminados")
-        save_settings(DEFAULT_SETTINGS)
+        _write_settings_file(dict(DEFAULT_SETTINGS))
         return DEFAULT_SETTINGS.copy()
     except IOError as e:
         log(f"Error al leer el archivo de configuración: {e}", error=True)
         log("Restaurando valores predeterminados")
-        save_settings(DEFAULT_SETTINGS)
+        _write_settings_file(dict(DEFAULT_SETTINGS))
         return DEFAULT_SETTINGS.copy()
     except Exception as e:
         # Mantener un catch-all como última opción, pero con mensajes más descriptivos
-        log(f"Error inesperado al cargar la configuración: {e.__class__.__name__}: {e}", error=True)
+        log(
+            f"Error inesperado al cargar la configuración: {e.__class__.__name__}: {e}",
+            error=True,
+        )
         log("Restaurando valores predeterminados por seguridad")
-        save_settings(DEFAULT_SETTINGS)
+        _write_settings_file(dict(DEFAULT_SETTINGS))
         return DEFAULT_SETTINGS.copy()
 
 
-def save_settings(settings):
-    """Guarda la configuración en el archivo"""
+def _config_mtime():
+    """mtime del archivo de configuración (None si no existe)"""
+    try:
+        return CONFIG_FILE.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _replace_cache(settings):
+    """Sustituye la caché y devuelve las claves cuyo valor ha cambiado"""
+    global _settings_cache, _settings_mtime
+
+    old = _settings_cache
+    _settings_cache = dict(settings)
+    _settings_mtime = _config_mtime()
+    if old is None:
+        return []  # Primera carga: no hay cambios que notificar
+    return [key for key in _settings_cache if old.get(key) != _settings_cache[key]]
+
+
+def _notify(changed_keys):
+    """Avisa a los suscriptores de las claves que han cambiado"""
+    for key in changed_keys:
+        value = _settings_cache.get(key)
+        for callback in list(_subscribers.get(key, [])):
+            try:
+                callback(key, value)
+            except Exception as e:
+                log(f"Error en el suscriptor de '{key}': {e}", error=True)
+
+
+def _cached_settings():
+    """Devuelve la caché, recargándola solo si el archivo ha cambiado en disco"""
+    with _settings_lock:
+        if _settings_cache is None or _config_mtime() != _settings_mtime:
+            changed = _replace_cache(_read_settings_file())
+        else:
+            changed = []
+        settings = _settings_cache
+    _notify(changed)
+    return settings
+
+
+def load_settings():
+    """Carga la configuración (desde la caché si el archivo no ha cambiado)"""
+    return dict(_cached_settings())
+
+
+def _write_settings_file(settings):
+    """Escribe la configuración en el archivo (sin tocar la caché). Devuelve si se guardó"""
     ensure_config_dir()
 
     try:
@@ -70,35 +150,102 @@ def save_settings(settings):
         for key, default_value in DEFAULT_SETTINGS.items():
             if key not in settings:
                 settings[key] = default_value
-                
+
         # Guardar de manera segura usando escritura atómica
-        temp_file = CONFIG_FILE.with_suffix('.tmp')
+        temp_file = CONFIG_FILE.with_suffix(".tmp")
         with open(temp_file, "w", encoding="utf-8") as f:
             json.dump(settings, f, indent=4)
             f.flush()
             os.fsync(f.fileno())  # Asegurarse de que se escriban los datos
-            
+
         # Renombrar es atómico en la mayoría de sistemas de archivos
         temp_file.replace(CONFIG_FILE)
-        
+
         log("Configuración guardada correctamente")
         return True
     except IOError as e:
         log(f"Error de E/S al guardar la configuración: {e}", error=True)
         return False
     except Exception as e:
-        log(f"Error inesperado al guardar configuración: {e.__class__.__name__}: {e}", error=True)
+        log(
+            f"Error inesperado al guardar configuración: {e.__class__.__name__}: {e}",
+            error=True,
+        )
         return False
 
 
+def _store_settings(settings):
+    """Guarda y actualiza la caché. Devuelve (guardado, claves cambiadas). Requiere _save_lock"""
+    if not _write_settings_file(settings):
+        return False, []
+    with _settings_lock:
+        return True, _replace_cache(settings)
+
+
+def save_settings(settings):
+    """Guarda la configuración en el archivo"""
+    with _save_lock:
+        saved, changed = _store_settings(settings)
+    # Los suscriptores se avisan sin locks: pueden leer la configuración desde otro hilo
+    _notify(changed)
+    return saved
+
+
 def get_setting(key, default=None):
     """Obtiene un valor específico de la configuración"""
-    settings = load_settings()
-    return settings.get(key, default)
+    return _cached_settings().get(key, default)
+
+
+def update_settings(changes):
+    """Aplica varios cambios con una única escritura atómica (solo si algo cambia)"""
+    batch = getattr(_batch_state, "changes", None)
+    if batch is not None:
+        batch.update(changes)
+        return True
+
+    # Combinar y guardar bajo _save_lock (no se pierden cambios simultáneos); la
+    # escritura con fsync y los avisos no bloquean a get_setting
+    with _save_lock:
+        settings = dict(_cached_settings())
+        if all(settings.get(key) == value for key, value in changes.items()):
+            return True
+        settings.update(changes)
+        saved, changed = _store_settings(settings)
+    _notify(changed)
+    return saved
 
 
 def set_setting(key, value):
     """Establece un valor específico en la configuración y lo guarda"""
-    settings = load_settings()
-    settings[key] = value
-    return save_settings(settings)
+    return update_settings({key: value})
+
+
+@contextlib.contextmanager
+def settings_batch():
+    """Agrupa los set_setting del bloque en una sola escritura al salir sin errores"""
+    if getattr(_batch_state, "changes", None) is not None:
+        # Lote anidado: los cambios se guardan con el lote exterior
+        yield
+        return
+
+    _batch_state.changes = {}
+    try:
+        yield
+        changes = _batch_state.changes
+    finally:
+        _batch_state.changes = None
+    update_settings(changes)
+
+
+def subscribe(key, callback):
+    """Registra callback(key, value) para cuando cambie el valor de key"""
+    with _settings_lock:
+        _subscribers.setdefault(key, []).append(callback)
+    return callback
+
+
+def unsubscribe(key, callback):
+    """Elimina un suscriptor registrado con subscribe"""
+    with _settings_lock:
+        if callback in _subscribers.get(key, []):
+            _subscribers[key].remove(callback)
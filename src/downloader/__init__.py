@@ -1,2 +1,8 @@
-# Exportar funciones principales
-from src.downloader.downloader import download_minecraft
+# Exportar funciones principales (importación diferida: cargar el downloader
+# trae requests y aiohttp, y no hace falta hasta la primera descarga)
+def __getattr__(name):
+    if name == "download_minecraft":
+        from src.downloader.downloader import download_minecraft
+
+        return download_minecraft
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,250 @@
+"""
+Filtro de assets según la calidad gráfica: categorías y perfiles declarativos
+compilados una sola vez en expresiones regulares
+"""
+
+import json
+import re
+import threading
+
+from src.config.constants import QUALITY_PROFILES_FILE
+from src.utils.logging import log
+
+# Categorías de assets, por prioridad: un asset pertenece a la primera categoría
+# con algún marcador contenido en su nombre (sin distinguir mayúsculas)
+ASSET_CATEGORIES = {
+    "textures": ["textures/", ".png", ".jpg", ".jpeg", ".tga"],
+    "sounds": ["sounds/", ".ogg", ".mp3", ".wav"],
+    "music": ["music/", "records/", "sounds/music/", "sounds/records/"],
+    "languages": ["lang/", "texts/", "realms/lang/"],
+    "fonts": ["font/", "fonts/", "unicode/"],
+    "models": ["models/", ".json"],
+}
+DEFAULT_CATEGORY = "misc"
+
+# Perfiles de calidad incluidos. Cada regla por categoría puede ser true (todo),
+# false (nada), {"include": [...]} o {"exclude": [...]}; las categorías que no
+# aparecen se descargan completas
+QUALITY_PROFILES = {
+    "low": {
+        "description": "Texturas básicas, sin sonidos ambientales ni música",
+        "rules": {
+            "textures": {"exclude": ["hd", "4k", "high", "normal", "rain", "detailed"]},
+            "sounds": {"exclude": ["ambience", "ambient", "environment", "weather"]},
+            "music": False,  # Sin música en calidad baja
+            "languages": {"include": ["en_us", "es_"]},  # Solo inglés y español
+            "models": {"include": ["item", "block"]},  # Solo modelos esenciales
+        },
+    },
+    "medium": {
+        "description": "Casi todas las texturas, menos efectos avanzados",
+        "rules": {
+            "textures": {"exclude": ["4k", "ultra", "parallax"]},
+            "sounds": {"exclude": ["ambient/"]},  # Algunos sonidos ambientales
+            "music": {"include": ["menu", "game"]},  # Música básica
+        },
+    },
+    "high": {
+        "description": "Todas las texturas, efectos y sonidos",
+        "rules": {},
+    },
+}
+DEFAULT_PROFILE = "high"
+
+
+def _markers_pattern(markers):
+    """Alternativa regex con los marcadores escapados"""
+    return "|".join(re.escape(marker) for marker in markers)
+
+
+# Un único patrón para todas las categorías: cada rama es un lookahead anclado al
+# inicio, así que gana la primera categoría (por prioridad) con algún marcador
+_CATEGORY_MATCHER = re.compile(
+    "^(?:"
+    + "|".join(
+        f"(?=.*?(?:{_markers_pattern(markers)}))(?P<{category}>)"
+        for category, markers in ASSET_CATEGORIES.items()
+    )
+    + ")",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Cachés: perfiles personalizados (por mtime), perfiles compilados y selecciones
+_custom_profiles = {}
+_custom_profiles_mtime = None
+_compiled_profiles = {}
+_selection_cache = {}
+_filter_lock = threading.Lock()
+
+
+def get_asset_category(asset_name):
+    """Categoría de un asset según su nombre"""
+    match = _CATEGORY_MATCHER.match(asset_name)
+    return match.lastgroup if match else DEFAULT_CATEGORY
+
+
+def _valid_rule(rule):
+    """Indica si una regla es true/false o {"include"|"exclude": [marcadores]}"""
+    if isinstance(rule, bool):
+        return True
+    if not isinstance(rule, dict) or not rule.keys() <= {"include", "exclude"}:
+        return False
+    return all(
+        isinstance(markers, list) and all(isinstance(m, str) for m in markers)
+        for markers in rule.values()
+    )
+
+
+def _validate_profiles(profiles):
+    """Perfiles personalizados válidos; los inválidos se registran y se omiten"""
+    valid = {}
+    for name, profile in profiles.items():
+        if (
+            not isinstance(profile, dict)
+            or not isinstance(profile.get("rules", {}), dict)
+            or not isinstance(profile.get("extends", ""), str)
+        ):
+            log(f"Perfil de calidad inválido, se omite: {name}", error=True)
+            continue
+        rules = {}
+        for category, rule in profile.get("rules", {}).items():
+            if _valid_rule(rule):
+                rules[category] = rule
+            else:
+                log(
+                    f"Regla inválida en el perfil {name} ({category}), se omite",
+                    error=True,
+                )
+        valid[name] = dict(profile, rules=rules)
+    return valid
+
+
+def _load_custom_profiles():
+    """Carga los perfiles de quality_profiles.json si el archivo ha cambiado"""
+    global _custom_profiles, _custom_profiles_mtime
+
+    try:
+        mtime = QUALITY_PROFILES_FILE.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+
+    if mtime != _custom_profiles_mtime:
+        _custom_profiles = {}
+        if mtime is not None:
+            try:
+                with open(QUALITY_PROFILES_FILE, "r", encoding="utf-8") as f:
+                    profiles = json.load(f)
+                if not isinstance(profiles, dict):
+                    raise ValueError("se esperaba un objeto JSON")
+                _custom_profiles = _validate_profiles(profiles)
+            except (OSError, ValueError) as e:
+                log(f"Error al leer los perfiles de calidad: {e}", error=True)
+        _custom_profiles_mtime = mtime
+        _compiled_profiles.clear()
+        _selection_cache.clear()
+
+    return _custom_profiles
+
+
+def _resolve_profile(name, profiles, seen=()):
+    """Perfil con las reglas heredadas (extends) ya aplicadas"""
+    profile = profiles[name]
+    rules = {}
+    base = profile.get("extends")
+    if base in profiles and base not in seen:
+        rules.update(_resolve_profile(base, profiles, seen + (name,))["rules"])
+    rules.update(profile.get("rules", {}))
+    return {"description": profile.get("description", ""), "rules": rules}
+
+
+def get_quality_profiles():
+    """Perfiles de calidad disponibles (incluidos y personalizados) por nombre"""
+    with _filter_lock:
+        profiles = dict(QUALITY_PROFILES)
+        profiles.update(_load_custom_profiles())
+    return {name: _resolve_profile(name, profiles) for name in profiles}
+
+
+def _compile_rule(rule):
+    """Convierte una regla declarativa en True, False o un predicado sobre el nombre"""
+    if isinstance(rule, bool):
+        return rule
+    if isinstance(rule, dict) and "include" in rule:
+        # Sin marcadores, include no incluye nada
+        if not rule["include"]:
+            return False
+        search = re.compile(_markers_pattern(rule["include"]), re.IGNORECASE).search
+        return lambda name: search(name) is not None
+    if isinstance(rule, dict) and rule.get("exclude"):
+        search = re.compile(_markers_pattern(rule["exclude"]), re.IGNORECASE).search
+        return lambda name: search(name) is None
+    return True
+
+
+def compile_profile(quality):
+    """Reglas compiladas (por categoría) del perfil de calidad indicado"""
+    profiles = get_quality_profiles()
+    if quality not in profiles:
+        log(
+            f"Perfil de calidad desconocido: {quality}, usando {DEFAULT_PROFILE}",
+            error=True,
+        )
+        quality = DEFAULT_PROFILE
+
+    with _filter_lock:
+        compiled = _compiled_profiles.get(quality)
+        if compiled is None:
+            rules = profiles[quality]["rules"]
+            compiled = {
+                category: _compile_rule(rules.get(category, True))
+                for category in list(ASSET_CATEGORIES) + [DEFAULT_CATEGORY]
+            }
+            _compiled_profiles[quality] = compiled
+    return quality, compiled
+
+
+def select_assets(objects, quality, index_id=None):
+    """Aplica el perfil a los pares (nombre, datos) de un índice (memorizado por índice)
+
+    Si la selección ya está memorizada, objects no llega a recorrerse.
+    """
+    quality, rules = compile_profile(quality)
+
+    cache_key = (index_id, quality)
+    if index_id is not None:
+        with _filter_lock:
+            cached = _selection_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    selected = []
+    skipped = []
+    skipped_bytes = 0
+    categories_stats = {
+        category: {"total": 0, "skipped": 0}
+        for category in list(ASSET_CATEGORIES) + [DEFAULT_CATEGORY]
+    }
+
+    for asset_name, asset_info in objects:
+        category = get_asset_category(asset_name)
+        categories_stats[category]["total"] += 1
+
+        rule = rules[category]
+        if rule is True or (rule is not False and rule(asset_name)):
+            selected.append((asset_info["hash"], asset_info.get("size", 0)))
+        else:
+            skipped.append((category, asset_name))
+            skipped_bytes += asset_info.get("size", 0)
+            categories_stats[category]["skipped"] += 1
+
+    selection = {
+        "quality": quality,
+        "selected": selected,
+        "skipped": skipped,
+        "skipped_bytes": skipped_bytes,
+        "categories": categories_stats,
+    }
+    if index_id is not None:
+        with _filter_lock:
+            _selection_cache[cache_key] = selection
+    return selection
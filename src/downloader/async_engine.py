@@ -0,0 +1,302 @@
+"""
+Motor de descargas asíncrono basado en asyncio, alternativo al ThreadPoolExecutor
+"""
+
+import asyncio
+import concurrent.futures
+import hashlib
+import time
+from urllib.parse import urlparse
+
+from src.downloader.object_store import add_to_store
+from src.downloader.partial import (
+    RANGE_NOT_SATISFIABLE,
+    finalize_partial,
+    prepare_partial,
+    range_headers,
+)
+from src.downloader.retry import (
+    compute_backoff,
+    host_wait_time,
+    is_retryable,
+    note_http_error,
+)
+from src.downloader.throttle import throttle_async
+from src.downloader.verify_cache import record_verified
+from src.utils.events import elapsed_ms, emit_event, events_enabled
+from src.utils.logging import log
+
+# aiohttp es opcional: si no está instalado se usa el motor basado en hilos
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Tamaño de los bloques leídos del cuerpo de la respuesta
+CHUNK_SIZE = 64 * 1024
+
+
+def is_async_engine_available():
+    """Indica si el motor asíncrono puede usarse (requiere aiohttp)"""
+    return aiohttp is not None
+
+
+def _emit_download(url, dest, start, attempt, result, **fields):
+    """Registra el evento de una descarga si el registro de eventos está activo"""
+    if events_enabled():
+        emit_event(
+            "download",
+            file=dest.name,
+            host=urlparse(url).netloc,
+            attempt=attempt,
+            result=result,
+            duration_ms=elapsed_ms(start),
+            source="network",
+            engine="async",
+            **fields,
+        )
+
+
+def _register_download(dest, expected_hash):
+    """Registra un archivo verificado en el índice y en el almacén compartido"""
+    record_verified(dest, expected_hash)
+    add_to_store(dest, expected_hash)
+
+
+async def _download_one(
+    session, semaphore, url, dest, expected_hash, callbacks, attempt=0
+):
+    """Descarga un archivo escribiendo en disco y calculando el hash en streaming"""
+    on_start, on_done, on_progress = callbacks
+    # Bytes de este intento sumados al progreso (se descuentan si falla)
+    counted = 0
+    # Datos para el registro de eventos
+    offset = 0
+    received = 0
+
+    # No pedir nada a un host que pidió esperar (Retry-After) hasta que termine el plazo
+    while (delay := host_wait_time(url)) > 0:
+        await asyncio.sleep(delay)
+
+    async with semaphore:
+        on_start(dest)
+        start = time.perf_counter()
+        try:
+            # Reanudar desde el archivo .part si quedó uno de un intento anterior
+            # (rehacer su hash lee todo el archivo: se hace fuera del bucle de eventos)
+            part_path, offset, sha1_hash = await asyncio.to_thread(
+                prepare_partial, dest, expected_hash
+            )
+            on_progress(offset)
+            counted = offset
+
+            async with session.get(url, headers=range_headers(offset)) as response:
+                # Si el rango ya no es válido, el .part probablemente está completo
+                if not (offset and response.status == RANGE_NOT_SATISFIABLE):
+                    response.raise_for_status()
+
+                    # Si el servidor ignora el Range, empezar desde cero
+                    if offset and response.status != 206:
+                        offset = 0
+                        sha1_hash = hashlib.sha1()
+                        on_progress(-counted)
+                        counted = 0
+
+                    # Los bloques son pequeños y la escritura va a la caché de páginas,
+                    # por lo que escribir directamente no bloquea el bucle de forma apreciable
+                    with open(part_path, "ab" if offset else "wb") as f:
+                        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                            f.write(chunk)
+                            sha1_hash.update(chunk)
+                            on_progress(len(chunk))
+                            counted += len(chunk)
+                            received += len(chunk)
+                            # Respetar el límite de ancho de banda compartido
+                            await throttle_async(len(chunk))
+
+            if not await asyncio.to_thread(
+                finalize_partial, part_path, dest, sha1_hash, expected_hash
+            ):
+                on_progress(-counted)
+                on_done(dest, False)
+                _emit_download(
+                    url,
+                    dest,
+                    start,
+                    attempt,
+                    "hash_mismatch",
+                    bytes=received,
+                    resumed_from=offset,
+                )
+                return False
+
+            if expected_hash:
+                await asyncio.to_thread(_register_download, dest, expected_hash)
+            on_done(dest, True)
+            _emit_download(
+                url, dest, start, attempt, "ok", bytes=received, resumed_from=offset
+            )
+            return True
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            on_progress(-counted)
+            on_done(dest, False)
+            # Registrar el código HTTP (y Retry-After) para el planificador de reintentos
+            status = None
+            if isinstance(e, aiohttp.ClientResponseError):
+                status = e.status
+                retry_after = e.headers.get("Retry-After") if e.headers else None
+                note_http_error(url, e.status, retry_after)
+            log(f"Error al descargar {url}: {e.__class__.__name__}: {e}", error=True)
+            _emit_download(
+                url,
+                dest,
+                start,
+                attempt,
+                "error",
+                bytes=received,
+                resumed_from=offset,
+                status=status,
+                error=e.__class__.__name__,
+            )
+            return False
+        except OSError as e:
+            on_progress(-counted)
+            on_done(dest, False)
+            log(f"Error de E/S al guardar {dest}: {e}", error=True)
+            _emit_download(
+                url, dest, start, attempt, "error", bytes=received, error="OSError"
+            )
+            return False
+        except Exception as e:
+            # Cualquier otro fallo afecta solo a este archivo, no a toda la instalación
+            on_progress(-counted)
+            on_done(dest, False)
+            log(f"Error al descargar {url}: {e.__class__.__name__}: {e}", error=True)
+            _emit_download(
+                url,
+                dest,
+                start,
+                attempt,
+                "error",
+                bytes=received,
+                resumed_from=offset,
+                error=e.__class__.__name__,
+            )
+            return False
+
+
+async def _download_with_retries(session, semaphore, task, max_retries, callbacks):
+    """Descarga una tarea reintentando con backoff fuera del semáforo"""
+    url, dest, expected_hash, _ = task
+    on_start, on_done, on_progress = callbacks
+
+    attempt = 0
+    while True:
+        if await _download_one(
+            session, semaphore, url, dest, expected_hash, callbacks, attempt
+        ):
+            return True
+
+        attempt += 1
+        if attempt > max_retries or not is_retryable(url):
+            return False
+
+        # Esperar sin ocupar el semáforo: equivale a reencolar la tarea
+        delay = compute_backoff(url, attempt)
+        log(
+            f"Reintento {attempt}/{max_retries} de {dest.name} en {delay:.1f}s",
+            console_output=False,
+        )
+        await asyncio.sleep(delay)
+
+
+async def _download_all(
+    task_queue,
+    concurrency,
+    per_host,
+    connect_timeout,
+    read_timeout,
+    max_retries,
+    on_queued,
+    on_start,
+    on_done,
+    on_progress,
+):
+    """Consume la cola de tareas con concurrencia global y por host limitadas"""
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host)
+    timeout = aiohttp.ClientTimeout(
+        sock_connect=connect_timeout, sock_read=read_timeout
+    )
+    # El semáforo limita también los archivos abiertos simultáneamente
+    semaphore = asyncio.Semaphore(concurrency)
+    # Tareas leídas de la cola y sin terminar (descargando o esperando un reintento):
+    # al llegar al límite se deja de leer y la cola acotada frena a la verificación
+    admitted = asyncio.Semaphore(concurrency * 2)
+    loop = asyncio.get_running_loop()
+
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=timeout, headers={"User-Agent": "LLauncher"}
+    ) as session:
+        tasks = []
+        downloads = []
+        # Leer la cola (bloqueante) en un hilo aparte sin detener el bucle de eventos
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as reader:
+            while True:
+                await admitted.acquire()
+                task = await loop.run_in_executor(reader, task_queue.get)
+                if task is None:
+                    admitted.release()
+                    break
+                on_queued(task[3] or 0)
+                tasks.append(task)
+                download = asyncio.create_task(
+                    _download_with_retries(
+                        session,
+                        semaphore,
+                        task,
+                        max_retries,
+                        (on_start, on_done, on_progress),
+                    )
+                )
+                download.add_done_callback(lambda _: admitted.release())
+                downloads.append(download)
+
+        results = await asyncio.gather(*downloads)
+
+    return list(zip(tasks, results))
+
+
+def download_all_async(
+    task_queue,
+    concurrency=128,
+    per_host=32,
+    connect_timeout=10,
+    read_timeout=30,
+    max_retries=3,
+    on_queued=lambda size: None,
+    on_start=lambda dest: None,
+    on_done=lambda dest, success: None,
+    on_progress=lambda count: None,
+):
+    """Descarga las tareas (url, path, sha1, size) de la cola hasta recibir None y devuelve [(tarea, éxito)]"""
+    if not is_async_engine_available():
+        raise RuntimeError("El motor de descargas asíncrono requiere aiohttp")
+
+    log(
+        f"Motor asíncrono: {concurrency} descargas simultáneas, {per_host} por host",
+        console_output=False,
+    )
+    return asyncio.run(
+        _download_all(
+            task_queue,
+            concurrency,
+            per_host,
+            connect_timeout,
+            read_timeout,
+            max_retries,
+            on_queued,
+            on_start,
+            on_done,
+            on_progress,
+        )
+    )
@@ -1,11 +1,10 @@
 import concurrent.futures
 import json
+import queue
 import threading
 import time
-import zipfile
-import shutil
 import hashlib  # Para verificación de integridad
-import platform
+from urllib.parse import urlparse
 
 import requests
 
@@ -13,655 +12,654 @@ from src.config.constants import (
     ASSETS_DIR,
     BASE_DIR,
     GAME_DIR,
-    CLIENT_JAR,
     LIBRARIES_DIR,
-    MANIFEST_DIR,
-    MANIFEST_JSON,
-    MANIFEST_URL,
-    NATIVES_DIR,
     OS_NAME,
 )
+from src.config.game_version import (
+    client_jar_path,
+    get_game_version,
+    manifest_path,
+    natives_dir,
+    version_dir,
+)
 from src.config.settings import get_setting
+from src.downloader.async_engine import download_all_async, is_async_engine_available
+from src.downloader.http_session import (
+    close_session,
+    configure_session,
+    get_session,
+    get_timeout,
+)
+from src.downloader.install_plan import (
+    diff_install_plan,
+    load_install_plan,
+    plan_inputs,
+    save_install_plan,
+)
+from src.downloader.install_state import is_download_complete, set_download_complete
+from src.downloader.natives import extract_native_if_compatible, set_natives_dir
+from src.downloader.object_store import (
+    add_to_store,
+    link_from_store,
+    set_store_enabled,
+    shares_filesystem,
+)
+from src.downloader.partial import (
+    RANGE_NOT_SATISFIABLE,
+    finalize_partial,
+    prepare_partial,
+    range_headers,
+)
+from src.downloader.progress import (
+    add_bytes,
+    add_pending,
+    create_progress_sink,
+    finish_file,
+    get_progress,
+    report_progress,
+    reset_progress,
+    start_file,
+)
+from src.downloader.planner import (
+    check_disk_space,
+    estimate_download_size,
+    asset_index_path,
+    plan_install_tasks,
+)
+from src.downloader.retry import (
+    compute_backoff,
+    is_retryable,
+    note_http_error,
+    pending_retries,
+    reset_retry_state,
+    schedule_retry,
+    wait_for_host,
+)
+from src.downloader.scheduler import (
+    MAX_QUEUED_TASKS,
+    SMALL_FILE_THRESHOLD,
+    SizePriorityQueue,
+    sort_largest_first,
+    take_small_batch,
+    task_size,
+)
+from src.downloader.throttle import (
+    configure_throttle,
+    get_max_per_host,
+    host_slot,
+    throttle,
+)
+from src.downloader.verifier import (
+    run_verification_stage,
+    set_deep_verify,
+    verify_file_hash,
+)
+from src.downloader.verify_cache import record_verified, save_index
+from src.downloader.versions import manifest_source
+from src.utils.events import elapsed_ms, emit_event, events_enabled
 from src.utils.logging import log
 
 # Variables globales para descargas
-download_complete = False
 download_in_progress = False
-progress_thread = None
-should_exit = False
-download_counter = 0
-download_lock = threading.Lock()
-total_downloads = 0
-current_file = ""
-current_file_lock = threading.Lock()
-
-# Añadir un nuevo lock para proteger la extracción de natives
-extract_lock = threading.Lock()
 
 
-def download_file(url, dest, expected_hash=None):
+def download_file(url, dest, expected_hash=None, check_existing=True, attempt=0):
     """Descargar un archivo desde una URL con verificación de integridad opcional"""
-    # Declarar todas las variables globales al inicio de la función
-    global current_file
-    global download_counter
-
+    # Publicar el archivo en curso de este worker y, al terminar, si se completó
+    start_file(dest.name)
+    success = False
     try:
-        # Actualizar el archivo actual que se está descargando
-        with current_file_lock:
-            current_file = dest.name
+        success = _fetch_file(url, dest, expected_hash, check_existing, attempt)
+        return success
+    finally:
+        finish_file(success)
+
 
+def _fetch_file(url, dest, expected_hash, check_existing, attempt):
+    """Descarga (o reutiliza) un archivo y devuelve si quedó en su destino"""
+    # Bytes de este intento sumados al progreso (se descuentan si falla)
+    counted = 0
+    # Datos para el registro de eventos
+    start = time.perf_counter()
+    offset = 0
+    received = 0
+
+    try:
         # Si el archivo ya existe y tiene el hash esperado, omitir descarga
-        if expected_hash and dest.exists():
+        # (check_existing=False cuando el planificador ya lo comprobó)
+        if check_existing and expected_hash and dest.exists():
             if verify_file_hash(dest, expected_hash):
                 # Solo registrar en el archivo de log, no en la consola
                 log(
                     f"Omitiendo descarga de {dest.name} (ya existe y es válido)",
                     console_output=False,
+                    debug=True,
                 )
 
-                # Actualizar contador global de descargas
-                with download_lock:
-                    download_counter += 1
-                    current = download_counter
-
+                _emit_download(url, dest, start, attempt, "skipped", source="disk")
                 return True
 
-        # Realizar la descarga
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-
-        # Obtener el tamaño total si está disponible
-        total_size = int(response.headers.get("content-length", 0))
-
-        # Asegurar que el directorio padre existe
-        dest.parent.mkdir(parents=True, exist_ok=True)
-
-        # Descargar el archivo
-        downloaded = 0
-        sha1_hash = hashlib.sha1()
-
-        with open(dest, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    if expected_hash:
-                        sha1_hash.update(chunk)
-                    downloaded += len(chunk)
+        # Reutilizar el objeto si otra instalación ya lo tiene en el almacén compartido
+        if check_existing and link_from_store(dest, expected_hash):
+            record_verified(dest, expected_hash)
+            _record_download(dest)
+            _emit_download(url, dest, start, attempt, "ok", source="store")
+            return True
 
-        # Verificar hash si se especificó
-        if expected_hash and expected_hash != sha1_hash.hexdigest():
-            log(
-                f"Error de verificación para {dest.name} (hash no coincide)", error=True
+        # Reanudar desde el archivo .part si quedó uno de un intento anterior
+        part_path, offset, sha1_hash = prepare_partial(dest, expected_hash)
+        add_bytes(offset)
+        counted = offset
+
+        # No pedir nada a un host que pidió esperar (Retry-After) hasta que termine el plazo
+        wait_for_host(url)
+
+        # Realizar la descarga reutilizando las conexiones de la sesión compartida
+        # (el bloque with devuelve la conexión al pool incluso si hay errores)
+        with host_slot(url), get_session().get(
+            url,
+            stream=True,
+            timeout=get_timeout(),
+            headers=range_headers(offset),
+        ) as response:
+            # Si el rango ya no es válido, el .part probablemente está completo
+            if not (offset and response.status_code == RANGE_NOT_SATISFIABLE):
+                response.raise_for_status()
+
+                # Si el servidor ignora el Range, empezar desde cero
+                if offset and response.status_code != 206:
+                    log(
+                        f"El servidor no admite reanudar {dest.name}, descargando completo",
+                        console_output=False,
+                    )
+                    offset = 0
+                    sha1_hash = hashlib.sha1()
+                    add_bytes(-counted)
+                    counted = 0
+
+                # Descargar el archivo en el .part (se conserva si se interrumpe)
+                with open(part_path, "ab" if offset else "wb") as f:
+                    for chunk in response.iter_content(chunk_size=65536):
+                        if chunk:
+                            f.write(chunk)
+                            sha1_hash.update(chunk)
+                            add_bytes(len(chunk))
+                            counted += len(chunk)
+                            received += len(chunk)
+                            # Respetar el límite de ancho de banda compartido
+                            throttle(len(chunk))
+
+        # Verificar hash si se especificó y mover el .part a su destino final
+        if not finalize_partial(part_path, dest, sha1_hash, expected_hash):
+            add_bytes(-counted)
+            _emit_download(
+                url,
+                dest,
+                start,
+                attempt,
+                "hash_mismatch",
+                source="network",
+                bytes=received,
+                resumed_from=offset,
             )
             return False
 
-        # Actualizar contador global de descargas
-        with download_lock:
-            download_counter += 1
-            current = download_counter
-
-        # Solo registrar en el archivo de log, no en la consola
-        log(
-            f"Descargado {dest.name} [{current}/{total_downloads if total_downloads > 0 else '?'}]",
-            console_output=False,
+        if expected_hash:
+            record_verified(dest, expected_hash)
+            add_to_store(dest, expected_hash)
+        _record_download(dest)
+        _emit_download(
+            url,
+            dest,
+            start,
+            attempt,
+            "ok",
+            source="network",
+            bytes=received,
+            resumed_from=offset,
         )
         return True
     except requests.RequestException as e:
+        add_bytes(-counted)
+        # Registrar el código HTTP (y Retry-After) para el planificador de reintentos
+        status = None
+        if e.response is not None:
+            status = e.response.status_code
+            note_http_error(url, status, e.response.headers.get("Retry-After"))
         log(f"Error al descargar {url}: {e}", error=True)
+        _emit_download(
+            url,
+            dest,
+            start,
+            attempt,
+            "error",
+            source="network",
+            bytes=received,
+            resumed_from=offset,
+            status=status,
+            error=e.__class__.__name__,
+        )
         return False
 
 
-def verify_file_hash(file_path, expected_hash):
-    """Verifica el hash SHA1 de un archivo"""
-    try:
-        sha1_hash = hashlib.sha1()
-        with open(file_path, "rb") as f:
-            while chunk := f.read(8192):
-                sha1_hash.update(chunk)
-
-        return sha1_hash.hexdigest() == expected_hash
-    except Exception as e:
-        log(f"Error al verificar hash de {file_path}: {e}", error=True)
-        return False
+def _emit_download(url, dest, start, attempt, result, **fields):
+    """Registra el evento de una descarga si el registro de eventos está activo"""
+    if events_enabled():
+        emit_event(
+            "download",
+            file=dest.name,
+            host=urlparse(url).netloc,
+            attempt=attempt,
+            result=result,
+            duration_ms=elapsed_ms(start),
+            **fields,
+        )
 
 
-def extract_natives(jar_path):
-    """Extrae el contenido de un JAR de natives"""
-    # Usar lock para evitar extracciones concurrentes que podrían interferir entre sí
-    with extract_lock:
-        try:
-            with zipfile.ZipFile(jar_path, "r") as jar:
-                for file in jar.namelist():
-                    if file.startswith("META-INF/"):
-                        continue
-                    jar.extract(file, NATIVES_DIR)
-            log(f"Extraído {jar_path.name} en {NATIVES_DIR}")
-            return True
-        except zipfile.BadZipFile:
-            log(f"Error: {jar_path} no es un archivo ZIP válido.", error=True)
-            return False
-        except PermissionError:
-            log(f"Error de permisos al extraer {jar_path}", error=True)
-            return False
-        except Exception as e:
-            log(
-                f"Error inesperado al extraer {jar_path}: {e.__class__.__name__}: {e}",
-                error=True,
-            )
-            return False
+def _record_download(dest):
+    """Registra la descarga en el log (el progreso lo publica download_file)"""
+    # Solo registrar en el archivo de log, no en la consola
+    log(f"Descargado {dest.name}", console_output=False, debug=True)
 
 
-def show_progress_animation():
-    """Muestra una animación de progreso en la terminal con una barra visual mejorada"""
-    animation = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"  # Spinner más estético
-    idx = 0
-    last_percent = -1
-    last_file_displayed = ""
-    update_counter = 0
+def _start_async_file(dest):
+    """Publica el archivo que empieza a descargar el motor asíncrono"""
+    start_file(dest.name)
 
-    try:
-        terminal_width = shutil.get_terminal_size().columns
-    except:
-        terminal_width = 80  # Valor por defecto
-
-    # Mostrar cabecera inicial
-    print("\n📥 Progreso de descarga:")
-
-    while not should_exit:
-        with download_lock:
-            current = download_counter
-            total = total_downloads
-
-        with current_file_lock:
-            file_name = current_file
-
-        if total > 0:
-            percent = min(int(current * 100 / total), 100)
-
-            # Evitar actualizaciones excesivas de la consola
-            # Solo actualizar si:
-            # 1. El porcentaje ha cambiado
-            # 2. El archivo ha cambiado
-            # 3. Han pasado 10 ciclos (para mantener el spinner animado)
-            if (
-                percent != last_percent
-                or file_name != last_file_displayed
-                or update_counter >= 10
-            ):
-                update_counter = 0
-                last_percent = percent
-                last_file_displayed = file_name
-
-                # Calcular espacio para la barra de progreso
-                spinner = animation[idx % len(animation)]
-                info_text = f" {percent}% [{current}/{total}] "
-
-                # Espacio disponible para la barra después de mostrar la información
-                available_width = max(20, terminal_width - len(info_text) - 6)
-
-                # Calcular la longitud de la barra de progreso (75% del espacio disponible)
-                bar_length = int(available_width * 0.75)
-                filled_length = int(bar_length * percent // 100)
-
-                # Crear la barra de progreso con colores
-                bar = "█" * filled_length + "░" * (bar_length - filled_length)
-
-                # Mostrar información del archivo actual en una segunda línea
-                # pero solo mostrar el nombre del archivo (sin la ruta)
-                file_display = (
-                    file_name.split("/")[-1] if "/" in file_name else file_name
-                )
 
-                # Limitar longitud del nombre del archivo
-                max_file_length = terminal_width - 20
-                if len(file_display) > max_file_length:
-                    file_display = file_display[: max_file_length - 3] + "..."
+def _finish_async_file(dest, success):
+    """Publica el final de una descarga del motor asíncrono"""
+    finish_file(success)
+    if success:
+        _record_download(dest)
 
-                # Limpiar líneas anteriores y mostrar la barra de progreso
-                print(f"\r{spinner} [{bar}]{info_text}", end="")
-                print(f"\n📄 Archivo actual: {file_display}", end="\r\033[A")
-            else:
-                update_counter += 1
-        else:
-            # Si no conocemos el total, mostrar solo el spinner
-            spinner = animation[idx % len(animation)]
-            print(f"\r{spinner} Preparando descarga...", end="")
-
-            # Mostrar el archivo actual si hay uno
-            if file_name:
-                file_display = (
-                    file_name.split("/")[-1] if "/" in file_name else file_name
-                )
-                print(f"\n📄 {file_display}", end="\r\033[A")
 
-        idx += 1
-        time.sleep(0.1)
+def _extract_restored_native(task):
+    """Extrae una native que se obtuvo del almacén compartido en lugar de descargarse"""
+    path = task[1]
+    if str(path).endswith(".jar"):
+        extract_native_if_compatible(path)
 
 
-def download_minecraft():
-    """Descarga Minecraft y sus dependencias usando descargas paralelas con verificación de integridad"""
-    global download_complete, download_in_progress, should_exit, progress_thread
-    global download_counter, total_downloads
+def _run_thread_downloads(task_queue, max_workers, max_retries, on_queued):
+    """Consume la cola con un pool de hilos, reencolando con backoff las descargas fallidas"""
+    attempts = {}
+    failed = []
+    outstanding = 0
+    state_lock = threading.Lock()
+    # Solo se saca de la cola cuando hay un worker libre, para respetar la prioridad
+    free_workers = threading.Semaphore(max_workers)
 
-    if download_in_progress:
-        log("Descarga ya en progreso, espere...", error=True)
-        return
-
-    download_in_progress = True
-    download_counter = 0
-    total_downloads = 0
+    def run_task(task):
+        nonlocal outstanding
+        url, path, sha1, _ = task
+        try:
+            success = download_file(
+                url, path, sha1, check_existing=False, attempt=attempts.get(path, 0)
+            )
 
-    # Iniciar animación de progreso
-    progress_thread = threading.Thread(target=show_progress_animation)
-    progress_thread.daemon = True
-    progress_thread.start()
+            # Si es un archivo nativo, verificar que corresponda al SO actual antes de extraerlo
+            if success and str(path).endswith(".jar"):
+                extract_native_if_compatible(path)
+        except Exception as e:
+            log(f"Error al procesar {path}: {e}", error=True)
+            success = False
+
+        if not success:
+            with state_lock:
+                attempt = attempts.get(path, 0) + 1
+                attempts[path] = attempt
+            if attempt <= max_retries and is_retryable(url):
+                delay = schedule_retry(task_queue, task, attempt)
+                log(
+                    f"Reintento {attempt}/{max_retries} de {path.name} en {delay:.1f}s",
+                    console_output=False,
+                )
+            else:
+                with state_lock:
+                    failed.append(task)
 
-    try:
-        log("Iniciando descarga y preparación de Minecraft (con descargas paralelas)")
-
-        # Obtener el número máximo de workers desde la configuración
-        max_workers = get_setting("max_workers", 10)
-        # Obtener el nivel de calidad gráfica (afecta a qué assets se descargan)
-        graphics_quality = get_setting(
-            "graphics_quality", "high"
-        )  # valores: low, medium, high
-        log(f"Usando {max_workers} workers y calidad gráfica: {graphics_quality}")
-
-        # Crear carpetas
-        BASE_DIR.mkdir(exist_ok=True)
-        GAME_DIR.mkdir(parents=True, exist_ok=True)
-        MANIFEST_DIR.mkdir(parents=True, exist_ok=True)
-        LIBRARIES_DIR.mkdir(parents=True, exist_ok=True)
-        NATIVES_DIR.mkdir(parents=True, exist_ok=True)
-        ASSETS_DIR.mkdir(parents=True, exist_ok=True)
-
-        # Descargar manifest si no existe
-        if not MANIFEST_JSON.exists():
-            log(f"Descargando el archivo manifest desde {MANIFEST_URL}...")
-            if not download_file(MANIFEST_URL, MANIFEST_JSON):
-                should_exit = True
-                log("Error al descargar el manifest", error=True)
-                return
-        else:
-            log(f"Manifest ya existe, omitiendo descarga.")
+        # Descontar después de programar el reintento para no terminar antes de tiempo
+        with state_lock:
+            outstanding -= 1
 
-        # Leer manifest
+    def run_batch(batch):
         try:
-            with open(MANIFEST_JSON, "r") as f:
-                manifest = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError) as e:
-            should_exit = True
-            log(f"Error al leer el manifest: {e}", error=True)
-            return
-
-        # Descargar client.jar con verificación de hash
-        client_info = manifest["downloads"]["client"]
-        client_url = client_info["url"]
-        client_sha1 = client_info["sha1"]
+            for task in batch:
+                run_task(task)
+        finally:
+            free_workers.release()
+
+    producer_done = False
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            if not free_workers.acquire(timeout=0.1):
+                continue
 
-        log("Descargando client.jar...")
-        if not download_file(client_url, CLIENT_JAR, client_sha1):
-            should_exit = True
-            log("Error al descargar client.jar", error=True)
-            return
+            try:
+                task = task_queue.get(timeout=0.1)
+            except queue.Empty:
+                free_workers.release()
+                with state_lock:
+                    idle = outstanding == 0
+                # Terminar solo si no queda nada en curso, programado ni en la cola
+                if (
+                    producer_done
+                    and idle
+                    and pending_retries() == 0
+                    and task_queue.empty()
+                ):
+                    break
+                continue
 
-        # Preparar descargas de librerías y natives
-        download_tasks = []
-
-        log(f"Sistema operativo detectado: {OS_NAME}")
-
-        # Recopilar las librerías a descargar
-        libraries = manifest.get("libraries", [])
-
-        # Definir mapeo de sistemas operativos para filtrado
-        os_mapping = {
-            "windows": ["windows", "win"],
-            "linux": ["linux", "unix"],
-            "darwin": ["osx", "mac", "macos", "darwin"],
-        }
-
-        current_os_aliases = os_mapping.get(OS_NAME, [OS_NAME])
-        log(f"Filtrando bibliotecas para: {current_os_aliases}")
-
-        for lib in libraries:
-            # Verificar reglas de inclusión/exclusión
-            should_include = True
-            if "rules" in lib:
-                should_include = False  # Default para bibliotecas con reglas
-                for rule in lib.get("rules", []):
-                    action = rule.get("action", "allow") == "allow"
-
-                    # Verificar regla específica de SO
-                    if "os" in rule:
-                        os_rule = rule["os"]
-                        os_name = os_rule.get("name", "").lower()
-
-                        # Comprobar si la regla aplica al SO actual
-                        if any(alias == os_name for alias in current_os_aliases):
-                            should_include = action
-                            break
-                    else:
-                        # Regla general
-                        should_include = action
-
-            # Si la biblioteca debe excluirse, saltarla
-            if not should_include:
-                lib_name = lib.get("name", "Desconocida")
-                log(f"Omitiendo biblioteca no requerida: {lib_name}")
+            if task is None:
+                free_workers.release()
+                producer_done = True
                 continue
 
-            downloads = lib.get("downloads", {})
-
-            # Librería normal
-            if "artifact" in downloads:
-                artifact = downloads["artifact"]
-                url = artifact["url"]
-                path = LIBRARIES_DIR / artifact["path"]
-                # Incluir el SHA1 para verificación
-                sha1 = artifact.get("sha1")
-                if not path.exists() or (sha1 and not verify_file_hash(path, sha1)):
-                    download_tasks.append((url, path, sha1))
-
-            # Librería native (si aplica)
-            classifiers = downloads.get("classifiers", {})
-            native_key = None
-            if OS_NAME == "windows":
-                native_key = "natives-windows"
-            elif OS_NAME == "linux":
-                native_key = "natives-linux"
-            elif OS_NAME == "darwin":
-                native_key = "natives-osx"
-
-            # Solo descargar natives para el SO actual
-            if native_key and native_key in classifiers:
-                native = classifiers[native_key]
-                url = native["url"]
-                path = LIBRARIES_DIR / native["path"]
-                sha1 = native.get("sha1")
-                if not path.exists() or (sha1 and not verify_file_hash(path, sha1)):
-                    download_tasks.append((url, path, sha1))
-                    # Marcar esta biblioteca para extracción posterior
-                    log(f"Marcada para extracción: {path.name}")
-            # IMPORTANTE: No descargar ni siquiera las natives para otros sistemas
-
-        # Preparar la descarga de assets
-        log("Preparando descarga de assets...")
-        asset_index = manifest["assetIndex"]
-        asset_index_url = asset_index["url"]
-        asset_index_id = asset_index["id"]
-        asset_index_path = ASSETS_DIR / "indexes" / f"{asset_index_id}.json"
-
-        # Descargar el índice de assets primero (no en paralelo)
-        asset_index_sha1 = asset_index.get("sha1")
-        if not download_file(asset_index_url, asset_index_path, asset_index_sha1):
-            should_exit = True
-            log("Error al descargar el índice de assets", error=True)
+            # Los archivos pequeños se agrupan para que un worker procese varios seguidos
+            if task_size(task) < SMALL_FILE_THRESHOLD:
+                batch = take_small_batch(task, task_queue)
+            else:
+                batch = [task]
+
+            with state_lock:
+                outstanding += len(batch)
+                new_tasks = [task for task in batch if task[1] not in attempts]
+            for task in new_tasks:
+                on_queued(task_size(task))
+            executor.submit(run_batch, batch)
+
+    return failed
+
+
+def _run_downloads(task_queue, engine, max_workers, max_retries, on_queued=add_pending):
+    """Descarga las tareas de la cola con el motor elegido y devuelve las que fallaron"""
+    if engine != "async":
+        return _run_thread_downloads(task_queue, max_workers, max_retries, on_queued)
+
+    results = download_all_async(
+        task_queue,
+        concurrency=get_setting("async_concurrency", 128),
+        per_host=get_max_per_host() or get_setting("async_per_host", 32),
+        connect_timeout=get_setting("connect_timeout", 10),
+        read_timeout=get_setting("read_timeout", 30),
+        max_retries=max_retries,
+        on_queued=on_queued,
+        on_start=_start_async_file,
+        on_done=_finish_async_file,
+        on_progress=add_bytes,
+    )
+
+    failed = []
+    for task, success in results:
+        path = task[1]
+        if not success:
+            failed.append(task)
+        # Si es un archivo nativo, verificar que corresponda al SO actual antes de extraerlo
+        elif str(path).endswith(".jar"):
+            extract_native_if_compatible(path)
+    return failed
+
+
+def _extract_version_natives(tasks):
+    """Extrae las natives de los JAR ya presentes (compartidos con otra versión)"""
+    for _, path, _, _ in tasks:
+        if "-natives-" in path.name and path.exists():
+            extract_native_if_compatible(path)
+
+
+def _install(deep_verify):
+    """Prepara las carpetas, planifica, verifica y descarga todo lo que falte"""
+    # La versión se fija al empezar aunque la configuración cambie durante la descarga
+    version = get_game_version()
+    manifest_json = manifest_path(version)
+    log(
+        f"Iniciando descarga y preparación de Minecraft {version} "
+        "(con descargas paralelas)"
+    )
+
+    # Obtener el número máximo de workers desde la configuración
+    max_workers = get_setting("max_workers", 10)
+    # Obtener el nivel de calidad gráfica (afecta a qué assets se descargan)
+    graphics_quality = get_setting(
+        "graphics_quality", "high"
+    )  # valores: low, medium, high
+    log(f"Usando {max_workers} workers y calidad gráfica: {graphics_quality}")
+
+    # Verificación profunda: recalcular el hash de todos los archivos existentes
+    if deep_verify is None:
+        deep_verify = get_setting("deep_verify", False)
+    set_deep_verify(deep_verify)
+    if deep_verify:
+        log("Verificación profunda activada: se recalculará el hash de todo")
+
+    # Dimensionar el pool de conexiones por host según el número de workers
+    configure_session(max_workers)
+    reset_retry_state()
+
+    # Limitar ancho de banda global y conexiones simultáneas por host
+    configure_throttle(
+        get_setting("max_bandwidth_kbps", 0), get_setting("max_per_host", 0)
+    )
+
+    # Crear carpetas
+    BASE_DIR.mkdir(exist_ok=True)
+    GAME_DIR.mkdir(parents=True, exist_ok=True)
+    version_dir(version).mkdir(parents=True, exist_ok=True)
+    LIBRARIES_DIR.mkdir(parents=True, exist_ok=True)
+    natives_dir(version).mkdir(parents=True, exist_ok=True)
+    ASSETS_DIR.mkdir(parents=True, exist_ok=True)
+    set_natives_dir(natives_dir(version))
+
+    # Compartir objetos (por SHA1) con otras instalaciones mediante enlaces duros.
+    # En otro sistema de archivos habría que copiarlos: ocuparían espacio que la
+    # comprobación previa no cuenta, así que el almacén no se usa
+    use_store = get_setting("shared_store", True)
+    if use_store and not shares_filesystem(GAME_DIR):
+        log(
+            "El almacén compartido está en otro sistema de archivos: no se usará",
+            console_output=False,
+        )
+        use_store = False
+    set_store_enabled(use_store)
+
+    # Descargar manifest si no existe (su URL sale de la lista de versiones de Mojang)
+    if not manifest_json.exists():
+        source = manifest_source(version)
+        if source is None:
+            log(f"No se encontró la versión {version} de Minecraft", error=True)
             return
-
-        # Leer asset index
-        try:
-            with open(asset_index_path, "r") as f:
-                asset_manifest = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError) as e:
-            should_exit = True
-            log(f"Error al leer el asset index: {e}", error=True)
+        manifest_url, manifest_sha1 = source
+        log(f"Descargando el archivo manifest desde {manifest_url}...")
+        if not download_file(manifest_url, manifest_json, manifest_sha1):
+            log("Error al descargar el manifest", error=True)
             return
+    else:
+        log(f"Manifest ya existe, omitiendo descarga.")
 
-        # Recopilar assets a descargar (filtrados por calidad gráfica)
-        objects = asset_manifest.get("objects", {})
-
-        # Definir categorías de assets y filtros según calidad gráfica
-        asset_categories = {
-            "textures": ["textures/", ".png", ".jpg", ".jpeg", ".tga"],
-            "sounds": ["sounds/", ".ogg", ".mp3", ".wav"],
-            "music": ["music/", "records/", "sounds/music/", "sounds/records/"],
-            "languages": ["lang/", "texts/", "realms/lang/"],
-            "fonts": ["font/", "fonts/", "unicode/"],
-            "models": ["models/", ".json"],
-        }
-
-        # Configuración de filtrado según calidad
-        quality_filters = {
-            "low": {
-                "textures": lambda name: not any(
-                    x in name.lower()
-                    for x in ["hd", "4k", "high", "normal", "rain", "detailed"]
-                ),
-                "sounds": lambda name: not any(
-                    x in name.lower()
-                    for x in ["ambience", "ambient", "environment", "weather"]
-                ),
-                "music": lambda _: False,  # Sin música en calidad baja
-                "languages": lambda name: "en_us" in name.lower()
-                or "es_" in name.lower(),  # Solo inglés y español
-                "fonts": lambda _: True,  # Siempre descargar fuentes
-                "models": lambda name: "item" in name.lower()
-                or "block" in name.lower(),  # Solo modelos esenciales
-                "misc": lambda _: True,  # Otros assets esenciales
-            },
-            "medium": {
-                "textures": lambda name: not any(
-                    x in name.lower() for x in ["4k", "ultra", "parallax"]
-                ),
-                "sounds": lambda name: not "ambient/"
-                in name.lower(),  # Algunos sonidos ambientales
-                "music": lambda name: "menu" in name.lower()
-                or "game" in name.lower(),  # Música básica
-                "languages": lambda _: True,  # Todos los idiomas
-                "fonts": lambda _: True,
-                "models": lambda _: True,
-                "misc": lambda _: True,
-            },
-            "high": {
-                "textures": lambda _: True,
-                "sounds": lambda _: True,
-                "music": lambda _: True,
-                "languages": lambda _: True,
-                "fonts": lambda _: True,
-                "models": lambda _: True,
-                "misc": lambda _: True,
-            },
-        }
-
-        # Función para determinar la categoría de un asset
-        def get_asset_category(asset_name):
-            for category, markers in asset_categories.items():
-                if any(marker in asset_name.lower() for marker in markers):
-                    return category
-            return "misc"
-
-        # Contadores para estadísticas
-        skipped_assets = 0
-        downloaded_assets = 0
-        categories_stats = {
-            category: {"total": 0, "skipped": 0} for category in asset_categories.keys()
-        }
-        categories_stats["misc"] = {"total": 0, "skipped": 0}
-
-        # Procesar cada asset
-        for asset_name, asset_info in objects.items():
-            # Categorizar el asset
-            category = get_asset_category(asset_name)
-            categories_stats[category]["total"] += 1
-
-            # Determinar si debe descargarse según la configuración de calidad
-            filter_func = quality_filters[graphics_quality][category]
-            should_download = filter_func(asset_name)
-
-            if should_download:
-                hash_value = asset_info["hash"]
-                subdir = hash_value[:2]
-                asset_url = (
-                    f"https://resources.download.minecraft.net/{subdir}/{hash_value}"
-                )
-                asset_path = ASSETS_DIR / "objects" / subdir / hash_value
+    # Leer manifest
+    try:
+        with open(manifest_json, "r") as f:
+            manifest = json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError) as e:
+        log(f"Error al leer el manifest: {e}", error=True)
+        return
 
-                if not asset_path.exists() or not verify_file_hash(
-                    asset_path, hash_value
-                ):
-                    download_tasks.append((asset_url, asset_path, hash_value))
-                    downloaded_assets += 1
-            else:
-                skipped_assets += 1
-                categories_stats[category]["skipped"] += 1
-                log(f"Omitiendo asset [{category}]: {asset_name}")
-
-        # Mostrar estadísticas de filtrado
-        log(f"Assets para descargar: {downloaded_assets}, Omitidos: {skipped_assets}")
-        for category, stats in categories_stats.items():
-            if stats["total"] > 0:
-                percentage = (stats["skipped"] / stats["total"]) * 100
-                log(
-                    f"  {category}: {stats['skipped']}/{stats['total']} omitidos ({percentage:.1f}%)"
-                )
+    # Preparar la descarga de assets
+    log("Preparando descarga de assets...")
+    asset_index = manifest["assetIndex"]
+    # Descargar el índice de assets primero (no en paralelo)
+    if not download_file(
+        asset_index["url"], asset_index_path(manifest), asset_index.get("sha1")
+    ):
+        log("Error al descargar el índice de assets", error=True)
+        return
 
-        log(f"Estimación de ahorro de espacio: ~{skipped_assets * 15 / 1024:.1f} MB")
-
-        # Actualizar contador total de descargas
-        total_downloads = len(download_tasks)
-        log(f"Se van a descargar {total_downloads} archivos en paralelo")
-
-        # Ejecutar descargas en paralelo
-        if download_tasks:
-            with concurrent.futures.ThreadPoolExecutor(
-                max_workers=max_workers
-            ) as executor:
-                # Crear un diccionario para almacenar los futures y sus paths correspondientes
-                future_to_path = {
-                    executor.submit(download_file, url, path, sha1): path
-                    for url, path, sha1 in download_tasks
-                }
-
-                # Procesar los resultados a medida que se completan
-                for future in concurrent.futures.as_completed(future_to_path):
-                    path = future_to_path[future]
-                    try:
-                        success = future.result()
-
-                        # Si es un archivo nativo, verificar que corresponda al SO actual antes de extraerlo
-                        if success and str(path).endswith(".jar"):
-                            # Determinar a qué SO corresponde esta native
-                            native_so_markers = {
-                                "windows": [
-                                    "natives-windows",
-                                    "natives-windows-x86",
-                                    "natives-windows-arm64",
-                                ],
-                                "linux": ["natives-linux"],
-                                "darwin": [
-                                    "natives-osx",
-                                    "natives-macos",
-                                    "natives-macos-arm64",
-                                    "natives-macos-patch",
-                                ],
-                                "macos": [
-                                    "natives-osx",
-                                    "natives-macos",
-                                    "natives-macos-arm64",
-                                    "natives-macos-patch",
-                                ],
-                                "macosx": [
-                                    "natives-osx",
-                                    "natives-macos",
-                                    "natives-macos-arm64",
-                                    "natives-macos-patch",
-                                ],
-                            }
-
-                            # Extracción selectiva de natives según el SO
-                            path_str = str(path).lower()
-                            current_os_markers = native_so_markers.get(OS_NAME, [])
-
-                            # Verificar si alguno de los marcadores del SO actual está en la ruta
-                            is_compatible = any(
-                                marker in path_str for marker in current_os_markers
-                            )
-
-                            # En macOS ARM, priorizar natives-macos-arm64 sobre natives-macos
-                            if (
-                                OS_NAME in ["darwin", "macos", "macosx"]
-                                and platform.machine() == "arm64"
-                            ):
-                                if "natives-macos-arm64" in path_str:
-                                    is_compatible = True
-                                    log(
-                                        f"Extrayendo native ARM64 para {OS_NAME}: {path.name}"
-                                    )
-                                    extract_natives(path)
-                                elif any(
-                                    marker in path_str
-                                    for marker in [
-                                        "natives-macos",
-                                        "natives-osx",
-                                        "natives-macos-patch",
-                                    ]
-                                ):
-                                    # En ARM64, también extraemos versiones normales de macOS para compatibilidad
-                                    is_compatible = True
-                                    log(
-                                        f"Extrayendo native compatible para {OS_NAME} ARM64: {path.name}"
-                                    )
-                                    extract_natives(path)
-                            # Para el resto de configuraciones, usar el marcador estándar
-                            elif is_compatible:
-                                log(f"Extrayendo native para {OS_NAME}: {path.name}")
-                                extract_natives(path)
-                            elif "-natives-" in path_str:
-                                # Es una native pero de otro SO, no la extraemos
-                                log(
-                                    f"Omitiendo extracción de native no compatible: {path.name}"
-                                )
-
-                    except Exception as e:
-                        log(f"Error al procesar {path}: {e}", error=True)
-
-        # Verificar si todas las descargas se completaron
-        if download_counter >= total_downloads:
+    # Preparar candidatos a descarga (client.jar, librerías, natives y assets);
+    # la verificación de los que ya existen se hace después, en paralelo
+    try:
+        candidates = plan_install_tasks(
+            manifest, graphics_quality, client_jar_path(version)
+        )
+    except (ValueError, OSError, KeyError) as e:
+        log(f"Error al leer el asset index: {e}", error=True)
+        return
+
+    # Comparar con la última instalación completada: los archivos que no han
+    # cambiado desde entonces no se vuelven a comprobar en disco
+    # (las librerías y los assets compartidos con otras versiones ya instaladas se
+    # comprueban con el índice de verificación y no se vuelven a descargar)
+    install_inputs = plan_inputs(manifest_json, asset_index, graphics_quality)
+    previous_plan = None if deep_verify else load_install_plan(version)
+    pending, unchanged, removed = diff_install_plan(candidates, previous_plan)
+    if previous_plan:
+        log(
+            f"Plan incremental: {len(pending)} archivos nuevos o cambiados, "
+            f"{unchanged} sin cambios, {removed} ya no necesarios"
+        )
+
+    # Comprobar antes de empezar que lo que falta cabe en el disco
+    planned_bytes = sum(task_size(task) for task in candidates)
+    _, missing_bytes = estimate_download_size(pending)
+    enough_space, free_bytes = check_disk_space(missing_bytes)
+    log(
+        f"Tamaño de la instalación: {planned_bytes / 1048576:.1f} MB, "
+        f"por descargar: {missing_bytes / 1048576:.1f} MB, "
+        f"libres: {free_bytes / 1048576:.1f} MB"
+    )
+    if not enough_space:
+        disk_space_policy = get_setting("disk_space_policy", "abort")
+        if disk_space_policy == "abort":
             log(
-                f"Todas las descargas completadas: {download_counter}/{total_downloads}"
+                "Espacio en disco insuficiente para completar la descarga, "
+                "abortando antes de empezar",
+                error=True,
             )
-            download_complete = True
-        else:
+            return
+        if disk_space_policy == "warn":
             log(
-                f"No se completaron todas las descargas: {download_counter}/{total_downloads}",
+                "Espacio en disco posiblemente insuficiente, continuando igualmente",
                 error=True,
             )
 
+    # Verificar en paralelo los archivos existentes: los que faltan o no superan
+    # la verificación pasan a la cola de descargas mientras se sigue verificando
+    # Los archivos más grandes se verifican y descargan primero para acortar la cola final
+    log(f"Verificando {len(pending)} archivos y descargando los que faltan")
+    pending = sort_largest_first(pending)
+    # Cola acotada: la verificación se detiene si va muy por delante de las descargas
+    task_queue = SizePriorityQueue(MAX_QUEUED_TASKS)
+
+    # El progreso se mide desde aquí, en bytes, sobre lo que realmente falta
+    reset_progress()
+
+    # Las natives recuperadas del almacén compartido también hay que extraerlas
+    verify_thread = threading.Thread(
+        target=run_verification_stage,
+        args=(pending, task_queue),
+        kwargs={"on_restored": _extract_restored_native},
+    )
+    verify_thread.daemon = True
+    verify_thread.start()
+
+    download_engine = get_setting("download_engine", "threads")
+    if download_engine == "async" and not is_async_engine_available():
+        log(
+            "aiohttp no está disponible, usando el motor de descargas con hilos",
+            error=True,
+        )
+        download_engine = "threads"
+
+    # Ejecutar descargas en paralelo (los fallos se reencolan con backoff)
+    max_retries = get_setting("max_retries", 3)
+    failed = _run_downloads(task_queue, download_engine, max_workers, max_retries)
+    verify_thread.join()
+
+    # Ronda final de reintento solo sobre las descargas que siguen fallando
+    failed = [task for task in failed if is_retryable(task[0])]
+    if failed:
+        delay = max(compute_backoff(task[0], 0) for task in failed)
+        log(
+            f"Reintentando {len(failed)} descargas fallidas en {delay:.1f}s...",
+            error=True,
+        )
+        time.sleep(delay)
+        retry_queue = SizePriorityQueue()
+        for task in failed:
+            retry_queue.put(task)
+        retry_queue.put(None)
+        failed = _run_downloads(
+            retry_queue,
+            download_engine,
+            min(max_workers, len(failed)),
+            max_retries=0,
+            on_queued=lambda size: None,
+        )
+
+    # Verificar si todas las descargas se completaron
+    stats = get_progress()
+    if not failed and stats["files"] >= stats["total_files"]:
+        log(f"Todas las descargas completadas: {stats['files']}/{stats['total_files']}")
+        # Sin plan previo, las natives de JAR que no hizo falta descargar
+        # (compartidos con otra versión) aún no están en la carpeta de esta versión
+        if previous_plan is None:
+            _extract_version_natives(candidates)
+        set_download_complete(True)
+        save_install_plan(install_inputs, candidates, version)
+
+        # Importación diferida: el launcher importa este módulo
+        from src.launcher.launch_profile import refresh_launch_profile
+
+        # Dejar el perfil de lanzamiento listo para no resolverlo al jugar
+        refresh_launch_profile(version)
+    else:
+        log(
+            f"No se completaron todas las descargas: {stats['files']}/{stats['total_files']}",
+            error=True,
+        )
+
+
+def download_minecraft(deep_verify=None, progress=None):
+    """Descarga Minecraft y sus dependencias usando descargas paralelas con verificación de integridad
+
+    deep_verify sustituye a la configuración si no es None; progress es la salida del
+    progreso (rich, plain, json, none o un objeto con update/close) y si es None se
+    usa la configuración.
+    """
+    global download_in_progress
+
+    if download_in_progress:
+        log("Descarga ya en progreso, espere...", error=True)
+        return
+
+    download_in_progress = True
+    set_download_complete(False)
+    reset_progress()
+
+    if progress is None:
+        progress = get_setting("progress_display", "rich")
+    sink = create_progress_sink(progress) if isinstance(progress, str) else progress
+
+    try:
+        with report_progress(sink):
+            _install(deep_verify)
     except Exception as e:
         log(f"Error durante la descarga: {e}", error=True)
     finally:
         download_in_progress = False
-        should_exit = True
-        if progress_thread and progress_thread.is_alive():
-            progress_thread.join(0.5)  # Esperar a que termine la animación
+        close_session()
+        save_index()
 
-        try:
-            # Obtener el ancho de la terminal para limpiar toda la línea
-            terminal_width = shutil.get_terminal_size().columns
-            print("\r" + " " * terminal_width + "\r", end="")
-        except:
-            # Si no podemos obtener el ancho, usar un valor grande
-            print("\r" + " " * 100 + "\r", end="")
-
-        if download_complete:
+        stats = get_progress()
+        if is_download_complete():
             print("\n✅ ¡Descarga completada exitosamente! 🎮")
-            print(f"   Se descargaron {download_counter} archivos.")
+            print(f"   Se descargaron {stats['files']} archivos.")
         else:
             print("\n❌ La descarga no se completó correctamente.")
             print(
-                f"   Solo se descargaron {download_counter} de {total_downloads} archivos."
+                f"   Solo se descargaron {stats['files']} de {stats['total_files']} archivos."
             )
             print("   Revisa el log para más detalles.")
 
-    return download_complete
-
-
-def is_download_complete():
-    """Retorna si la descarga está completa"""
-    return download_complete
-
-
-def set_download_complete(value):
-    """Establece el estado de la descarga"""
-    global download_complete
-    download_complete = value
+    return is_download_complete()
@@ -0,0 +1,107 @@
+"""
+Sesión HTTP compartida con pools de conexiones reutilizables para las descargas
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.config.settings import get_setting, subscribe
+from src.utils.logging import log
+
+# Número de hosts distintos cuyos pools se mantienen abiertos
+# (piston-meta, libraries, resources, etc.)
+POOL_HOSTS = 8
+
+# Variables globales de la sesión compartida
+_session = None
+_session_pool_size = 0
+_session_timeout = None
+_session_lock = threading.Lock()
+
+
+def _create_session(pool_size):
+    """Crea una sesión con un pool de conexiones keep-alive por host"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_HOSTS,
+        pool_maxsize=pool_size,
+        pool_block=True,  # Esperar una conexión libre en lugar de abrir una nueva
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": "LLauncher", "Connection": "keep-alive"})
+    return session
+
+
+def configure_session(pool_size=None, connect_timeout=None, read_timeout=None):
+    """Configura la sesión compartida según el número de workers y los timeouts"""
+    global _session, _session_pool_size, _session_timeout
+
+    if pool_size is None:
+        pool_size = get_setting("max_workers", 10)
+    if connect_timeout is None:
+        connect_timeout = get_setting("connect_timeout", 10)
+    if read_timeout is None:
+        read_timeout = get_setting("read_timeout", 30)
+
+    with _session_lock:
+        _session_timeout = (connect_timeout, read_timeout)
+
+        # Solo recrear la sesión si el pool actual es más pequeño de lo necesario
+        if _session is None or pool_size > _session_pool_size:
+            if _session is not None:
+                _session.close()
+            _session = _create_session(pool_size)
+            _session_pool_size = pool_size
+            log(
+                f"Sesión HTTP configurada: {pool_size} conexiones por host, "
+                f"timeouts {connect_timeout}s/{read_timeout}s",
+                console_output=False,
+            )
+
+        return _session
+
+
+def get_session():
+    """Obtiene la sesión HTTP compartida, creándola si aún no existe"""
+    if _session is None:
+        return configure_session()
+    return _session
+
+
+def get_timeout():
+    """Obtiene los timeouts (conexión, lectura) configurados para la sesión"""
+    if _session_timeout is None:
+        configure_session()
+    return _session_timeout
+
+
+def _on_timeout_changed(key, value):
+    """Aplica a la sesión los timeouts modificados en la configuración"""
+    global _session_timeout
+
+    with _session_lock:
+        if _session_timeout is None:
+            return
+        connect_timeout, read_timeout = _session_timeout
+        if key == "connect_timeout":
+            _session_timeout = (value, read_timeout)
+        else:
+            _session_timeout = (connect_timeout, value)
+
+
+subscribe("connect_timeout", _on_timeout_changed)
+subscribe("read_timeout", _on_timeout_changed)
+
+
+def close_session():
+    """Cierra la sesión compartida y libera sus conexiones"""
+    global _session, _session_pool_size
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+            _session_pool_size = 0
@@ -0,0 +1,93 @@
+"""
+Plan de la última instalación completada de cada versión, para comprobar solo lo que
+cambia entre versiones del manifest, del índice de assets o del perfil de calidad
+"""
+
+import hashlib
+import json
+
+from src.config.constants import ASSETS_DIR
+from src.config.game_version import client_jar_path, install_plan_path, natives_dir
+from src.utils.logging import log
+
+
+def plan_inputs(manifest_path, asset_index, quality):
+    """Identifica las entradas de un plan: hash del manifest, índice de assets y calidad"""
+    with open(manifest_path, "rb") as f:
+        manifest_sha1 = hashlib.sha1(f.read()).hexdigest()
+    return {
+        "manifest": manifest_sha1,
+        "asset_index": asset_index.get("sha1") or asset_index.get("id"),
+        "quality": quality,
+    }
+
+
+def load_install_plan(version=None):
+    """Carga el plan de la última instalación completada (None si no es utilizable)"""
+    # Si falta alguna carpeta de la instalación, el plan ya no la describe
+    if not (client_jar_path(version).exists() and (ASSETS_DIR / "objects").exists()):
+        return None
+    if not natives_dir(version).exists():
+        return None
+
+    try:
+        with open(install_plan_path(version), "r", encoding="utf-8") as f:
+            plan = json.load(f)
+        if not isinstance(plan.get("entries"), dict):
+            raise ValueError("sin entradas")
+        return plan
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        log(f"Plan de instalación dañado, se ignorará: {e}", error=True)
+        return None
+
+
+def diff_install_plan(tasks, plan):
+    """Separa las tareas nuevas o cambiadas. Devuelve (pendientes, sin cambios, retiradas)"""
+    if not plan:
+        return list(tasks), 0, 0
+
+    entries = plan["entries"]
+    pending = []
+    unchanged = 0
+    for task in tasks:
+        _, path, sha1, _ = task
+        if sha1 and entries.get(str(path)) == sha1:
+            unchanged += 1
+        else:
+            pending.append(task)
+
+    current_paths = {str(task[1]) for task in tasks}
+    removed = sum(1 for path in entries if path not in current_paths)
+    return pending, unchanged, removed
+
+
+def save_install_plan(inputs, tasks, version=None):
+    """Guarda el plan de una instalación completada, usando escritura atómica"""
+    plan = dict(inputs)
+    plan["entries"] = {str(path): sha1 for _, path, sha1, _ in tasks if sha1}
+    plan_file = install_plan_path(version)
+
+    try:
+        plan_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = plan_file.with_suffix(".tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(plan, f, separators=(",", ":"))
+        temp_file.replace(plan_file)
+        log(
+            f"Plan de instalación guardado ({len(plan['entries'])} archivos)",
+            console_output=False,
+        )
+        return True
+    except OSError as e:
+        log(f"Error al guardar el plan de instalación: {e}", error=True)
+        return False
+
+
+def discard_install_plan(version=None):
+    """Descarta el plan guardado (la próxima instalación comprobará todo)"""
+    try:
+        install_plan_path(version).unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,85 @@
+"""
+Estado de la instalación, separado del downloader para poder consultarlo sin
+importar la pila de descargas (requests, aiohttp)
+"""
+
+from src.config.constants import (
+    ASSETS_DIR,
+    DEFAULT_GAME_VERSION,
+    GAME_DIR,
+    LIBRARIES_DIR,
+)
+from src.config.game_version import (
+    client_jar_path,
+    manifest_path,
+    natives_dir,
+    version_dir,
+)
+from src.utils.logging import log
+
+# Archivos de la instalación de una sola versión (antes de versions/), y su destino
+LEGACY_FILES = [
+    (GAME_DIR / "client.jar", client_jar_path),
+    (GAME_DIR / "manifest" / f"{DEFAULT_GAME_VERSION}.json", manifest_path),
+    (GAME_DIR / "natives", natives_dir),
+]
+# Archivos antiguos que describen rutas que ya no existen: se regeneran
+LEGACY_DISCARDED = [GAME_DIR / "install_plan.json", GAME_DIR / "launch_profile.json"]
+
+_download_complete = False
+
+
+def is_download_complete():
+    """Retorna si la descarga está completa"""
+    return _download_complete
+
+
+def set_download_complete(value):
+    """Establece el estado de la descarga"""
+    global _download_complete
+    _download_complete = value
+
+
+def migrate_legacy_install():
+    """Mueve una instalación anterior a versions/ (era siempre la versión por defecto)"""
+    if not (GAME_DIR / "client.jar").exists():
+        return False
+    if version_dir(DEFAULT_GAME_VERSION).exists():
+        return False
+
+    try:
+        version_dir(DEFAULT_GAME_VERSION).mkdir(parents=True, exist_ok=True)
+        for legacy_path, new_path in LEGACY_FILES:
+            if legacy_path.exists():
+                legacy_path.replace(new_path(DEFAULT_GAME_VERSION))
+        for legacy_path in LEGACY_DISCARDED:
+            legacy_path.unlink(missing_ok=True)
+    except OSError as e:
+        log(f"Error al migrar la instalación a versions/: {e}", error=True)
+        return False
+
+    try:
+        (GAME_DIR / "manifest").rmdir()
+    except OSError:
+        pass  # La carpeta puede contener otros archivos
+
+    log(f"Instalación anterior movida a versions/{DEFAULT_GAME_VERSION}")
+    return True
+
+
+def is_version_installed(version=None):
+    """Indica si existen los archivos principales de una versión"""
+    return (
+        client_jar_path(version).exists()
+        and manifest_path(version).exists()
+        and LIBRARIES_DIR.exists()
+        and ASSETS_DIR.exists()
+    )
+
+
+def detect_existing_install():
+    """Marca si la versión seleccionada ya está instalada"""
+    migrate_legacy_install()
+    installed = is_version_installed()
+    set_download_complete(installed)
+    return installed
@@ -0,0 +1,52 @@
+"""
+Comprobación de una instalación existente sin descargar ni modificar nada
+"""
+
+import json
+import queue
+
+from src.config.game_version import client_jar_path, get_game_version, manifest_path
+from src.config.settings import get_setting
+from src.downloader.planner import asset_index_path, plan_install_tasks
+from src.downloader.verifier import run_verification_stage, set_deep_verify
+from src.utils.logging import log
+
+
+def check_installation(deep=False, workers=None, version=None):
+    """Comprueba todos los archivos de la instalación de una versión (la seleccionada)
+
+    Devuelve (comprobados, rutas con problemas), o None si no hay instalación que
+    comprobar (falta el manifest o el índice de assets).
+    """
+    version = version or get_game_version()
+    try:
+        with open(manifest_path(version), "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        log(f"No hay una instalación que comprobar: {e}", error=True)
+        return None
+
+    if not asset_index_path(manifest).exists():
+        log("Falta el índice de assets de la instalación", error=True)
+        return None
+
+    try:
+        tasks = plan_install_tasks(
+            manifest, get_setting("graphics_quality", "high"), client_jar_path(version)
+        )
+    except (ValueError, OSError, KeyError) as e:
+        log(f"Error al leer el asset index: {e}", error=True)
+        return None
+
+    set_deep_verify(deep)
+    problems_queue = queue.Queue()
+    run_verification_stage(tasks, problems_queue, workers, restore=False)
+
+    problems = []
+    while (task := problems_queue.get()) is not None:
+        problems.append(str(task[1]))
+    log(
+        f"Comprobación de la instalación: {len(problems)} de {len(tasks)} archivos "
+        "faltan o están dañados"
+    )
+    return len(tasks), problems
@@ -0,0 +1,219 @@
+"""
+Extracción de natives: en paralelo entre JAR, con bloqueo solo por archivo de destino
+y omitiendo las entradas que ya están en disco con el mismo tamaño y CRC
+"""
+
+import os
+import platform
+import tempfile
+import threading
+import time
+import zipfile
+import zlib
+
+from src.config.constants import OS_NAME
+from src.config.game_version import natives_dir
+from src.utils.events import elapsed_ms, emit_event
+from src.utils.logging import log
+
+# Extensiones de las librerías nativas que se extraen en cada sistema
+NATIVE_EXTENSIONS = {
+    "windows": (".dll",),
+    "linux": (".so",),
+    "darwin": (".dylib", ".jnilib"),
+}
+# Tamaño de los bloques al calcular el CRC de un archivo ya extraído
+CRC_BUFFER_SIZE = 1024 * 1024
+
+# Carpeta de destino de la instalación en curso (None: la versión seleccionada)
+_natives_dir = None
+
+# Un lock por archivo de destino: solo se serializan los JAR que escriben lo mismo
+_path_locks = {}
+_path_locks_lock = threading.Lock()
+
+
+def set_natives_dir(path):
+    """Fija la carpeta donde se extraen las natives de la instalación en curso"""
+    global _natives_dir
+    _natives_dir = path
+
+
+def get_natives_dir():
+    """Carpeta donde se extraen las natives"""
+    return _natives_dir or natives_dir()
+
+
+def _path_lock(path):
+    """Lock asociado a una ruta de destino"""
+    key = os.path.normcase(os.path.abspath(path))
+    with _path_locks_lock:
+        lock = _path_locks.get(key)
+        if lock is None:
+            lock = threading.Lock()
+            _path_locks[key] = lock
+        return lock
+
+
+def is_native_entry(name):
+    """Indica si una entrada del JAR es una librería nativa de este sistema"""
+    if name.startswith("META-INF/") or name.endswith("/"):
+        return False
+    extensions = NATIVE_EXTENSIONS.get(OS_NAME)
+    if extensions is None:
+        return True  # Sistema desconocido: extraer todo como antes
+    return name.lower().endswith(extensions)
+
+
+def _file_crc32(path):
+    """CRC32 de un archivo en disco"""
+    crc = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(CRC_BUFFER_SIZE):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def _is_up_to_date(target, info):
+    """Indica si target ya tiene el tamaño y el CRC de la entrada del JAR"""
+    try:
+        if os.path.getsize(target) != info.file_size:
+            return False
+        return _file_crc32(target) == info.CRC
+    except OSError:
+        return False
+
+
+def _extract_entry(jar, info, target):
+    """Extrae una entrada en target de forma atómica (archivo temporal y renombrado)"""
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".ll_")
+    try:
+        with os.fdopen(fd, "wb") as out, jar.open(info) as src:
+            while chunk := src.read(CRC_BUFFER_SIZE):
+                out.write(chunk)
+        os.replace(temp_name, target)
+    except BaseException:
+        try:
+            os.unlink(temp_name)
+        except OSError:
+            pass
+        raise
+
+
+def extract_natives(jar_path):
+    """Extrae las librerías nativas de un JAR (solo las que faltan o han cambiado)"""
+    start = time.perf_counter()
+    try:
+        extracted = 0
+        skipped = 0
+        natives_root = os.path.abspath(get_natives_dir())
+        with zipfile.ZipFile(jar_path, "r") as jar:
+            for info in jar.infolist():
+                if not is_native_entry(info.filename):
+                    continue
+
+                # Evitar rutas que escapen del directorio de natives
+                target = os.path.abspath(os.path.join(natives_root, info.filename))
+                if os.path.commonpath([natives_root, target]) != natives_root:
+                    log(
+                        f"Entrada insegura en {jar_path.name}: {info.filename}",
+                        error=True,
+                    )
+                    continue
+
+                with _path_lock(target):
+                    if _is_up_to_date(target, info):
+                        skipped += 1
+                        continue
+                    _extract_entry(jar, info, target)
+                    extracted += 1
+
+        log(
+            f"Extraído {jar_path.name} en {natives_root} "
+            f"({extracted} extraídos, {skipped} sin cambios)"
+        )
+        emit_event(
+            "extract",
+            file=jar_path.name,
+            entries=extracted,
+            skipped=skipped,
+            duration_ms=elapsed_ms(start),
+        )
+        return True
+    except zipfile.BadZipFile:
+        log(f"Error: {jar_path} no es un archivo ZIP válido.", error=True)
+        return False
+    except PermissionError:
+        log(f"Error de permisos al extraer {jar_path}", error=True)
+        return False
+    except Exception as e:
+        log(
+            f"Error inesperado al extraer {jar_path}: {e.__class__.__name__}: {e}",
+            error=True,
+        )
+        return False
+
+
+def extract_native_if_compatible(path):
+    """Extrae un JAR de natives solo si corresponde al SO (y arquitectura) actual"""
+    # Determinar a qué SO corresponde esta native
+    native_so_markers = {
+        "windows": [
+            "natives-windows",
+            "natives-windows-x86",
+            "natives-windows-arm64",
+        ],
+        "linux": ["natives-linux"],
+        "darwin": [
+            "natives-osx",
+            "natives-macos",
+            "natives-macos-arm64",
+            "natives-macos-patch",
+        ],
+        "macos": [
+            "natives-osx",
+            "natives-macos",
+            "natives-macos-arm64",
+            "natives-macos-patch",
+        ],
+        "macosx": [
+            "natives-osx",
+            "natives-macos",
+            "natives-macos-arm64",
+            "natives-macos-patch",
+        ],
+    }
+
+    # Extracción selectiva de natives según el SO
+    path_str = str(path).lower()
+    current_os_markers = native_so_markers.get(OS_NAME, [])
+
+    # Verificar si alguno de los marcadores del SO actual está en la ruta
+    is_compatible = any(marker in path_str for marker in current_os_markers)
+
+    # En macOS ARM, priorizar natives-macos-arm64 sobre natives-macos
+    if OS_NAME in ["darwin", "macos", "macosx"] and platform.machine() == "arm64":
+        if "natives-macos-arm64" in path_str:
+            is_compatible = True
+            log(f"Extrayendo native ARM64 para {OS_NAME}: {path.name}")
+            extract_natives(path)
+        elif any(
+            marker in path_str
+            for marker in [
+                "natives-macos",
+                "natives-osx",
+                "natives-macos-patch",
+            ]
+        ):
+            # En ARM64, también extraemos versiones normales de macOS para compatibilidad
+            is_compatible = True
+            log(f"Extrayendo native compatible para {OS_NAME} ARM64: {path.name}")
+            extract_natives(path)
+    # Para el resto de configuraciones, usar el marcador estándar
+    elif is_compatible:
+        log(f"Extrayendo native para {OS_NAME}: {path.name}")
+        extract_natives(path)
+    elif "-natives-" in path_str:
+        # Es una native pero de otro SO, no la extraemos
+        log(f"Omitiendo extracción de native no compatible: {path.name}")
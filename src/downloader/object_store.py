@@ -0,0 +1,199 @@
+"""
+Almacén de objetos direccionado por contenido (SHA1) compartido entre instalaciones
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+
+from src.config.constants import OS_NAME, SHARED_STORE_DIR
+from src.downloader.verify_cache import record_verified
+from src.utils.io import existing_parent
+from src.utils.logging import log
+
+# ioctl de Linux para clonar un archivo (reflink) en btrfs, XFS, etc.
+FICLONE = 0x40049409
+
+# Se activa al comenzar cada descarga según la configuración
+store_enabled = False
+# El aviso de que no se pueden crear enlaces duros hacia el almacén sale una sola vez
+_link_warning_shown = False
+_warning_lock = threading.Lock()
+
+
+def set_store_enabled(value):
+    """Activa o desactiva el uso del almacén compartido"""
+    global store_enabled
+    store_enabled = bool(value)
+
+
+def get_store_path(sha1):
+    """Ruta de un objeto dentro del almacén compartido"""
+    return SHARED_STORE_DIR / sha1[:2] / sha1
+
+
+def shares_filesystem(path):
+    """Indica si el almacén está en el mismo sistema de archivos que path (enlazable)"""
+    try:
+        return os.stat(existing_parent(SHARED_STORE_DIR)).st_dev == (
+            os.stat(existing_parent(path)).st_dev
+        )
+    except OSError:
+        return False
+
+
+def has_object(sha1):
+    """Indica si el almacén (activado) ya contiene el objeto"""
+    return store_enabled and bool(sha1) and get_store_path(sha1).exists()
+
+
+def _clone_file(src, dst):
+    """Copia un archivo usando reflink si el sistema de archivos lo permite"""
+    if OS_NAME == "linux":
+        try:
+            import fcntl
+
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return
+        except OSError:
+            pass  # Sin soporte de reflink: copia normal
+    shutil.copyfile(src, dst)
+
+
+def _place_file(src, dst, link_only=False):
+    """Coloca src en dst con enlace duro, o reflink/copia si no es posible (atómico)
+
+    Con link_only=True solo se admite el enlace duro (el error se propaga).
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=dst.parent, prefix=".ll_")
+    os.close(fd)
+    os.unlink(temp_name)
+    try:
+        try:
+            os.link(src, temp_name)
+        except OSError:
+            if link_only:
+                raise
+            # Distinto sistema de archivos o sin soporte de enlaces duros
+            _clone_file(src, temp_name)
+        os.replace(temp_name, dst)
+    except OSError:
+        try:
+            os.unlink(temp_name)
+        except OSError:
+            pass
+        raise
+
+
+def link_from_store(dest, sha1, expected_size=None):
+    """Enlaza un objeto del almacén en dest si existe. Devuelve True si se colocó"""
+    if not store_enabled or not sha1:
+        return False
+
+    # Importación diferida: verifier depende de este módulo
+    from src.downloader.verifier import verify_file_hash
+
+    store_path = get_store_path(sha1)
+    try:
+        # stat también descarta enseguida los objetos que no están en el almacén
+        size = store_path.stat().st_size
+        if expected_size and size != expected_size:
+            return False
+        # Un objeto enlazado comparte inodo con las instalaciones: si alguna lo
+        # modificó, el almacén también está dañado y no debe reutilizarse
+        if not verify_file_hash(store_path, sha1):
+            _evict(store_path)
+            return False
+        _place_file(store_path, dest)
+        log(
+            f"Reutilizado del almacén compartido: {dest.name}",
+            console_output=False,
+            debug=True,
+        )
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        log(f"No se pudo reutilizar {sha1} del almacén: {e}", console_output=False)
+        return False
+
+
+def _evict(store_path):
+    """Elimina del almacén un objeto cuyo contenido no coincide con su hash"""
+    log(
+        f"Objeto dañado en el almacén compartido, se descargará de nuevo: {store_path.name}",
+        error=True,
+        console_output=False,
+    )
+    try:
+        store_path.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        log(f"No se pudo eliminar {store_path} del almacén: {e}", error=True)
+
+
+def add_to_store(path, sha1):
+    """Añade al almacén un archivo ya verificado (si todavía no está)"""
+    if not store_enabled or not sha1:
+        return
+
+    store_path = get_store_path(sha1)
+    if store_path.exists():
+        return
+    # Solo enlaces duros: una copia ocuparía el doble de disco sin ahorrar nada, y
+    # el número de enlaces es lo que usa prune_store para saber si un objeto se usa
+    try:
+        _place_file(path, store_path, link_only=True)
+    except OSError as e:
+        _warn_link_failed(e)
+        return
+    # El archivo ya se verificó: no hace falta recalcular el hash al reutilizarlo
+    record_verified(store_path, sha1)
+
+
+def _warn_link_failed(error):
+    """Registra (una sola vez) que el almacén no puede enlazar los archivos instalados"""
+    global _link_warning_shown
+
+    with _warning_lock:
+        if _link_warning_shown:
+            return
+        _link_warning_shown = True
+    log(
+        f"No se pueden crear enlaces duros en el almacén compartido ({SHARED_STORE_DIR}): "
+        f"los archivos no se compartirán. {error}",
+        console_output=False,
+    )
+
+
+def prune_store():
+    """Elimina los objetos que ya no usa ninguna instalación. Devuelve (objetos, bytes)"""
+    removed = 0
+    freed = 0
+
+    if not SHARED_STORE_DIR.exists():
+        return removed, freed
+
+    # El número de enlaces duros actúa como contador de referencias: un objeto
+    # con un solo enlace solo existe en el almacén y nadie lo está usando
+    for subdir in SHARED_STORE_DIR.iterdir():
+        if not subdir.is_dir():
+            continue
+        for object_path in subdir.iterdir():
+            try:
+                st = object_path.stat()
+                if st.st_nlink <= 1:
+                    object_path.unlink()
+                    removed += 1
+                    freed += st.st_size
+            except OSError as e:
+                log(f"Error al limpiar {object_path}: {e}", error=True)
+
+    log(
+        f"Almacén compartido: eliminados {removed} objetos sin uso ({freed / 1048576:.1f} MB)"
+    )
+    return removed, freed
@@ -0,0 +1,69 @@
+"""
+Descargas parciales reanudables: archivos .part, cabecera Range y renombrado atómico
+"""
+
+import hashlib
+import os
+
+from src.downloader.verifier import HASH_BUFFER_SIZE
+from src.utils.logging import log
+
+PART_SUFFIX = ".part"
+
+# Código HTTP cuando el rango pedido ya no es válido (p. ej. el .part está completo)
+RANGE_NOT_SATISFIABLE = 416
+
+
+def get_part_path(dest):
+    """Obtiene la ruta del archivo parcial asociado a un destino"""
+    return dest.with_name(dest.name + PART_SUFFIX)
+
+
+def prepare_partial(dest, expected_hash):
+    """Prepara la reanudación y devuelve (ruta .part, bytes ya descargados, sha1 parcial)"""
+    part_path = get_part_path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    sha1_hash = hashlib.sha1()
+
+    if not part_path.exists():
+        return part_path, 0, sha1_hash
+
+    # Solo se reanuda si hay hash esperado, para poder validar el resultado final
+    if not expected_hash:
+        part_path.unlink()
+        return part_path, 0, sha1_hash
+
+    # Recalcular el hash del prefijo ya descargado para continuar en streaming
+    offset = 0
+    with open(part_path, "rb") as f:
+        while chunk := f.read(HASH_BUFFER_SIZE):
+            sha1_hash.update(chunk)
+            offset += len(chunk)
+
+    if offset:
+        log(
+            f"Reanudando {dest.name} desde {offset} bytes",
+            console_output=False,
+            debug=True,
+        )
+    return part_path, offset, sha1_hash
+
+
+def range_headers(offset):
+    """Cabeceras HTTP para pedir el resto de un archivo a partir de offset"""
+    return {"Range": f"bytes={offset}-"} if offset else {}
+
+
+def finalize_partial(part_path, dest, sha1_hash, expected_hash):
+    """Verifica el .part y lo renombra atómicamente al destino si el hash coincide"""
+    if expected_hash and expected_hash != sha1_hash.hexdigest():
+        log(f"Error de verificación para {dest.name} (hash no coincide)", error=True)
+        # Un .part corrupto no sirve para reanudar: descartarlo
+        try:
+            part_path.unlink()
+        except OSError:
+            pass
+        return False
+
+    os.replace(part_path, dest)
+    return True
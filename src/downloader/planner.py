@@ -0,0 +1,257 @@
+"""
+Planificación de la instalación: tareas de descarga a partir de los manifests y
+comprobación previa del espacio en disco
+"""
+
+import json
+import re
+import shutil
+
+from src.config.constants import (
+    ASSETS_DIR,
+    BASE_DIR,
+    LIBRARIES_DIR,
+    OS_NAME,
+    RESOURCES_URL,
+)
+from src.downloader.asset_filter import select_assets
+from src.downloader.object_store import has_object
+from src.downloader.partial import get_part_path
+from src.utils.io import existing_parent
+from src.utils.logging import log
+
+# Margen de seguridad que se deja libre además de lo que se va a descargar
+DISK_SPACE_MARGIN = 256 * 1024 * 1024
+# Tamaño de los bloques leídos al recorrer el índice de assets
+INDEX_CHUNK_SIZE = 64 * 1024
+
+_OBJECTS_KEY = re.compile(r'"objects"\s*:\s*\{')
+_WHITESPACE = re.compile(r"[\s,]*")
+
+
+def plan_client_task(manifest, client_jar):
+    """Tarea de descarga de client.jar (en client_jar) según el manifest"""
+    client_info = manifest["downloads"]["client"]
+    return (
+        client_info["url"],
+        client_jar,
+        client_info["sha1"],
+        client_info.get("size", 0),
+    )
+
+
+def plan_library_tasks(manifest):
+    """Tareas de descarga de las librerías (y natives) necesarias para este sistema"""
+    tasks = []
+    log(f"Sistema operativo detectado: {OS_NAME}")
+
+    libraries = manifest.get("libraries", [])
+
+    # Definir mapeo de sistemas operativos para filtrado
+    os_mapping = {
+        "windows": ["windows", "win"],
+        "linux": ["linux", "unix"],
+        "darwin": ["osx", "mac", "macos", "darwin"],
+    }
+
+    current_os_aliases = os_mapping.get(OS_NAME, [OS_NAME])
+    log(f"Filtrando bibliotecas para: {current_os_aliases}")
+
+    for lib in libraries:
+        # Verificar reglas de inclusión/exclusión
+        should_include = True
+        if "rules" in lib:
+            should_include = False  # Default para bibliotecas con reglas
+            for rule in lib.get("rules", []):
+                action = rule.get("action", "allow") == "allow"
+
+                # Verificar regla específica de SO
+                if "os" in rule:
+                    os_rule = rule["os"]
+                    os_name = os_rule.get("name", "").lower()
+
+                    # Comprobar si la regla aplica al SO actual
+                    if any(alias == os_name for alias in current_os_aliases):
+                        should_include = action
+                        break
+                else:
+                    # Regla general
+                    should_include = action
+
+        # Si la biblioteca debe excluirse, saltarla
+        if not should_include:
+            lib_name = lib.get("name", "Desconocida")
+            log(f"Omitiendo biblioteca no requerida: {lib_name}", debug=True)
+            continue
+
+        downloads = lib.get("downloads", {})
+
+        # Librería normal
+        if "artifact" in downloads:
+            artifact = downloads["artifact"]
+            url = artifact["url"]
+            path = LIBRARIES_DIR / artifact["path"]
+            # Incluir el SHA1 para verificación
+            sha1 = artifact.get("sha1")
+            tasks.append((url, path, sha1, artifact.get("size", 0)))
+
+        # Librería native (si aplica)
+        classifiers = downloads.get("classifiers", {})
+        native_key = None
+        if OS_NAME == "windows":
+            native_key = "natives-windows"
+        elif OS_NAME == "linux":
+            native_key = "natives-linux"
+        elif OS_NAME == "darwin":
+            native_key = "natives-osx"
+
+        # Solo descargar natives para el SO actual
+        if native_key and native_key in classifiers:
+            native = classifiers[native_key]
+            url = native["url"]
+            path = LIBRARIES_DIR / native["path"]
+            sha1 = native.get("sha1")
+            # Se extraerá después de descargarse (si no es válida en disco)
+            tasks.append((url, path, sha1, native.get("size", 0)))
+        # IMPORTANTE: No descargar ni siquiera las natives para otros sistemas
+
+    return tasks
+
+
+def iter_asset_objects(index_path):
+    """Recorre los objetos (nombre, datos) de un índice de assets sin cargarlo entero"""
+    decoder = json.JSONDecoder()
+
+    with open(index_path, "r", encoding="utf-8") as f:
+        buffer = ""
+        eof = False
+
+        def read_more():
+            nonlocal buffer, eof
+            chunk = f.read(INDEX_CHUNK_SIZE)
+            eof = not chunk
+            buffer += chunk
+
+        # Avanzar hasta el inicio del mapa "objects"
+        while True:
+            match = _OBJECTS_KEY.search(buffer)
+            if match:
+                buffer = buffer[match.end() :]
+                break
+            if eof:
+                raise ValueError("el índice de assets no contiene 'objects'")
+            read_more()
+
+        # Decodificar una entrada "nombre": {...} cada vez
+        pos = 0
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer) and buffer[pos] == "}":
+                return
+            try:
+                name, end = decoder.raw_decode(buffer, pos)
+                end = _WHITESPACE.match(buffer, end).end()
+                if end >= len(buffer) or buffer[end] != ":":
+                    raise json.JSONDecodeError("se esperaba ':'", buffer, end)
+                end = _WHITESPACE.match(buffer, end + 1).end()
+                info, end = decoder.raw_decode(buffer, end)
+            except json.JSONDecodeError:
+                # Entrada cortada al final del bloque: leer más y reintentar
+                if eof:
+                    raise ValueError("índice de assets incompleto o mal formado")
+                buffer = buffer[pos:]
+                pos = 0
+                read_more()
+                continue
+            yield name, info
+            pos = end
+
+
+def plan_asset_tasks(asset_objects, graphics_quality, index_id=None):
+    """Tareas de descarga de assets filtradas por calidad. Devuelve (tareas, bytes omitidos)
+
+    asset_objects son los pares (nombre, datos) del índice, p. ej. de iter_asset_objects.
+    """
+    selection = select_assets(asset_objects, graphics_quality, index_id)
+
+    tasks = []
+    for hash_value, size in selection["selected"]:
+        subdir = hash_value[:2]
+        asset_url = f"{RESOURCES_URL}/{subdir}/{hash_value}"
+        asset_path = ASSETS_DIR / "objects" / subdir / hash_value
+
+        tasks.append((asset_url, asset_path, hash_value, size))
+
+    for category, asset_name in selection["skipped"]:
+        log(f"Omitiendo asset [{category}]: {asset_name}", debug=True)
+
+    # Mostrar estadísticas de filtrado
+    skipped_bytes = selection["skipped_bytes"]
+    log(
+        f"Assets seleccionados: {len(selection['selected'])}, "
+        f"Omitidos: {len(selection['skipped'])}"
+    )
+    for category, stats in selection["categories"].items():
+        if stats["total"] > 0:
+            percentage = (stats["skipped"] / stats["total"]) * 100
+            log(
+                f"  {category}: {stats['skipped']}/{stats['total']} omitidos ({percentage:.1f}%)"
+            )
+
+    log(f"Espacio ahorrado por los assets omitidos: {skipped_bytes / 1048576:.1f} MB")
+
+    return tasks, skipped_bytes
+
+
+def asset_index_path(manifest):
+    """Ruta local del índice de assets que indica el manifest"""
+    return ASSETS_DIR / "indexes" / f"{manifest['assetIndex']['id']}.json"
+
+
+def plan_install_tasks(manifest, graphics_quality, client_jar):
+    """Todas las tareas de una instalación: client.jar, librerías, natives y assets
+
+    El índice de assets debe estar ya descargado; se recorre en streaming (y ni
+    siquiera se lee si la selección de ese índice ya está memorizada).
+    """
+    asset_index = manifest["assetIndex"]
+    tasks = [plan_client_task(manifest, client_jar)]
+    tasks.extend(plan_library_tasks(manifest))
+    asset_tasks, _ = plan_asset_tasks(
+        iter_asset_objects(asset_index_path(manifest)),
+        graphics_quality,
+        asset_index.get("sha1") or asset_index["id"],
+    )
+    tasks.extend(asset_tasks)
+    return tasks
+
+
+def estimate_download_size(tasks):
+    """Calcula (bytes totales, bytes que faltan por descargar) sin leer los archivos"""
+    total = 0
+    missing = 0
+
+    for url, path, sha1, size in tasks:
+        size = size or 0
+        total += size
+        try:
+            if path.stat().st_size == size:
+                continue  # Presente en disco: el hash se comprobará después
+        except OSError:
+            pass
+        if has_object(sha1):
+            continue  # Se enlazará desde el almacén compartido
+        try:
+            # Lo que ya hay en el .part no se vuelve a descargar
+            size -= min(size, get_part_path(path).stat().st_size)
+        except OSError:
+            pass
+        missing += size
+
+    return total, missing
+
+
+def check_disk_space(required_bytes, path=BASE_DIR):
+    """Comprueba si caben required_bytes (más el margen). Devuelve (suficiente, libres)"""
+    free = shutil.disk_usage(existing_parent(path)).free
+    return free >= required_bytes + DISK_SPACE_MARGIN, free
@@ -0,0 +1,305 @@
+"""
+Progreso de las descargas: los workers publican en contadores propios (sin locks en
+la ruta caliente) y un único hilo los agrega y los entrega a la salida elegida
+(Rich, texto, JSON o ninguna)
+"""
+
+import collections
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from src.utils.logging import log
+
+# Salidas de progreso disponibles (ajuste progress_display)
+PROGRESS_DISPLAYS = ["rich", "plain", "json", "none"]
+# Segundos de descargas recientes con los que se calcula la velocidad
+RATE_WINDOW = 5.0
+
+# Posiciones de los contadores de cada hilo publicador
+_BYTES = 0
+_FILES = 1
+_QUEUED = 2
+_QUEUED_BYTES = 3
+_ACTIVE = 4
+_CURRENT = 5
+_GENERATION = 6
+
+# Un contador por hilo: solo su hilo lo modifica, así que no hace falta lock;
+# el lock solo se toma al registrar un hilo nuevo y al leer la lista
+_slots = []
+_slots_lock = threading.Lock()
+_local = threading.local()
+# Cambia en cada reinicio para que los hilos descarten sus contadores viejos
+_generation = 0
+_start_time = 0.0
+
+
+def _slot():
+    """Contadores del hilo actual, registrándolos la primera vez"""
+    slot = getattr(_local, "slot", None)
+    if slot is None or slot[_GENERATION] != _generation:
+        slot = [0, 0, 0, 0, 0, None, _generation]
+        with _slots_lock:
+            _slots.append(slot)
+        _local.slot = slot
+    return slot
+
+
+def reset_progress():
+    """Empieza a medir desde cero (descarta lo publicado hasta ahora)"""
+    global _generation, _start_time
+
+    with _slots_lock:
+        _generation += 1
+        _slots.clear()
+        _start_time = time.monotonic()
+
+
+def add_pending(size=0):
+    """Suma una descarga pendiente al total (el total crece durante la verificación)"""
+    slot = _slot()
+    slot[_QUEUED] += 1
+    slot[_QUEUED_BYTES] += size
+
+
+def add_bytes(count):
+    """Suma (o descuenta, si es negativo) bytes descargados"""
+    _slot()[_BYTES] += count
+
+
+def start_file(name):
+    """Indica el archivo que empieza a procesar este worker"""
+    slot = _slot()
+    slot[_ACTIVE] += 1
+    slot[_CURRENT] = name
+
+
+def finish_file(done=True):
+    """Indica que el worker terminó su archivo (done=False si falló)"""
+    slot = _slot()
+    slot[_ACTIVE] = max(0, slot[_ACTIVE] - 1)
+    if not slot[_ACTIVE]:
+        slot[_CURRENT] = None
+    if done:
+        slot[_FILES] += 1
+
+
+def get_progress():
+    """Progreso agregado de todos los workers (la velocidad es la media desde el inicio)"""
+    with _slots_lock:
+        slots = [list(slot) for slot in _slots]
+        start = _start_time
+
+    elapsed = time.monotonic() - start if start else 0.0
+    done_bytes = max(0, sum(slot[_BYTES] for slot in slots))
+    return {
+        "files": sum(slot[_FILES] for slot in slots),
+        "total_files": sum(slot[_QUEUED] for slot in slots),
+        "bytes": done_bytes,
+        "total_bytes": sum(slot[_QUEUED_BYTES] for slot in slots),
+        "elapsed": elapsed,
+        "rate_bps": int(done_bytes / elapsed) if elapsed > 0 else 0,
+        "active": sum(slot[_ACTIVE] for slot in slots),
+        "current": [slot[_CURRENT] for slot in slots if slot[_CURRENT]],
+    }
+
+
+def _with_eta(stats, rate_bps):
+    """Añade la velocidad reciente y el tiempo restante estimado"""
+    stats["rate_bps"] = int(rate_bps)
+    remaining = max(0, stats["total_bytes"] - stats["bytes"])
+    stats["eta_s"] = int(remaining / rate_bps) if rate_bps > 0 else None
+    return stats
+
+
+def format_transfer(stats):
+    """Texto con archivos, bytes, velocidad y tiempo restante"""
+    text = f"{stats['files']}/{stats['total_files']} archivos, "
+    text += f"{stats['bytes'] / 1048576:.1f}/{stats['total_bytes'] / 1048576:.1f} MB"
+    if stats["rate_bps"]:
+        text += f", {stats['rate_bps'] / 1048576:.1f} MB/s"
+    if stats.get("eta_s") is not None:
+        text += f", ETA {stats['eta_s'] // 60}:{stats['eta_s'] % 60:02d}"
+    return text
+
+
+class PlainProgressSink:
+    """Una línea de texto por informe (para registros y terminales sin formato)"""
+
+    interval = 1.0
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def update(self, stats):
+        if stats["total_files"]:
+            print(
+                f"[progreso] {format_transfer(stats)}",
+                file=self.stream or sys.stdout,
+                flush=True,
+            )
+
+    def close(self, stats):
+        self.update(stats)
+
+
+class JsonProgressSink:
+    """Un evento JSON por línea con el mismo formato que la línea de comandos"""
+
+    interval = 1.0
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def update(self, stats):
+        if not stats["total_files"]:
+            return
+        stream = self.stream or sys.stdout
+        event = {"event": "progress"}
+        event.update(
+            (key, stats[key])
+            for key in (
+                "files",
+                "total_files",
+                "bytes",
+                "total_bytes",
+                "rate_bps",
+                "eta_s",
+                "active",
+            )
+        )
+        stream.write(json.dumps(event) + "\n")
+        stream.flush()
+
+    def close(self, stats):
+        self.update(stats)
+
+
+class RichProgressSink:
+    """Barra de progreso de Rich con el archivo actual de los workers"""
+
+    interval = 0.1
+
+    def __init__(self, console=None):
+        # Rich solo se importa si se usa esta salida
+        from rich.console import Console, Group
+        from rich.live import Live
+        from rich.progress import (
+            BarColumn,
+            Progress,
+            SpinnerColumn,
+            TaskProgressColumn,
+            TextColumn,
+        )
+        from rich.text import Text
+
+        self._group = Group
+        self._text = Text
+        self.progress = Progress(
+            SpinnerColumn(spinner_name="dots12"),
+            TextColumn("[cyan]{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            TextColumn("{task.fields[detail]}"),
+        )
+        self.task = self.progress.add_task(
+            "Preparando descarga...", total=None, detail=""
+        )
+        # La pantalla se ocupa con el primer informe, no al crear la salida
+        self.live = Live(
+            self.progress, console=console or Console(), auto_refresh=False
+        )
+
+    def update(self, stats):
+        if not self.live.is_started:
+            self.live.start()
+        if stats["total_files"]:
+            # Progreso por bytes (más fiel que por archivos) si se conocen los tamaños
+            if stats["total_bytes"]:
+                completed, total = stats["bytes"], stats["total_bytes"]
+            else:
+                completed, total = stats["files"], stats["total_files"]
+            self.progress.update(
+                self.task,
+                description="Descargando",
+                completed=min(completed, total),
+                total=total,
+                detail=format_transfer(stats),
+            )
+
+        current = stats["current"]
+        if current:
+            file_text = f"📄 {current[0]}"
+            if stats["active"] > 1:
+                file_text += f" (+{stats['active'] - 1} en curso)"
+            renderable = self._group(self.progress, self._text(file_text))
+        else:
+            renderable = self.progress
+        self.live.update(renderable, refresh=True)
+
+    def close(self, stats):
+        stats["current"] = []
+        self.update(stats)
+        self.live.stop()
+
+
+def create_progress_sink(display, stream=None):
+    """Salida de progreso para display (None si es "none" o no se reconoce)"""
+    if display == "rich":
+        return RichProgressSink()
+    if display == "plain":
+        return PlainProgressSink(stream)
+    if display == "json":
+        return JsonProgressSink(stream)
+    return None
+
+
+@contextmanager
+def report_progress(sink):
+    """Entrega el progreso a sink desde un único hilo mientras dura el bloque"""
+    if sink is None:
+        yield
+        return
+
+    stop = threading.Event()
+    samples = collections.deque()
+
+    def sample():
+        # Velocidad sobre los últimos RATE_WINDOW segundos, no la media desde el inicio
+        stats = get_progress()
+        now = time.monotonic()
+        samples.append((now, stats["bytes"]))
+        while len(samples) > 2 and now - samples[0][0] > RATE_WINDOW:
+            samples.popleft()
+        first_time, first_bytes = samples[0]
+        if now - first_time > 0:
+            rate = max(0, stats["bytes"] - first_bytes) / (now - first_time)
+        else:
+            rate = stats["rate_bps"]
+        return _with_eta(stats, rate)
+
+    def reporter():
+        while not stop.wait(sink.interval):
+            try:
+                sink.update(sample())
+            except Exception as e:
+                # Un fallo al mostrar el progreso no debe afectar a la descarga
+                log(
+                    f"Error al mostrar el progreso: {e}",
+                    error=True,
+                    console_output=False,
+                )
+
+    thread = threading.Thread(target=reporter, name="llauncher-progress", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+        # Informe final con la velocidad media de toda la descarga
+        stats = get_progress()
+        sink.close(_with_eta(stats, stats["rate_bps"]))
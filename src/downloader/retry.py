@@ -0,0 +1,125 @@
+"""
+Planificador de reintentos: backoff exponencial con jitter, Retry-After y reencolado
+"""
+
+import email.utils
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from src.utils.logging import log
+
+# Códigos HTTP que indican un error transitorio
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+# Códigos con los que el servidor puede pedir esperar mediante Retry-After
+THROTTLE_STATUS = {429, 503}
+
+BACKOFF_BASE = 1.0  # Segundos de espera del primer reintento
+BACKOFF_CAP = 60.0  # Espera máxima entre reintentos
+
+# Estado global del planificador
+_host_blocked_until = {}  # host -> instante (monotonic) hasta el que no se debe pedir
+_permanent_failures = set()  # URLs con errores que no se arreglan reintentando
+_scheduled_retries = 0
+_retry_lock = threading.Lock()
+
+
+def reset_retry_state():
+    """Reinicia el estado del planificador al comenzar una nueva descarga"""
+    global _scheduled_retries
+
+    with _retry_lock:
+        _host_blocked_until.clear()
+        _permanent_failures.clear()
+        _scheduled_retries = 0
+
+
+def parse_retry_after(value):
+    """Convierte una cabecera Retry-After (segundos o fecha HTTP) en segundos"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_date = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_date.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def note_http_error(url, status, retry_after=None):
+    """Registra un error HTTP: aplica Retry-After al host o marca el fallo como definitivo"""
+    with _retry_lock:
+        if status in THROTTLE_STATUS:
+            delay = parse_retry_after(retry_after)
+            # Retry-After: 0 también es una indicación válida del servidor
+            if delay is not None:
+                host = urlparse(url).netloc
+                _host_blocked_until[host] = max(
+                    _host_blocked_until.get(host, 0.0), time.monotonic() + delay
+                )
+                log(
+                    f"El servidor {host} pide esperar {delay:.0f}s (HTTP {status})",
+                    console_output=False,
+                )
+        elif status not in RETRYABLE_STATUS and 400 <= status < 500:
+            _permanent_failures.add(url)
+
+
+def is_retryable(url):
+    """Indica si merece la pena reintentar una URL"""
+    with _retry_lock:
+        return url not in _permanent_failures
+
+
+def host_wait_time(url):
+    """Segundos que faltan para poder pedir al host de la URL (0 si no está bloqueado)"""
+    with _retry_lock:
+        blocked_until = _host_blocked_until.get(urlparse(url).netloc, 0.0)
+    return max(0.0, blocked_until - time.monotonic())
+
+
+def wait_for_host(url):
+    """Bloquea el hilo hasta que acabe el Retry-After pedido por el host de la URL"""
+    # Otra respuesta 429/503 puede alargar la espera mientras se duerme
+    while (delay := host_wait_time(url)) > 0:
+        time.sleep(delay)
+
+
+def compute_backoff(url, attempt):
+    """Calcula la espera antes del reintento número attempt (backoff con full jitter)"""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2**attempt)))
+
+    # Respetar el Retry-After que haya enviado el host
+    return max(delay, host_wait_time(url))
+
+
+def schedule_retry(task_queue, task, attempt):
+    """Vuelve a poner una tarea en la cola tras la espera de backoff correspondiente"""
+    global _scheduled_retries
+
+    delay = compute_backoff(task[0], attempt)
+
+    def requeue():
+        global _scheduled_retries
+        # Encolar antes de descontar para que el consumidor nunca vea ambas cosas vacías
+        task_queue.put(task)
+        with _retry_lock:
+            _scheduled_retries -= 1
+
+    with _retry_lock:
+        _scheduled_retries += 1
+
+    timer = threading.Timer(delay, requeue)
+    timer.daemon = True
+    timer.start()
+    return delay
+
+
+def pending_retries():
+    """Número de reintentos programados que aún no han vuelto a la cola"""
+    with _retry_lock:
+        return _scheduled_retries
@@ -0,0 +1,71 @@
+"""
+Planificación de descargas según su tamaño: los archivos grandes primero y los pequeños en lotes
+"""
+
+import heapq
+import itertools
+import queue
+
+# Archivos por debajo de este tamaño se agrupan en lotes para un mismo worker
+SMALL_FILE_THRESHOLD = 64 * 1024
+# Límites de un lote de archivos pequeños
+MAX_BATCH_FILES = 32
+MAX_BATCH_BYTES = 1024 * 1024
+# Tareas verificadas en espera como máximo: la verificación no se adelanta más
+MAX_QUEUED_TASKS = 512
+
+
+def task_size(task):
+    """Tamaño esperado (en bytes) de una tarea (url, path, sha1, size)"""
+    return task[3] or 0
+
+
+class SizePriorityQueue(queue.Queue):
+    """Cola de tareas que entrega primero las más grandes; None (fin) siempre sale el último"""
+
+    def _init(self, maxsize):
+        self.queue = []
+        self._sequence = itertools.count()
+
+    def _qsize(self):
+        return len(self.queue)
+
+    def _put(self, task):
+        priority = float("inf") if task is None else -task_size(task)
+        # La secuencia mantiene el orden de llegada entre tareas del mismo tamaño
+        heapq.heappush(self.queue, (priority, next(self._sequence), task))
+
+    def _get(self):
+        return heapq.heappop(self.queue)[2]
+
+    def put_back(self, task):
+        """Devuelve a la cola una tarea ya sacada, sin esperar aunque esté llena"""
+        with self.mutex:
+            self._put(task)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+
+def sort_largest_first(tasks):
+    """Ordena las tareas de mayor a menor tamaño"""
+    return sorted(tasks, key=task_size, reverse=True)
+
+
+def take_small_batch(first_task, task_queue):
+    """Agrupa en un lote first_task y las siguientes tareas pequeñas de la cola"""
+    batch = [first_task]
+    batch_bytes = task_size(first_task)
+
+    while len(batch) < MAX_BATCH_FILES and batch_bytes < MAX_BATCH_BYTES:
+        try:
+            task = task_queue.get_nowait()
+        except queue.Empty:
+            break
+        if task is None or task_size(task) >= SMALL_FILE_THRESHOLD:
+            # No pertenece al lote: devolverla a la cola (conserva su prioridad)
+            task_queue.put_back(task)
+            break
+        batch.append(task)
+        batch_bytes += task_size(task)
+
+    return batch
@@ -0,0 +1,89 @@
+"""
+Limitador de ancho de banda (token bucket) y de conexiones simultáneas por host
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+from urllib.parse import urlparse
+
+# Estado del limitador de ancho de banda (compartido por todos los workers)
+_rate = 0  # bytes por segundo (0 = sin límite)
+_tokens = 0.0
+_last_refill = 0.0
+_bucket_lock = threading.Lock()
+
+# Semáforos por host para limitar las conexiones simultáneas
+_max_per_host = 0  # 0 = sin límite
+_host_semaphores = {}
+_host_lock = threading.Lock()
+
+
+def configure_throttle(max_bandwidth_kbps=0, max_per_host=0):
+    """Configura el límite global de KB/s y el máximo de conexiones por host"""
+    global _rate, _tokens, _last_refill, _max_per_host
+
+    with _bucket_lock:
+        _rate = max(0, int(max_bandwidth_kbps)) * 1024
+        # Empezar con el cubo lleno permite una ráfaga inicial de un segundo
+        _tokens = float(_rate)
+        _last_refill = time.monotonic()
+
+    with _host_lock:
+        _max_per_host = max(0, int(max_per_host))
+        _host_semaphores.clear()
+
+
+def _reserve(count):
+    """Reserva bytes del cubo y devuelve los segundos que hay que esperar"""
+    global _tokens, _last_refill
+
+    if _rate <= 0:
+        return 0.0
+
+    with _bucket_lock:
+        now = time.monotonic()
+        # Rellenar el cubo según el tiempo transcurrido (capacidad: un segundo)
+        _tokens = min(float(_rate), _tokens + (now - _last_refill) * _rate)
+        _last_refill = now
+        # Los tokens pueden quedar en negativo: la espera salda la deuda
+        _tokens -= count
+        return -_tokens / _rate if _tokens < 0 else 0.0
+
+
+def throttle(count):
+    """Bloquea el hilo lo necesario para respetar el ancho de banda tras leer count bytes"""
+    delay = _reserve(count)
+    if delay > 0:
+        time.sleep(delay)
+
+
+async def throttle_async(count):
+    """Versión asíncrona de throttle para el motor asyncio"""
+    delay = _reserve(count)
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+def get_max_per_host():
+    """Máximo de conexiones simultáneas por host (0 = sin límite)"""
+    return _max_per_host
+
+
+@contextlib.contextmanager
+def host_slot(url):
+    """Ocupa una de las conexiones permitidas para el host de la URL"""
+    if _max_per_host <= 0:
+        yield
+        return
+
+    host = urlparse(url).netloc
+    with _host_lock:
+        semaphore = _host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(_max_per_host)
+            _host_semaphores[host] = semaphore
+
+    with semaphore:
+        yield
@@ -0,0 +1,159 @@
+"""
+Etapa de verificación de integridad en paralelo, previa (y solapada) a las descargas
+"""
+
+import hashlib
+import mmap
+import os
+import threading
+import time
+
+from src.downloader.object_store import link_from_store
+from src.downloader.verify_cache import forget, is_verified, record_verified
+from src.utils.events import elapsed_ms, emit_event, events_enabled
+from src.utils.logging import log
+
+# Tamaño del buffer de lectura para calcular hashes
+HASH_BUFFER_SIZE = 1024 * 1024
+# A partir de este tamaño se usa mmap (p. ej. client.jar)
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+# Si es True se ignora el índice de verificación y se recalcula el hash de todo
+deep_verify = False
+
+
+def set_deep_verify(value):
+    """Activa o desactiva la verificación profunda (ignorar el índice de verificación)"""
+    global deep_verify
+    deep_verify = bool(value)
+
+
+def compute_sha1(file_path):
+    """Calcula el SHA1 de un archivo con buffers grandes, o mmap si es muy grande"""
+    sha1_hash = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            # hashlib libera el GIL, así que varios hilos pueden calcular en paralelo
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                sha1_hash.update(mapped)
+        else:
+            while chunk := f.read(HASH_BUFFER_SIZE):
+                sha1_hash.update(chunk)
+    return sha1_hash.hexdigest()
+
+
+def verify_file_hash(file_path, expected_hash):
+    """Verifica el hash SHA1 de un archivo, usando el índice de verificación si es posible"""
+    start = time.perf_counter()
+
+    # Confiar en el índice si el archivo no cambió desde la última verificación
+    if not deep_verify and is_verified(file_path, expected_hash):
+        _emit_verify(file_path, start, "hit", True)
+        return True
+
+    try:
+        if compute_sha1(file_path) == expected_hash:
+            record_verified(file_path, expected_hash)
+            _emit_verify(file_path, start, "miss", True)
+            return True
+
+        forget(file_path)
+        _emit_verify(file_path, start, "miss", False)
+        return False
+    except Exception as e:
+        log(f"Error al verificar hash de {file_path}: {e}", error=True)
+        return False
+
+
+def _emit_verify(file_path, start, cache, valid):
+    """Registra el evento de una verificación si el registro de eventos está activo"""
+    if events_enabled():
+        duration_ms = elapsed_ms(start)
+        try:
+            size = file_path.stat().st_size
+        except OSError:
+            size = None
+        emit_event(
+            "verify",
+            file=file_path.name,
+            bytes=size,
+            cache=cache,
+            valid=valid,
+            duration_ms=duration_ms,
+        )
+
+
+def needs_download(path, expected_hash):
+    """Indica si un archivo falta o no supera la verificación de integridad"""
+    if not path.exists():
+        return True
+    return bool(expected_hash) and not verify_file_hash(path, expected_hash)
+
+
+def run_verification_stage(
+    candidates, task_queue, workers=None, on_restored=None, restore=True
+):
+    """Verifica candidatos en paralelo, encola los que deben descargarse y termina con None
+
+    Con restore=False no se recupera nada del almacén compartido (solo comprobar).
+    """
+    if workers is None:
+        workers = min(32, (os.cpu_count() or 1) * 2)
+
+    def check(task):
+        _, path, sha1, size = task
+        if not needs_download(path, sha1):
+            return 0
+
+        # Evitar la descarga si el objeto ya está en el almacén compartido
+        if restore and link_from_store(path, sha1, size):
+            record_verified(path, sha1)
+            if on_restored:
+                on_restored(task)
+            return 0
+
+        task_queue.put(task)
+        return 1
+
+    # Cada worker toma el siguiente candidato del iterador compartido: no se crea
+    # un Future por archivo y los candidatos pueden generarse bajo demanda
+    candidates = iter(candidates)
+    checked = 0
+    queued = 0
+    state_lock = threading.Lock()
+
+    def worker():
+        nonlocal checked, queued
+        while True:
+            with state_lock:
+                task = next(candidates, None)
+            if task is None:
+                return
+            try:
+                result = check(task)
+            except Exception as e:
+                # Ante la duda, descargar de nuevo el archivo
+                log(f"Error al verificar {task[1]}: {e}", error=True)
+                task_queue.put(task)
+                result = 1
+            with state_lock:
+                checked += 1
+                queued += result
+
+    try:
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        log(
+            f"Verificación completada: {queued} de {checked} archivos necesitan descarga",
+            console_output=False,
+        )
+    except Exception as e:
+        log(f"Error durante la verificación: {e}", error=True)
+    finally:
+        task_queue.put(None)
+
+    return queued
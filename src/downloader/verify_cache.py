@@ -0,0 +1,101 @@
+"""
+Índice persistente de verificación para evitar recalcular el SHA1 de archivos sin cambios
+"""
+
+import json
+import os
+import threading
+
+from src.config.constants import CACHE_DIR, VERIFY_INDEX_FILE
+from src.utils.logging import log
+
+# Índice en memoria: ruta -> [tamaño, mtime_ns, inodo, sha1]
+_index = None
+_index_dirty = False
+_index_lock = threading.Lock()
+
+
+def _file_signature(path):
+    """Obtiene la firma (tamaño, mtime_ns, inodo) de un archivo"""
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def _load_index():
+    """Carga el índice desde disco (solo la primera vez). Requiere tener el lock"""
+    global _index
+
+    if _index is not None:
+        return _index
+
+    try:
+        with open(VERIFY_INDEX_FILE, "r", encoding="utf-8") as f:
+            _index = json.load(f)
+    except FileNotFoundError:
+        _index = {}
+    except (json.JSONDecodeError, IOError) as e:
+        log(f"Índice de verificación dañado, se reconstruirá: {e}", error=True)
+        _index = {}
+
+    return _index
+
+
+def is_verified(path, expected_hash):
+    """Indica si el archivo ya fue verificado con ese hash y no ha cambiado desde entonces"""
+    try:
+        signature = _file_signature(path)
+    except OSError:
+        return False
+
+    with _index_lock:
+        entry = _load_index().get(str(path))
+
+    return entry is not None and entry[:3] == signature and entry[3] == expected_hash
+
+
+def record_verified(path, sha1):
+    """Registra un archivo como verificado con su firma actual"""
+    global _index_dirty
+
+    try:
+        signature = _file_signature(path)
+    except OSError:
+        return
+
+    with _index_lock:
+        _load_index()[str(path)] = signature + [sha1]
+        _index_dirty = True
+
+
+def forget(path):
+    """Elimina un archivo del índice (por ejemplo, si su hash no coincide)"""
+    global _index_dirty
+
+    with _index_lock:
+        if _load_index().pop(str(path), None) is not None:
+            _index_dirty = True
+
+
+def save_index():
+    """Guarda el índice en disco si hubo cambios, usando escritura atómica"""
+    global _index_dirty
+
+    with _index_lock:
+        if not _index_dirty:
+            return True
+
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            temp_file = VERIFY_INDEX_FILE.with_suffix(".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(_index, f, separators=(",", ":"))
+            temp_file.replace(VERIFY_INDEX_FILE)
+            _index_dirty = False
+            log(
+                f"Índice de verificación guardado ({len(_index)} archivos)",
+                console_output=False,
+            )
+            return True
+        except IOError as e:
+            log(f"Error al guardar el índice de verificación: {e}", error=True)
+            return False
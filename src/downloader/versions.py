@@ -0,0 +1,123 @@
+"""
+Lista de versiones de Mojang (version_manifest_v2): se guarda en caché y permite
+resolver el manifest de cualquier versión para instalarla junto a las demás
+"""
+
+import json
+import time
+
+import requests
+
+from src.config.constants import (
+    CACHE_DIR,
+    MANIFEST_URL,
+    VERSION_MANIFEST_FILE,
+    VERSION_MANIFEST_URL,
+)
+from src.downloader.http_session import get_session, get_timeout
+from src.utils.logging import log
+
+# Segundos que se reutiliza la lista de versiones antes de volver a pedirla
+VERSION_MANIFEST_MAX_AGE = 3600
+# Nombres que se resuelven a la última versión de cada tipo
+VERSION_ALIASES = {"latest": "release", "release": "release", "snapshot": "snapshot"}
+
+
+def _read_cached_manifest():
+    """Lista de versiones guardada en disco (None si no hay o está dañada)"""
+    try:
+        with open(VERSION_MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        log(f"Lista de versiones en caché dañada: {e}", error=True)
+        return None
+
+
+def _save_manifest(data):
+    """Guarda la lista de versiones, usando escritura atómica"""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        temp_file = VERSION_MANIFEST_FILE.with_suffix(".tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        temp_file.replace(VERSION_MANIFEST_FILE)
+    except OSError as e:
+        log(f"Error al guardar la lista de versiones: {e}", error=True)
+
+
+def fetch_version_manifest(refresh=False):
+    """Lista de versiones de Mojang (desde la caché si es reciente). None si no hay"""
+    try:
+        age = time.time() - VERSION_MANIFEST_FILE.stat().st_mtime
+    except OSError:
+        age = None
+
+    if not refresh and age is not None and age < VERSION_MANIFEST_MAX_AGE:
+        cached = _read_cached_manifest()
+        if cached is not None:
+            return cached
+
+    try:
+        with get_session().get(VERSION_MANIFEST_URL, timeout=get_timeout()) as response:
+            response.raise_for_status()
+            data = response.json()
+        if not isinstance(data.get("versions"), list):
+            raise ValueError("sin lista de versiones")
+    except (requests.RequestException, ValueError) as e:
+        # Sin conexión, una lista antigua sigue sirviendo para las versiones publicadas
+        log(f"Error al obtener la lista de versiones: {e}", error=True)
+        return _read_cached_manifest()
+
+    _save_manifest(data)
+    return data
+
+
+def resolve_version_id(version, manifest=None):
+    """Id concreto de una versión ("latest" y "snapshot" son la última de su tipo)"""
+    alias = VERSION_ALIASES.get(version)
+    if alias is None:
+        return version
+
+    manifest = manifest or fetch_version_manifest()
+    if not manifest:
+        return None
+    return manifest.get("latest", {}).get(alias)
+
+
+def find_version(version):
+    """Entrada de una versión en la lista de Mojang (None si no existe)"""
+    manifest = fetch_version_manifest()
+    if not manifest:
+        return None
+
+    version_id = resolve_version_id(version, manifest)
+    for entry in manifest["versions"]:
+        if entry.get("id") == version_id:
+            return entry
+    return None
+
+
+def list_versions(version_type="release"):
+    """Versiones publicadas de un tipo (release, snapshot... o all), de más nueva a más antigua"""
+    manifest = fetch_version_manifest()
+    if not manifest:
+        return []
+    return [
+        entry
+        for entry in manifest["versions"]
+        if version_type == "all" or entry.get("type") == version_type
+    ]
+
+
+def manifest_source(version):
+    """(url, sha1) del manifest de una versión, o None si no se encuentra"""
+    # Un manifest fijo (p. ej. el CDN local de los benchmarks) sirve para cualquier versión
+    if MANIFEST_URL:
+        return MANIFEST_URL, None
+
+    entry = find_version(version)
+    if entry is None:
+        return None
+    return entry["url"], entry.get("sha1")
@@ -1,2 +1,7 @@
-# Exportar funciones principales
-from src.launcher.game_launcher import launch_minecraft
+# Exportar funciones principales (importación diferida, como en src.downloader)
+def __getattr__(name):
+    if name == "launch_minecraft":
+        from src.launcher.game_launcher import launch_minecraft
+
+        return launch_minecraft
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
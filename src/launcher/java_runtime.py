@@ -0,0 +1,385 @@
+"""
+Registro de instalaciones de Java: se descubren una sola vez, sus versiones se
+consultan en paralelo y quedan en caché por ruta y mtime del ejecutable
+"""
+
+import concurrent.futures
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+
+from src.config.constants import CACHE_DIR, JAVA_RUNTIMES_FILE, OS_NAME
+from src.config.game_version import manifest_path
+from src.config.settings import get_setting
+from src.utils.logging import log
+
+# Consultas de versión simultáneas y tiempo máximo de cada una
+PROBE_WORKERS = 8
+JAVA_PROBE_TIMEOUT = 10
+
+# Rutas comunes de instalación según el sistema operativo
+JAVA_PATTERNS = {
+    "windows": [
+        # Instalaciones estándar
+        r"C:\Program Files\Java\jre*\bin\java.exe",
+        r"C:\Program Files\Java\jdk*\bin\java.exe",
+        r"C:\Program Files (x86)\Java\jre*\bin\java.exe",
+        # Instalaciones con winget (OpenJDK)
+        r"C:\Program Files\Eclipse Adoptium\jdk-*\bin\java.exe",
+        r"C:\Program Files\Microsoft\jdk-*\bin\java.exe",
+        r"C:\Program Files\Eclipse Foundation\jdk-*\bin\java.exe",
+        r"C:\Program Files\BellSoft\LibericaJDK-*\bin\java.exe",
+        r"C:\Program Files\Amazon Corretto\*\bin\java.exe",
+        r"C:\Program Files\ojdkbuild\*\bin\java.exe",
+        r"C:\Program Files\Zulu\*\bin\java.exe",
+        # Ubicaciones de AppData (algunas instalaciones de winget las usan)
+        r"C:\Users\*\AppData\Local\Programs\Eclipse Adoptium\jdk-*\bin\java.exe",
+        r"C:\Users\*\AppData\Local\Programs\Microsoft\jdk-*\bin\java.exe",
+    ],
+    "darwin": [
+        # Homebrew paths (más comunes en macOS moderno)
+        "/opt/homebrew/opt/openjdk/bin/java",
+        "/usr/local/opt/openjdk/bin/java",
+        "/opt/homebrew/Cellar/openjdk/*/bin/java",
+        "/usr/local/Cellar/openjdk/*/bin/java",
+        # Rutas de sistema
+        "/Library/Java/JavaVirtualMachines/*/Contents/Home/bin/java",
+        "/System/Library/Frameworks/JavaVM.framework/Versions/*/Commands/java",
+        "/usr/bin/java",
+    ],
+    "linux": [
+        "/usr/bin/java",
+        "/usr/lib/jvm/*/bin/java",
+        "/opt/java/bin/java",
+        # Instalaciones de snap
+        "/snap/*/current/jre/bin/java",
+    ],
+}
+
+# Claves del registro de Windows con instalaciones de Java
+WINDOWS_REGISTRY_KEYS = [
+    r"SOFTWARE\JavaSoft\Java Runtime Environment",
+    r"SOFTWARE\JavaSoft\Java Development Kit",
+    r"SOFTWARE\Eclipse Adoptium",
+    r"SOFTWARE\Microsoft\JDK",
+]
+
+_JAVA_VERSION_PATTERN = re.compile(r'version "([^"]+)"')
+
+# Caché de versiones: ruta real -> {"stamp": [mtime_ns, tamaño], "version": ...}
+_probe_cache = None
+_probe_cache_dirty = False
+_probe_lock = threading.Lock()
+
+# Instalaciones descubiertas (None hasta la primera consulta)
+_runtimes = None
+_discovery_lock = threading.Lock()
+
+
+def parse_java_major(version):
+    """Versión mayor de Java ("1.8.0_292" -> 8, "21.0.2" -> 21)"""
+    numbers = re.findall(r"\d+", version or "")
+    if not numbers:
+        return None
+    major = int(numbers[0])
+    if major == 1 and len(numbers) > 1:
+        major = int(numbers[1])
+    return major
+
+
+def _load_probe_cache():
+    """Carga la caché de versiones desde disco (solo la primera vez). Requiere el lock"""
+    global _probe_cache
+
+    if _probe_cache is not None:
+        return _probe_cache
+
+    try:
+        with open(JAVA_RUNTIMES_FILE, "r", encoding="utf-8") as f:
+            _probe_cache = json.load(f)
+    except FileNotFoundError:
+        _probe_cache = {}
+    except (OSError, ValueError) as e:
+        log(f"Caché de Java dañada, se reconstruirá: {e}", error=True)
+        _probe_cache = {}
+
+    return _probe_cache
+
+
+def _save_probe_cache():
+    """Guarda la caché de versiones si hubo cambios, usando escritura atómica"""
+    global _probe_cache_dirty
+
+    with _probe_lock:
+        if not _probe_cache_dirty:
+            return True
+
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            temp_file = JAVA_RUNTIMES_FILE.with_suffix(".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(_probe_cache, f, indent=2)
+            temp_file.replace(JAVA_RUNTIMES_FILE)
+            _probe_cache_dirty = False
+            return True
+        except OSError as e:
+            log(f"Error al guardar la caché de Java: {e}", error=True)
+            return False
+
+
+def _resolve_binary(java_path):
+    """Ruta real del ejecutable (los nombres sin ruta se buscan en el PATH)"""
+    if not java_path:
+        return None
+    if os.sep not in java_path and "/" not in java_path:
+        java_path = shutil.which(java_path)
+        if not java_path:
+            return None
+    try:
+        resolved = Path(java_path).resolve()
+        return resolved if resolved.is_file() else None
+    except OSError:
+        return None
+
+
+def _run_probe(java_path):
+    """Ejecuta `java -version` y devuelve la versión (None si Java no funciona)"""
+    try:
+        process = subprocess.run(
+            [java_path, "-version"],
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=JAVA_PROBE_TIMEOUT,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        log(f"Error al verificar Java en {java_path}: {e}", error=True)
+        return None
+
+    # La versión se informa generalmente en stderr
+    version_output = (process.stderr or process.stdout or "").strip()
+    if process.returncode != 0:
+        log(f"Error al verificar Java en {java_path}: {version_output}", error=True)
+        return None
+
+    log(
+        f"Java disponible: {version_output.splitlines()[0] if version_output else java_path}",
+        console_output=False,
+    )
+    match = _JAVA_VERSION_PATTERN.search(version_output)
+    return match.group(1) if match else "desconocida"
+
+
+def probe_java(java_path):
+    """Versión de un ejecutable de Java (None si no funciona), en caché por ruta y mtime"""
+    global _probe_cache_dirty
+
+    resolved = _resolve_binary(java_path)
+    if resolved is None:
+        return None
+
+    try:
+        st = resolved.stat()
+    except OSError:
+        return None
+    key = str(resolved)
+    stamp = [st.st_mtime_ns, st.st_size]
+
+    with _probe_lock:
+        entry = _load_probe_cache().get(key)
+    if entry is not None and entry.get("stamp") == stamp:
+        return entry.get("version")
+
+    version = _run_probe(key)
+    with _probe_lock:
+        _load_probe_cache()[key] = {"stamp": stamp, "version": version}
+        _probe_cache_dirty = True
+    _save_probe_cache()
+    return version
+
+
+def _glob_pattern(pattern):
+    """Rutas existentes que coinciden con un patrón (con o sin comodines)"""
+    if "*" not in pattern:
+        return [Path(pattern)] if Path(pattern).exists() else []
+
+    # Determinar la unidad y la ruta base para glob
+    if OS_NAME == "windows" and pattern[1:3] == ":\\":
+        base_path = Path(pattern[:3])
+        glob_pattern = pattern[3:]
+    else:
+        base_path = Path("/")
+        glob_pattern = pattern.lstrip("/")
+
+    try:
+        return sorted(base_path.glob(glob_pattern))
+    except (OSError, ValueError) as e:
+        log(f"Error al buscar Java en {pattern}: {e}", error=True, console_output=False)
+        return []
+
+
+def _registry_candidates():
+    """Ejecutables de Java registrados en el registro de Windows"""
+    try:
+        import winreg
+    except ImportError:
+        log("Módulo winreg no disponible.", error=True, console_output=False)
+        return []
+
+    candidates = []
+    for reg_path in WINDOWS_REGISTRY_KEYS:
+        try:
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, reg_path) as key:
+                current_version, _ = winreg.QueryValueEx(key, "CurrentVersion")
+                with winreg.OpenKey(
+                    winreg.HKEY_LOCAL_MACHINE, f"{reg_path}\\{current_version}"
+                ) as subkey:
+                    java_home, _ = winreg.QueryValueEx(subkey, "JavaHome")
+                    candidates.append(Path(java_home) / "bin" / "java.exe")
+        except OSError:
+            pass  # Ignorar errores de registro y continuar buscando
+    return candidates
+
+
+def _discover_candidates():
+    """Ejecutables de Java instalados, sin duplicados y por orden de preferencia"""
+    java_bin = "java.exe" if OS_NAME == "windows" else "java"
+    candidates = []
+
+    java_home = os.environ.get("JAVA_HOME")
+    if java_home:
+        candidates.append(Path(java_home) / "bin" / java_bin)
+    for pattern in JAVA_PATTERNS.get(OS_NAME, []):
+        candidates.extend(_glob_pattern(pattern))
+    if OS_NAME == "windows":
+        candidates.extend(_registry_candidates())
+    java_in_path = shutil.which("java")
+    if java_in_path:
+        candidates.append(Path(java_in_path))
+
+    # Varias rutas pueden apuntar al mismo ejecutable (enlaces simbólicos)
+    unique = []
+    seen = set()
+    for path in candidates:
+        resolved = _resolve_binary(str(path))
+        if resolved is not None and resolved not in seen:
+            seen.add(resolved)
+            unique.append(path)
+    return unique
+
+
+def get_java_runtimes(refresh=False):
+    """Instalaciones de Java funcionales: [{"path", "version", "major"}, ...]"""
+    global _runtimes
+
+    with _discovery_lock:
+        if _runtimes is None or refresh:
+            candidates = _discover_candidates()
+            workers = max(1, min(PROBE_WORKERS, len(candidates)))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                versions = list(
+                    executor.map(lambda path: probe_java(str(path)), candidates)
+                )
+
+            _runtimes = [
+                {
+                    "path": str(path),
+                    "version": version,
+                    "major": parse_java_major(version),
+                }
+                for path, version in zip(candidates, versions)
+                if version
+            ]
+            log(
+                f"Instalaciones de Java encontradas: {len(_runtimes)}",
+                console_output=False,
+            )
+        return list(_runtimes)
+
+
+def select_java_runtime(runtimes, required_major=None):
+    """Mejor instalación para la versión mayor requerida (None si no hay ninguna)"""
+    if not runtimes:
+        return None
+    if not required_major:
+        return runtimes[0]
+
+    # La versión exacta, o si no la más cercana por encima
+    exact = [runtime for runtime in runtimes if runtime["major"] == required_major]
+    if exact:
+        return exact[0]
+    newer = [
+        runtime
+        for runtime in runtimes
+        if runtime["major"] and runtime["major"] > required_major
+    ]
+    if newer:
+        return min(newer, key=lambda runtime: runtime["major"])
+
+    log(
+        f"Ninguna instalación de Java cumple la versión {required_major} requerida",
+        error=True,
+    )
+    return max(runtimes, key=lambda runtime: runtime["major"] or 0)
+
+
+def required_java_major(version=None):
+    """Versión mayor de Java que pide el manifest de una versión (None si no se sabe)"""
+    try:
+        with open(manifest_path(version), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict):
+        return None
+    return manifest.get("javaVersion", {}).get("majorVersion")
+
+
+def find_java_path(required_major=None):
+    """Encuentra la ruta a la instalación de Java
+
+    Sin required_major se usa la que pide la versión seleccionada, la misma que
+    elige el perfil de lanzamiento.
+    """
+    if required_major is None:
+        required_major = required_java_major()
+
+    # 1. Primero usar la ruta configurada por el usuario si existe
+    user_java_path = get_setting("java_path")
+    if user_java_path and user_java_path != "java":
+        if Path(user_java_path).exists():
+            log(
+                f"Usando ruta de Java configurada por el usuario: {user_java_path}",
+                console_output=False,
+            )
+            return user_java_path
+        log(
+            f"La ruta de Java configurada ({user_java_path}) no existe. Buscando alternativas.",
+            error=True,
+            console_output=False,
+        )
+
+    # 2. La mejor instalación descubierta (JAVA_HOME, rutas comunes, PATH)
+    runtime = select_java_runtime(get_java_runtimes(), required_major)
+    # La instalación pudo desinstalarse o actualizarse después de descubrirla
+    if runtime and probe_java(runtime["path"]) != runtime["version"]:
+        runtime = select_java_runtime(get_java_runtimes(refresh=True), required_major)
+    if runtime:
+        return runtime["path"]
+
+    # 3. Si no encontramos nada, devolver "java" para usar el que esté en PATH (o fallar explícitamente)
+    log(
+        "No se encontró instalación de Java. Se intentará usar 'java' del PATH.",
+        error=True,
+        console_output=False,
+    )
+    return "java"
+
+
+def is_java_available():
+    """Verifica si Java está disponible en el sistema"""
+    return probe_java(find_java_path()) is not None
@@ -0,0 +1,163 @@
+"""
+Perfil de lanzamiento precalculado al instalar cada versión (classpath, argumentos
+de la JVM, natives y Java), validado por mtime para lanzar sin volver a resolver nada
+"""
+
+import json
+from pathlib import Path
+
+from src.config.constants import OS_NAME
+from src.config.game_version import (
+    client_jar_path,
+    get_game_version,
+    install_plan_path,
+    launch_profile_path,
+    manifest_path,
+    natives_dir,
+)
+from src.config.settings import get_setting
+from src.launcher.java_runtime import find_java_path, probe_java
+from src.utils.logging import log
+
+# Versión del formato del perfil: los perfiles con otra versión se regeneran
+PROFILE_VERSION = 2
+# Clase principal si el manifest no indica otra
+MAIN_CLASS = "net.minecraft.client.main.Main"
+
+
+def _mtime(path):
+    """mtime en nanosegundos de una ruta (None si no existe)"""
+    try:
+        return Path(path).stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _profile_stamps(version, java_path):
+    """Estado de todo lo que describe el perfil: si cambia, el perfil se regenera"""
+    return {
+        "manifest": _mtime(manifest_path(version)),
+        "client": _mtime(client_jar_path(version)),
+        "install_plan": _mtime(install_plan_path(version)),
+        "natives": _mtime(natives_dir(version)),
+        "java": _mtime(java_path),
+        "java_setting": get_setting("java_path"),
+    }
+
+
+def _jvm_args(version):
+    """Argumentos fijos de la JVM (la memoria se añade al lanzar, según la configuración)"""
+    args = [
+        "-Djava.security.egd=file:/dev/./urandom",  # Mejor fuente de aleatoriedad en Unix
+        "-XX:+UseG1GC",  # Usar el recolector de basura G1
+        "-XX:+ParallelRefProcEnabled",  # Procesamiento de referencias en paralelo
+        "-XX:MaxGCPauseMillis=200",  # Limitar pausas de GC
+        "-XX:+UnlockExperimentalVMOptions",
+        "-XX:+DisableExplicitGC",  # Evitar GC explícito
+    ]
+    # Agregar '-XstartOnFirstThread' solo si es macOS
+    if OS_NAME == "darwin":
+        args.append("-XstartOnFirstThread")
+    args.append(f"-Djava.library.path={natives_dir(version)}")
+    return args
+
+
+def build_launch_profile(version=None):
+    """Resuelve el perfil de lanzamiento completo. Devuelve (perfil, reutilizable)"""
+    # Importación diferida: game_launcher importa el downloader, que guarda el perfil
+    from src.launcher.game_launcher import get_required_libraries, verify_permissions
+
+    version = version or get_game_version()
+    # Verificar y corregir permisos del directorio de natives
+    verify_permissions(natives_dir(version))
+
+    manifest = None
+    asset_index_id = version
+    try:
+        with open(manifest_path(version), "r") as f:
+            manifest = json.load(f)
+        asset_index_id = manifest.get("assetIndex", {}).get("id", version)
+    except (OSError, ValueError) as e:
+        log(f"Error al leer el manifest: {e}", error=True)
+
+    # Java que mejor cumple la versión que pide el manifest
+    required_major = (manifest or {}).get("javaVersion", {}).get("majorVersion")
+    java_path = find_java_path(required_major)
+    library_paths = get_required_libraries(manifest)
+    classpath_separator = ";" if OS_NAME == "windows" else ":"
+
+    profile = {
+        "version": PROFILE_VERSION,
+        "os": OS_NAME,
+        "java_path": java_path,
+        "java_version": probe_java(java_path),
+        "classpath": classpath_separator.join(
+            [str(client_jar_path(version))] + [str(path) for path in library_paths]
+        ),
+        "libraries": len(library_paths),
+        "jvm_args": _jvm_args(version),
+        "main_class": (manifest or {}).get("mainClass", MAIN_CLASS),
+        "game_version": version,
+        "asset_index": asset_index_id,
+        "stamps": _profile_stamps(version, java_path),
+    }
+    # Sin manifest ni Java funcional el perfil es provisional: no se guarda
+    return profile, manifest is not None and profile["java_version"] is not None
+
+
+def save_launch_profile(profile):
+    """Guarda el perfil de lanzamiento de su versión, usando escritura atómica"""
+    profile_file = launch_profile_path(profile["game_version"])
+    try:
+        profile_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = profile_file.with_suffix(".tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(profile, f, indent=2)
+        temp_file.replace(profile_file)
+        return True
+    except OSError as e:
+        log(f"Error al guardar el perfil de lanzamiento: {e}", error=True)
+        return False
+
+
+def load_launch_profile(version=None):
+    """Carga el perfil guardado si sigue describiendo la instalación (None si no)"""
+    version = version or get_game_version()
+    try:
+        with open(launch_profile_path(version), "r", encoding="utf-8") as f:
+            profile = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        log(f"Perfil de lanzamiento dañado, se regenerará: {e}", error=True)
+        return None
+
+    if (
+        not isinstance(profile, dict)
+        or profile.get("version") != PROFILE_VERSION
+        or profile.get("os") != OS_NAME
+        or profile.get("game_version") != version
+        or profile.get("stamps")
+        != _profile_stamps(version, profile.get("java_path", ""))
+    ):
+        log("Perfil de lanzamiento desactualizado", console_output=False, debug=True)
+        return None
+    return profile
+
+
+def refresh_launch_profile(version=None):
+    """Regenera el perfil de lanzamiento y lo guarda si es reutilizable"""
+    profile, reusable = build_launch_profile(version)
+    if reusable:
+        save_launch_profile(profile)
+    else:
+        discard_launch_profile(profile["game_version"])
+    return profile
+
+
+def discard_launch_profile(version=None):
+    """Descarta el perfil guardado (se regenerará en el próximo lanzamiento)"""
+    try:
+        launch_profile_path(version).unlink()
+    except FileNotFoundError:
+        pass
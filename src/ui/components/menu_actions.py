@@ -13,13 +13,26 @@ from rich.table import Table
 from rich.prompt import Confirm, Prompt
 from rich import box
 
-from src.config.constants import CLIENT_JAR, GAME_DIR
-from src.config.settings import get_setting, set_setting, load_settings
-from src.downloader.downloader import (
-    download_minecraft,
+from src.config.constants import DEFAULT_GAME_VERSION, GAME_DIR
+from src.config.game_version import (
+    client_jar_path,
+    get_game_version,
+    installed_versions,
+    version_dir,
+)
+from src.config.settings import (
+    get_setting,
+    load_settings,
+    set_setting,
+    update_settings,
+)
+from src.downloader.asset_filter import get_quality_profiles
+from src.downloader.install_state import (
+    detect_existing_install,
     is_download_complete,
     set_download_complete,
 )
+from src.downloader.object_store import prune_store
 from src.launcher.game_launcher import launch_minecraft
 from src.utils.io import remove_directory_recursively
 from src.utils.logging import log, get_log_content
@@ -27,6 +40,23 @@ from src.utils.logging import log, get_log_content
 # Consola para mostrar mensajes
 console = Console()
 
+# Claves que se pueden modificar desde el menú de configuración
+EDITABLE_SETTINGS = [
+    "max_workers",
+    "logs_to_keep",
+    "username",
+    "graphics_quality",
+    "memory_mb",
+    "java_path",
+    "download_engine",
+    "max_bandwidth_kbps",
+    "max_per_host",
+    "game_version",
+]
+
+# Últimas versiones publicadas que se sugieren al elegir la versión del juego
+VERSIONS_SHOWN = 8
+
 
 def clear_screen():
     """Limpia la pantalla de manera compatible con varios sistemas"""
@@ -64,30 +94,26 @@ def show_download_progress():
         )
     )
 
+    # Importación diferida: la pila de descargas solo se carga al descargar
+    from src.downloader.downloader import download_minecraft
+    from src.downloader.progress import RichProgressSink
+
+    # El progreso lo dibuja la propia descarga (en esta consola si es la barra de Rich)
+    progress = get_setting("progress_display", "rich")
+    if progress == "rich":
+        progress = RichProgressSink(console)
+
     # Iniciar la descarga en un hilo
-    max_workers = get_setting("max_workers", 10)  # Usar el valor de la configuración
-    download_thread = threading.Thread(target=download_minecraft)
+    download_thread = threading.Thread(
+        target=download_minecraft, kwargs={"progress": progress}
+    )
     download_thread.daemon = True
     download_thread.start()
 
-    # Mostrar una animación mientras se descarga
+    # Esperar a que termine la descarga (en intervalos, para atender Ctrl+C)
     try:
-        with Progress(
-            SpinnerColumn(spinner_name="dots12"),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-        ) as progress:
-            task = progress.add_task(
-                "[cyan]Descargando archivos de Minecraft...", total=None
-            )
-
-            # Esperar a que termine la descarga
-            while download_thread.is_alive():
-                progress.update(
-                    task, description=f"[cyan]Descargando archivos de Minecraft..."
-                )
-                time.sleep(0.1)
-
+        while download_thread.is_alive():
+            download_thread.join(0.1)
     except KeyboardInterrupt:
         console.print("[yellow]Descarga interrumpida por el usuario.")
         return
@@ -105,7 +131,7 @@ def show_download_progress():
 
 def handle_launch():
     """Gestiona el lanzamiento de Minecraft"""
-    if CLIENT_JAR.exists():
+    if client_jar_path().exists():
         # Usar el nombre de usuario guardado en la configuración
         default_username = get_setting("username", "Player")
         username = Prompt.ask(
@@ -144,25 +170,63 @@ def handle_launch():
 
 def handle_cleanup():
     """Gestiona la eliminación de archivos"""
-    if CLIENT_JAR.exists() or GAME_DIR.exists():
-        if Confirm.ask("[yellow]¿Eliminar archivos de instalación?"):
-            try:
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                ) as progress:
-                    task = progress.add_task("[cyan]Eliminando archivos...", total=None)
-                    log("Iniciando limpieza de archivos")
-                    remove_directory_recursively(GAME_DIR)
-                    time.sleep(1)  # Dar tiempo para ver la animación
-
-                console.print("[bold green]✅ Archivos de instalación eliminados.")
-                set_download_complete(False)
-            except Exception as e:
-                log(f"Error al eliminar los archivos: {e}", error=True)
-                console.print(f"[bold red]❌ Error al eliminar los archivos: {e}")
-    else:
+    if not GAME_DIR.exists():
         console.print("[bold yellow]No hay archivos de instalación para eliminar.")
+        input("\nPresiona Enter para continuar...")
+        return
+
+    version = get_game_version()
+    versions = installed_versions()
+    console.print(
+        f"[cyan]Versiones instaladas: [bright_white]{', '.join(versions) or 'ninguna'}"
+    )
+
+    # Por defecto solo se ofrece quitar la versión seleccionada: las librerías y
+    # los assets son comunes a todas las versiones
+    choices = ["0", "2"]
+    if version_dir(version).exists():
+        choices.insert(1, "1")
+        console.print(f"[cyan]1.[/] Solo la versión {version}")
+    console.print(
+        "[cyan]2.[/] Toda la instalación (todas las versiones, librerías y assets)"
+    )
+    console.print("[cyan]0.[/] Cancelar")
+    option = Prompt.ask("Selecciona qué eliminar", choices=choices, default="0")
+
+    if option == "1":
+        target = version_dir(version)
+        question = f"[yellow]¿Eliminar la versión {version}?"
+    elif option == "2":
+        target = GAME_DIR
+        question = "[yellow]¿Eliminar todos los archivos de instalación?"
+    else:
+        return
+
+    if Confirm.ask(question):
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+            ) as progress:
+                task = progress.add_task("[cyan]Eliminando archivos...", total=None)
+                log(f"Iniciando limpieza de archivos: {target}")
+                remove_directory_recursively(target)
+                time.sleep(1)  # Dar tiempo para ver la animación
+
+            console.print("[bold green]✅ Archivos de instalación eliminados.")
+            detect_existing_install()
+
+            # Los objetos compartidos que ya no usa ninguna instalación se pueden liberar
+            if Confirm.ask(
+                "[yellow]¿Liberar también los archivos compartidos que ya no se usan?"
+            ):
+                removed, freed = prune_store()
+                console.print(
+                    f"[bold green]✅ {removed} archivos compartidos eliminados ({freed / 1048576:.1f} MB)."
+                )
+        except Exception as e:
+            log(f"Error al eliminar los archivos: {e}", error=True)
+            console.print(f"[bold red]❌ Error al eliminar los archivos: {e}")
 
     input("\nPresiona Enter para continuar...")
 
@@ -188,6 +252,11 @@ def handle_logs():
     input("\nPresiona Enter para continuar...")
 
 
+def _editable_settings(settings):
+    """Valores del menú de configuración que hay que guardar"""
+    return {key: settings[key] for key in EDITABLE_SETTINGS if key in settings}
+
+
 def handle_config():
     """Gestiona la configuración"""
     settings = load_settings()
@@ -225,7 +294,7 @@ def handle_config():
             "4",
             "Calidad gráfica",
             settings.get("graphics_quality", "high"),
-            "Nivel de calidad gráfica (low, medium, high)",
+            "Nivel de calidad gráfica (low, medium, high o personalizado)",
         )
         table.add_row(
             "5",
@@ -239,25 +308,61 @@ def handle_config():
             settings.get("java_path", "java"),
             "Ruta al ejecutable de Java",
         )
-        table.add_row("7", "Volver al menú principal", "", "")
+        table.add_row(
+            "7",
+            "Motor de descarga",
+            settings.get("download_engine", "threads"),
+            "threads (hilos) o async (asyncio, cientos de descargas simultáneas)",
+        )
+        table.add_row(
+            "8",
+            "Límite de ancho de banda",
+            (
+                f"{settings.get('max_bandwidth_kbps', 0)} KB/s"
+                if settings.get("max_bandwidth_kbps", 0)
+                else "Sin límite"
+            ),
+            "Velocidad máxima total de descarga (0 = sin límite)",
+        )
+        table.add_row(
+            "9",
+            "Conexiones por host",
+            (
+                str(settings.get("max_per_host", 0))
+                if settings.get("max_per_host", 0)
+                else "Sin límite"
+            ),
+            "Descargas simultáneas contra un mismo servidor (0 = sin límite)",
+        )
+        table.add_row(
+            "10",
+            "Versión del juego",
+            settings.get("game_version", DEFAULT_GAME_VERSION),
+            "Versión que se descarga y se lanza (varias pueden estar instaladas)",
+        )
+        table.add_row("11", "Volver al menú principal", "", "")
 
         console.print(table)
 
         # Importar la función para verificar Java (mostrando estado actual)
-        from src.launcher.game_launcher import is_java_available, find_java_path
+        from src.launcher.java_runtime import find_java_path, probe_java
 
+        # Versiones en caché: solo se ejecuta Java si el ejecutable cambió
         java_path = find_java_path()
-        java_status = "Disponible ✅" if is_java_available() else "No disponible ❌"
+        java_version = probe_java(java_path)
+        java_status = (
+            f"Disponible ✅ ({java_version})" if java_version else "No disponible ❌"
+        )
         console.print(
-            f"[cyan]Estado actual de Java: [{'green' if is_java_available() else 'red'}]{java_status}"
+            f"[cyan]Estado actual de Java: [{'green' if java_version else 'red'}]{java_status}"
         )
         console.print(f"[cyan]Ruta actual: [yellow]{java_path}")
 
         # Solicitar la opción al usuario
         option = Prompt.ask(
             "Selecciona una opción para modificar",
-            choices=["1", "2", "3", "4", "5", "6", "7"],
-            default="7",
+            choices=["1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "11"],
+            default="11",
         )
 
         if option == "1":
@@ -309,26 +414,26 @@ def handle_config():
         elif option == "4":
             # Modificar calidad gráfica
             current = settings.get("graphics_quality", "high")
-            quality_options = ["low", "medium", "high"]
+            profiles = get_quality_profiles()
+            quality_options = list(profiles)
 
             table = Table(title="Niveles de Calidad Gráfica")
             table.add_column("Nivel", style="cyan")
             table.add_column("Descripción", style="yellow")
             table.add_column("Tamaño", style="green")
 
-            table.add_row(
-                "low",
-                "Texturas básicas, sin sonidos ambientales ni música",
-                "~40% menos de espacio",
-            )
-            table.add_row(
-                "medium",
-                "Casi todas las texturas, menos efectos avanzados",
-                "~20% menos de espacio",
-            )
-            table.add_row(
-                "high", "Todas las texturas, efectos y sonidos", "Instalación completa"
-            )
+            # Tamaño aproximado de los perfiles incluidos
+            profile_sizes = {
+                "low": "~40% menos de espacio",
+                "medium": "~20% menos de espacio",
+                "high": "Instalación completa",
+            }
+            for name, profile in profiles.items():
+                table.add_row(
+                    name,
+                    profile["description"],
+                    profile_sizes.get(name, "Perfil personalizado"),
+                )
 
             console.print(table)
             console.print(
@@ -338,7 +443,7 @@ def handle_config():
             new_quality = Prompt.ask(
                 "Selecciona el nivel de calidad gráfica",
                 choices=quality_options,
-                default=current,
+                default=current if current in quality_options else "high",
             )
 
             settings["graphics_quality"] = new_quality
@@ -542,6 +647,19 @@ def handle_config():
                 console.print("  • [yellow]/usr/bin/java[/yellow]")
                 console.print("  • [yellow]/usr/lib/jvm/<version>/bin/java[/yellow]")
 
+            # Buscar de nuevo: Java pudo instalarse o desinstalarse desde el arranque
+            from src.launcher.java_runtime import get_java_runtimes
+
+            runtimes = get_java_runtimes(refresh=True)
+            if runtimes:
+                console.print(
+                    "[bold cyan]Instalaciones de Java detectadas:[/bold cyan]"
+                )
+                for runtime in runtimes:
+                    console.print(
+                        f"  • [yellow]{runtime['path']}[/yellow] ({runtime['version']})"
+                    )
+
             # Solicitar la nueva ruta
             new_path = Prompt.ask(
                 "Ingresa la ruta completa al ejecutable de Java", default=current
@@ -559,7 +677,7 @@ def handle_config():
 
                     # Verificar si es ejecutable
                     try:
-                        from src.launcher.game_launcher import is_java_available
+                        from src.launcher.java_runtime import is_java_available
 
                         old_path = settings["java_path"]
                         settings["java_path"] = new_path
@@ -599,30 +717,110 @@ def handle_config():
                 console.print("[green]✓ Se usará 'java' del PATH del sistema.")
 
         elif option == "7":
+            # Modificar el motor de descarga
+            current = settings.get("download_engine", "threads")
+            console.print(
+                "[yellow]El motor async requiere aiohttp y permite muchas más descargas simultáneas."
+            )
+            settings["download_engine"] = Prompt.ask(
+                "Selecciona el motor de descarga",
+                choices=["threads", "async"],
+                default=current,
+            )
+
+        elif option == "8":
+            # Modificar el límite de ancho de banda (validar entre 0 y 1000000 KB/s)
+            current = settings.get("max_bandwidth_kbps", 0)
+            while True:
+                try:
+                    value = int(
+                        Prompt.ask(
+                            "Ingresa el límite de descarga en KB/s (0 = sin límite)",
+                            default=str(current),
+                        )
+                    )
+                    if 0 <= value <= 1000000:
+                        settings["max_bandwidth_kbps"] = value
+                        break
+                    else:
+                        console.print(
+                            "[bold red]El valor debe estar entre 0 y 1000000 KB/s."
+                        )
+                except ValueError:
+                    console.print("[bold red]Por favor, ingresa un número válido.")
+
+        elif option == "9":
+            # Modificar las conexiones simultáneas por host (validar entre 0 y 64)
+            current = settings.get("max_per_host", 0)
+            while True:
+                try:
+                    value = int(
+                        Prompt.ask(
+                            "Ingresa el máximo de conexiones por host (0 = sin límite)",
+                            default=str(current),
+                        )
+                    )
+                    if 0 <= value <= 64:
+                        settings["max_per_host"] = value
+                        break
+                    else:
+                        console.print("[bold red]El valor debe estar entre 0 y 64.")
+                except ValueError:
+                    console.print("[bold red]Por favor, ingresa un número válido.")
+
+        elif option == "10":
+            # Elegir la versión del juego (todas comparten librerías y assets)
+            current = settings.get("game_version", DEFAULT_GAME_VERSION)
+            installed = installed_versions()
+            if installed:
+                console.print(
+                    f"[cyan]Versiones instaladas: [green]{', '.join(installed)}"
+                )
+
+            # Importación diferida: la lista de versiones usa la pila de descargas
+            from src.downloader.versions import find_version, list_versions
+
+            releases = list_versions("release")[:VERSIONS_SHOWN]
+            if releases:
+                console.print(
+                    "[cyan]Últimas versiones publicadas: [yellow]"
+                    + ", ".join(entry["id"] for entry in releases)
+                )
+            else:
+                console.print(
+                    "[yellow]No se pudo obtener la lista de versiones de Mojang."
+                )
+            console.print(
+                "[yellow]Puedes indicar cualquier versión (también snapshots), "
+                "'latest' o 'snapshot'."
+            )
+
+            new_version = Prompt.ask("Versión del juego", default=current).strip()
+            if new_version in installed:
+                settings["game_version"] = new_version
+            else:
+                entry = find_version(new_version)
+                if entry:
+                    settings["game_version"] = entry["id"]
+                    console.print(
+                        f"[green]✓ Versión {entry['id']} ({entry.get('type', '?')}). "
+                        "Al descargarla solo se bajará lo que no tengan ya las otras versiones."
+                    )
+                else:
+                    console.print(
+                        f"[bold red]La versión '{new_version}' no existe o no se pudo comprobar."
+                    )
+
+        elif option == "11":
             # Guardar los cambios y volver al menú principal
-            for key in [
-                "max_workers",
-                "logs_to_keep",
-                "username",
-                "graphics_quality",
-                "memory_mb",
-                "java_path",
-            ]:
-                if key in settings:
-                    set_setting(key, settings[key])
+            update_settings(_editable_settings(settings))
             console.print("[bold green]✅ Configuración guardada correctamente.")
             break
 
-        # Guardar después de cada cambio
-        for key in [
-            "max_workers",
-            "logs_to_keep",
-            "username",
-            "graphics_quality",
-            "memory_mb",
-            "java_path",
-        ]:
-            if key in settings:
-                set_setting(key, settings[key])
+        # Guardar después de cada cambio (una sola escritura, y solo si hay cambios)
+        update_settings(_editable_settings(settings))
+
+    # La versión seleccionada puede haber cambiado: comprobar si está instalada
+    detect_existing_install()
 
     input("\nPresiona Enter para continuar...")
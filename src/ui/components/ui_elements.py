@@ -12,9 +12,10 @@ from rich.text import Text
 from rich import box
 from art import text2art
 
-from src.downloader.downloader import is_download_complete
-from src.config.constants import CLIENT_JAR, MAX_WORKERS
+from src.config.constants import MAX_WORKERS
+from src.config.game_version import get_game_version
 from src.config.settings import get_setting
+from src.ui.status_service import get_status_snapshot
 
 # Colores y estilos
 THEME = {
@@ -50,51 +51,48 @@ def get_launcher_logo():
     return Panel(full_logo, title="[bold cyan]LLauncher", border_style=THEME["border"])
 
 
-def create_status_panel():
+def create_status_panel(snapshot=None):
     """Crear panel con información de estado del sistema"""
     table = Table(show_header=False, box=box.SIMPLE)
+    table.add_column("Propiedad", style="bright_cyan")
+    table.add_column("Valor")
+
+    # El estado lo refresca el servicio en segundo plano: dibujar nunca bloquea
+    if snapshot is None:
+        snapshot = get_status_snapshot()
+    if snapshot is None:
+        table.add_row("Estado", "[yellow]Comprobando...")
+        table.add_row("Hora", f"[cyan]{datetime.now().strftime('%H:%M:%S')}")
+        return Panel(
+            table, title="[bold cyan]Estado del Sistema", border_style=THEME["border"]
+        )
 
     # Verificar si Minecraft está instalado
     minecraft_status = (
-        "[bold green]✓ Instalado"
-        if is_download_complete()
-        else "[bold red]✗ No instalado"
+        "[bold green]✓ Instalado" if snapshot.installed else "[bold red]✗ No instalado"
     )
 
     # Verificar si Java está disponible
-    from src.launcher.game_launcher import is_java_available, find_java_path
-
-    java_available = is_java_available()
-    java_path = find_java_path()
-    if java_available:
-        java_status = f"[bold green]✓ Disponible"
+    if snapshot.java_available:
+        java_status = f"[bold green]✓ Disponible ({snapshot.java_version})"
     else:
         java_status = f"[bold red]✗ No disponible"
 
-    # Obtener info del sistema
-    system_info = platform.system()
-    cpu_info = platform.processor() or "Desconocido"
-
     # Obtener uso de memoria RAM
-    try:
-        import psutil
-
-        ram_percent = psutil.virtual_memory().percent
-        ram_info = f"[{'green' if ram_percent < 70 else 'yellow' if ram_percent < 90 else 'red'}]{ram_percent}%"
-    except ImportError:
+    ram_percent = snapshot.ram_percent
+    if ram_percent is None:
         ram_info = "[yellow]psutil no disponible"
-    except Exception:
-        ram_info = "[red]Error al obtener RAM"
+    else:
+        ram_info = f"[{'green' if ram_percent < 70 else 'yellow' if ram_percent < 90 else 'red'}]{ram_percent}%"
 
-    # Crear tabla
-    table.add_column("Propiedad", style="bright_cyan")
-    table.add_column("Valor")
+    cpu_info = snapshot.cpu
 
+    table.add_row("Versión", f"[cyan]{snapshot.game_version}")
     table.add_row("Estado Minecraft", minecraft_status)
     table.add_row("Java", java_status)
-    if not java_available:
+    if not snapshot.java_available:
         table.add_row("", "[bold yellow]⚠️ Configura Java en Opciones")
-    table.add_row("Sistema", f"[cyan]{system_info}")
+    table.add_row("Sistema", f"[cyan]{snapshot.system}")
     table.add_row(
         "CPU", f"[cyan]{cpu_info[:40]+'...' if len(cpu_info) > 40 else cpu_info}"
     )
@@ -120,7 +118,7 @@ def create_menu_panel(options, menu_title="Menú Principal"):
 def create_info_panel():
     """Crear panel con información general"""
     info_text = (
-        "[cyan]LLauncher[/cyan] - Versión [bright_cyan]1.21.5[/bright_cyan]\n\n"
+        f"[cyan]LLauncher[/cyan] - Versión [bright_cyan]{get_game_version()}[/bright_cyan]\n\n"
         "Ingresa el [bright_yellow]número[/bright_yellow] de la opción deseada "
         "y presiona [bright_yellow]Enter[/bright_yellow] para seleccionar.\n\n"
         "Presiona [bright_yellow]Ctrl+C[/bright_yellow] para salir."
@@ -152,7 +150,5 @@ def create_main_layout():
 
 def create_footer_panel():
     """Crea el panel de pie de página"""
-    footer_text = (
-        f"[{THEME['info']}]LLauncher v1.21.5 | Python {platform.python_version()}"
-    )
+    footer_text = f"[{THEME['info']}]LLauncher v{get_game_version()} | Python {platform.python_version()}"
     return Panel(footer_text, border_style=THEME["border"])
@@ -6,7 +6,7 @@ import os
 from rich.console import Console
 from rich.prompt import Prompt
 
-from src.config.constants import CLIENT_JAR
+from src.config.game_version import get_game_version
 from src.config.settings import load_settings, set_setting, get_setting
 from src.utils.logging import log, get_log_content
 from src.ui.components import (
@@ -23,25 +23,27 @@ from src.ui.components import (
     handle_config,
     clear_screen,
 )
+from src.ui.status_service import (
+    refresh_status,
+    start_status_service,
+    stop_status_service,
+)
 
 # Inicializar la consola Rich
 console = Console()
 
+# Espera máxima por el estado actualizado tras una acción que puede cambiarlo
+STATUS_WAIT = 0.3
+
 
 def show_menu():
     """Muestra el menú principal interactivo"""
     # Asegurar que la configuración existe
     load_settings()
 
-    # Opciones del menú principal con iconos
-    menu_options = [
-        "🎮 Descargar Minecraft 1.21.5",
-        "🚀 Iniciar Minecraft",
-        "🗑️ Eliminar archivos de instalación",
-        "📋 Ver registro de actividad",
-        "⚙️ Configuración",
-        "🚪 Salir",
-    ]
+    # El estado del panel lateral se refresca en segundo plano
+    start_status_service()
+    refresh_status(wait=STATUS_WAIT)
 
     running = True
 
@@ -49,6 +51,16 @@ def show_menu():
         try:
             clear_screen()
 
+            # Opciones del menú principal con iconos (la versión se elige en Configuración)
+            menu_options = [
+                f"🎮 Descargar Minecraft {get_game_version()}",
+                "🚀 Iniciar Minecraft",
+                "🗑️ Eliminar archivos de instalación",
+                "📋 Ver registro de actividad",
+                "⚙️ Configuración",
+                "🚪 Salir",
+            ]
+
             # Crear layout principal
             layout = create_main_layout()
 
@@ -72,14 +84,17 @@ def show_menu():
 
                 if option == "1":
                     handle_download()
+                    refresh_status(wait=STATUS_WAIT)
                 elif option == "2":
                     handle_launch()
                 elif option == "3":
                     handle_cleanup()
+                    refresh_status(wait=STATUS_WAIT)
                 elif option == "4":
                     handle_logs()
                 elif option == "5":
                     handle_config()
+                    refresh_status(wait=STATUS_WAIT)
                 elif option == "6":
                     console.print("[bright_green]¡Gracias por usar LLauncher! 👋")
                     running = False
@@ -95,3 +110,5 @@ def show_menu():
             console.print(f"[bold red]❌ Error inesperado: {e}")
             log(f"Error en el menú principal: {e}", error=True)
             input("\nPresiona Enter para continuar...")
+
+    stop_status_service()
@@ -0,0 +1,191 @@
+"""
+Servicio de estado en segundo plano: refresca Java, la instalación y los recursos
+del sistema y entrega al menú una instantánea inmutable, sin bloquear el dibujo
+"""
+
+import collections
+import platform
+import threading
+import time
+
+from src.config.constants import CONFIG_FILE
+from src.config.game_version import client_jar_path, get_game_version, install_plan_path
+from src.config.settings import subscribe, unsubscribe
+from src.downloader.install_state import is_download_complete
+from src.launcher.java_runtime import find_java_path, probe_java
+from src.utils.logging import log
+
+# Cada cuánto se comprueban los archivos vigilados y cada cuánto se refresca todo
+STATUS_POLL_INTERVAL = 1.0
+STATUS_REFRESH_INTERVAL = 5.0
+
+StatusSnapshot = collections.namedtuple(
+    "StatusSnapshot",
+    [
+        "game_version",
+        "installed",
+        "java_available",
+        "java_path",
+        "java_version",
+        "system",
+        "cpu",
+        "ram_percent",
+        "updated",
+    ],
+)
+
+_snapshot = None
+# Refrescos pedidos y atendidos, para esperar a uno concreto
+_requested = 0
+_served = 0
+_status_cond = threading.Condition()
+_refresh_event = threading.Event()
+_stop_event = threading.Event()
+_status_thread = None
+# Datos del sistema que no cambian (platform.processor puede lanzar un proceso)
+_system_info = None
+
+
+def _watched_files():
+    """Archivos cuyo cambio indica que la instalación o la configuración cambiaron"""
+    return [client_jar_path(), install_plan_path(), CONFIG_FILE]
+
+
+def _watched_stamps():
+    """mtime de los archivos vigilados (None si no existen)"""
+    stamps = []
+    for path in _watched_files():
+        try:
+            stamps.append(path.stat().st_mtime_ns)
+        except OSError:
+            stamps.append(None)
+    return stamps
+
+
+def _ram_percent():
+    """Porcentaje de RAM en uso (None si no se puede obtener)"""
+    # psutil es opcional; se importa en el hilo del servicio para no retrasar el arranque
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        return psutil.virtual_memory().percent
+    except Exception as e:
+        log(f"Error al obtener el uso de RAM: {e}", error=True, console_output=False)
+        return None
+
+
+def _collect_status():
+    """Recoge el estado actual (puede ejecutar Java si el ejecutable cambió)"""
+    global _system_info
+
+    if _system_info is None:
+        _system_info = (platform.system(), platform.processor() or "Desconocido")
+
+    java_path = find_java_path()
+    java_version = probe_java(java_path)
+    return StatusSnapshot(
+        game_version=get_game_version(),
+        installed=is_download_complete(),
+        java_available=java_version is not None,
+        java_path=java_path,
+        java_version=java_version,
+        system=_system_info[0],
+        cpu=_system_info[1],
+        ram_percent=_ram_percent(),
+        updated=time.time(),
+    )
+
+
+def _publish(snapshot, served):
+    """Publica una instantánea nueva y avisa a quien la espere"""
+    global _snapshot, _served
+
+    with _status_cond:
+        if snapshot is not None:
+            _snapshot = snapshot
+        _served = served
+        _status_cond.notify_all()
+
+
+def _status_loop():
+    """Refresca el estado periódicamente o cuando cambian los archivos vigilados"""
+    stamps = None
+    last_refresh = 0.0
+
+    while not _stop_event.is_set():
+        with _status_cond:
+            requested = _requested
+        current = _watched_stamps()
+        if (
+            _refresh_event.is_set()
+            or current != stamps
+            or time.monotonic() - last_refresh >= STATUS_REFRESH_INTERVAL
+        ):
+            _refresh_event.clear()
+            stamps = current
+            snapshot = None
+            try:
+                snapshot = _collect_status()
+            except Exception as e:
+                log(
+                    f"Error al actualizar el estado: {e}",
+                    error=True,
+                    console_output=False,
+                )
+            _publish(snapshot, requested)
+            last_refresh = time.monotonic()
+        _refresh_event.wait(STATUS_POLL_INTERVAL)
+
+
+def _on_java_path_changed(key, value):
+    """Refresca el estado en cuanto cambia la ruta de Java"""
+    _refresh_event.set()
+
+
+def start_status_service():
+    """Arranca el servicio de estado si no está en marcha"""
+    global _status_thread
+
+    if _status_thread is not None and _status_thread.is_alive():
+        return
+    _stop_event.clear()
+    _refresh_event.set()
+    subscribe("java_path", _on_java_path_changed)
+    _status_thread = threading.Thread(
+        target=_status_loop, name="llauncher-status", daemon=True
+    )
+    _status_thread.start()
+
+
+def stop_status_service():
+    """Detiene el servicio de estado"""
+    global _status_thread
+
+    unsubscribe("java_path", _on_java_path_changed)
+    _stop_event.set()
+    _refresh_event.set()
+    if _status_thread is not None:
+        _status_thread.join(STATUS_POLL_INTERVAL)
+        _status_thread = None
+
+
+def get_status_snapshot():
+    """Última instantánea del estado (None si aún no hay ninguna)"""
+    with _status_cond:
+        return _snapshot
+
+
+def refresh_status(wait=0.0):
+    """Pide un refresco y espera como máximo wait segundos a que se publique"""
+    global _requested
+
+    with _status_cond:
+        _requested += 1
+        request = _requested
+    _refresh_event.set()
+    with _status_cond:
+        if wait:
+            _status_cond.wait_for(lambda: _served >= request, timeout=wait)
+        return _snapshot
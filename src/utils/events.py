@@ -0,0 +1,78 @@
+"""
+Registro opcional de eventos estructurados (JSON lines) con la telemetría de
+descargas, verificaciones, extracciones y lanzamientos
+"""
+
+import json
+import platform
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from src.config.constants import LOGS_DIR
+
+# Variables globales del registro de eventos
+events_filename = None
+_events_file = None
+_events_lock = threading.Lock()
+_session_id = None
+
+
+def initialize_events():
+    """Abre el archivo de eventos de esta sesión y registra el evento inicial"""
+    global events_filename, _events_file, _session_id
+
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    events_filename = (
+        LOGS_DIR / f'll_events_{datetime.now().strftime("%Y%m%d_%H%M%S")}.jsonl'
+    )
+    _events_file = open(events_filename, "w", encoding="utf-8")
+    _session_id = uuid.uuid4().hex
+
+    emit_event(
+        "session",
+        machine=platform.node(),
+        os=platform.system().lower(),
+        os_release=platform.release(),
+        arch=platform.machine(),
+        python=platform.python_version(),
+    )
+    return events_filename
+
+
+def events_enabled():
+    """Indica si el registro de eventos está activo"""
+    return _events_file is not None
+
+
+def emit_event(event, **fields):
+    """Añade un evento al archivo JSONL (no hace nada si el registro está desactivado)"""
+    if _events_file is None:
+        return
+
+    record = {"ts": round(time.time(), 3), "session": _session_id, "event": event}
+    record.update(fields)
+    line = json.dumps(record, ensure_ascii=False, default=str)
+
+    with _events_lock:
+        if _events_file is not None:
+            _events_file.write(line + "\n")
+            # Volcar cada evento: se puede seguir en vivo y un cierre brusco
+            # (fallo, kill, juego colgado) no pierde lo que lo explica
+            _events_file.flush()
+
+
+def elapsed_ms(start):
+    """Milisegundos transcurridos desde start (time.perf_counter)"""
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def close_events():
+    """Vuelca y cierra el archivo de eventos"""
+    global _events_file
+
+    with _events_lock:
+        if _events_file is not None:
+            _events_file.close()
+            _events_file = None
@@ -0,0 +1,163 @@
+"""
+Diagnóstico de arranque: mide el tiempo de importación de cada módulo, al estilo de
+`python -X importtime`, pero desde el propio proceso (también en ejecutables)
+"""
+
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+# Variable de entorno que activa el perfil de importaciones al arrancar
+IMPORT_PROFILE_ENV = "LLAUNCHER_IMPORT_PROFILE"
+
+# Módulos medidos: [nombre, propio_us, acumulado_us, profundidad], por orden de carga
+_records = []
+_stack = threading.local()
+_finder = None
+
+
+class _TimedLoader:
+    """Envuelve el loader real para medir la ejecución del módulo"""
+
+    def __init__(self, loader):
+        self.loader = loader
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        # El módulo solo ve el loader real
+        module.__loader__ = self.loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self.loader
+
+        stack = getattr(_stack, "frames", None)
+        if stack is None:
+            stack = _stack.frames = []
+        record = [module.__name__, 0, 0, len(stack)]
+        stack.append(0)  # Tiempo acumulado de los módulos hijos
+        start = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            elapsed = int((time.perf_counter() - start) * 1_000_000)
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            record[1] = elapsed - children
+            record[2] = elapsed
+            _records.append(record)
+
+
+class _TimingFinder:
+    """Buscador que delega en los demás y envuelve el loader de lo que encuentran"""
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader)
+            return spec
+        return None
+
+
+def import_profile_requested():
+    """Indica si se pidió el perfil de importaciones (LLAUNCHER_IMPORT_PROFILE=1)"""
+    return os.environ.get(IMPORT_PROFILE_ENV, "") not in ("", "0")
+
+
+def start_import_profile():
+    """Empieza a medir las importaciones que se hagan a partir de ahora"""
+    global _finder
+
+    if _finder is None:
+        _finder = _TimingFinder()
+        sys.meta_path.insert(0, _finder)
+
+
+def stop_import_profile():
+    """Deja de medir y devuelve los módulos medidos"""
+    global _finder
+
+    if _finder is not None:
+        sys.meta_path.remove(_finder)
+        _finder = None
+    return [tuple(record) for record in _records]
+
+
+def format_import_profile(records, limit=None):
+    """Líneas del informe en el formato de -X importtime (propio | acumulado | módulo)"""
+    total_us = sum(record[2] for record in records if record[3] == 0)
+    module_count = len(records)
+    if limit:
+        # Los módulos más lentos en acumulado, manteniendo el orden de carga
+        slowest = sorted(records, key=lambda record: record[2], reverse=True)[:limit]
+        records = [record for record in records if record in slowest]
+
+    lines = ["import time: self [us] | cumulative | imported package"]
+    for name, self_us, cumulative_us, depth in records:
+        lines.append(
+            f"import time: {self_us:>9} | {cumulative_us:>10} | {'  ' * depth}{name}"
+        )
+    lines.append(f"Total: {total_us / 1000:.1f} ms en {module_count} módulos")
+    return lines
+
+
+def write_import_profile(directory):
+    """Detiene la medición y guarda el informe en directory. Devuelve su ruta"""
+    records = stop_import_profile()
+    directory.mkdir(parents=True, exist_ok=True)
+    report_file = (
+        directory / f'll_imports_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
+    )
+    with open(report_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(format_import_profile(records)) + "\n")
+    return report_file
+
+
+def profile_module(name):
+    """Importa name midiendo sus importaciones. Devuelve (milisegundos, módulos)"""
+    start_import_profile()
+    start = time.perf_counter()
+    try:
+        importlib.import_module(name)
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        records = stop_import_profile()
+    return elapsed_ms, records
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m src.utils.import_profile",
+        description="Tiempo de importación de cada módulo al arrancar",
+    )
+    parser.add_argument(
+        "module", nargs="?", default="main", help="Módulo a importar (main)"
+    )
+    parser.add_argument(
+        "--limit", type=int, default=30, help="Módulos más lentos a mostrar"
+    )
+    parser.add_argument("--json", help="Guardar los resultados en este archivo JSON")
+    args = parser.parse_args()
+
+    elapsed_ms, records = profile_module(args.module)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"import_ms": elapsed_ms, "modules": records}, f)
+    else:
+        print("\n".join(format_import_profile(records, args.limit)))
+
+
+if __name__ == "__main__":
+    main()
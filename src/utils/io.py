@@ -29,6 +29,14 @@ def remove_directory_recursively(path):
     return True
 
 
+def existing_parent(path):
+    """Primer directorio existente de la ruta (para consultar su sistema de archivos)"""
+    path = Path(path).absolute()
+    while not path.exists() and path.parent != path:
+        path = path.parent
+    return path
+
+
 def safe_write_file(file_path, content, mode="w"):
     """Escribe contenido en un archivo de manera segura, usando un archivo temporal"""
     file_path = Path(file_path)
@@ -1,43 +1,134 @@
+import atexit
+import queue
 import sys
 import threading
+import time
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
 
 from src.config.constants import LOGS_DIR
 
+# Niveles de log: los mensajes por debajo del nivel configurado se descartan
+LOG_LEVELS = {"debug": 10, "info": 20, "error": 40}
+LOG_QUEUE_SIZE = 10000  # Mensajes en cola antes de frenar a quien escribe
+LOG_BATCH_SIZE = 512  # Mensajes escritos de una vez por el hilo escritor
+LOG_FLUSH_INTERVAL = 0.5  # Segundos máximos sin volcar el log a disco
+
 # Variables globales para logging
 log_filename = None
 log_file = None
-log_lock = threading.Lock()  # Para evitar conflictos al escribir en el log
+log_level = LOG_LEVELS["info"]
+log_lock = threading.Lock()  # Para evitar conflictos al mostrar mensajes en consola
+_log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_writer_thread = None
+
+
+def set_log_level(level):
+    """Establece el nivel mínimo de los mensajes registrados (debug, info o error)"""
+    global log_level
+    log_level = LOG_LEVELS.get(str(level).lower(), LOG_LEVELS["info"])
 
 
 def initialize_logging():
     """Inicializa el sistema de logging"""
-    global log_filename, log_file
+    global log_filename, log_file, _writer_thread
 
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
     log_filename = LOGS_DIR / f'll_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
     log_file = open(log_filename, "w")
 
-    # Limpiar logs antiguos (más de 7 días)
-    cleanup_old_logs()
+    # Un único hilo escribe en el archivo; el resto solo encola mensajes
+    _writer_thread = threading.Thread(target=_writer_loop, daemon=True)
+    _writer_thread.start()
+    atexit.register(close_log)
+
+    # Limpiar logs antiguos (más de 7 días) sin retrasar el arranque
+    threading.Thread(
+        target=cleanup_old_logs, name="llauncher-log-cleanup", daemon=True
+    ).start()
 
     return log_filename
 
 
-def log(message, error=False, console_output=True):
+def _format_record(record):
+    """Convierte un mensaje encolado (instante, error, texto) en una línea del log"""
+    created, error, message = record
+    timestamp = datetime.fromtimestamp(created).strftime("%Y-%m-%d %H:%M:%S")
+    return f"{timestamp} - {'ERROR' if error else 'INFO'} - {message}\n"
+
+
+def _writer_loop():
+    """Hilo escritor: escribe los mensajes por lotes y vuelca a disco periódicamente"""
+    last_flush = time.monotonic()
+    dirty = False
+
+    while True:
+        try:
+            records = [_log_queue.get(timeout=LOG_FLUSH_INTERVAL)]
+        except queue.Empty:
+            records = []
+
+        # Recoger todo lo que ya esté en cola para escribirlo de una vez
+        while records and len(records) < LOG_BATCH_SIZE:
+            try:
+                records.append(_log_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        lines = []
+        waiters = []
+        stop = False
+        must_flush = False
+        for record in records:
+            if record is None:
+                stop = True
+            elif isinstance(record, threading.Event):
+                waiters.append(record)  # Petición de flush_log()
+            else:
+                lines.append(_format_record(record))
+                must_flush = must_flush or record[1]  # Los errores se vuelcan ya
+
+        if lines and log_file:
+            try:
+                log_file.write("".join(lines))
+                dirty = True
+            except (OSError, ValueError):
+                pass
+
+        now = time.monotonic()
+        if dirty and (
+            must_flush or waiters or stop or now - last_flush >= LOG_FLUSH_INTERVAL
+        ):
+            try:
+                log_file.flush()
+            except (AttributeError, OSError, ValueError):
+                pass
+            dirty = False
+            last_flush = now
+
+        for waiter in waiters:
+            waiter.set()
+        if stop:
+            return
+
+
+def log(message, error=False, console_output=True, debug=False):
     """Registra un mensaje en el archivo de registro y lo imprime en la consola si console_output es True"""
-    with log_lock:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_message = f"{timestamp} - {'ERROR' if error else 'INFO'} - {message}"
-
-        if log_file:
-            log_file.write(log_message + "\n")
-            log_file.flush()
-
-        # Solo mostrar en la consola si console_output es True
-        if console_output:
+    # Descartar cuanto antes los mensajes por debajo del nivel configurado
+    if error:
+        level = LOG_LEVELS["error"]
+    else:
+        level = LOG_LEVELS["debug"] if debug else LOG_LEVELS["info"]
+    if level < log_level:
+        return
+
+    if _writer_thread is not None:
+        _log_queue.put((time.time(), error, message))
+
+    # Solo mostrar en la consola si console_output es True
+    if console_output:
+        with log_lock:
             # Si es un error, imprimir en stderr
             if error:
                 print(f"\033[91m{message}\033[0m", file=sys.stderr)
@@ -45,9 +136,22 @@ def log(message, error=False, console_output=True):
                 print(message)
 
 
+def flush_log(timeout=2.0):
+    """Espera a que el hilo escritor haya volcado a disco los mensajes pendientes"""
+    if _writer_thread is None or not _writer_thread.is_alive():
+        return
+    done = threading.Event()
+    _log_queue.put(done)
+    done.wait(timeout)
+
+
 def close_log():
-    """Cierra el archivo de log"""
-    global log_file
+    """Vacía la cola de mensajes y cierra el archivo de log"""
+    global log_file, _writer_thread
+    if _writer_thread is not None:
+        _log_queue.put(None)
+        _writer_thread.join(5.0)
+        _writer_thread = None
     if log_file:
         log_file.close()
         log_file = None
@@ -55,6 +159,7 @@ def close_log():
 
 def get_log_content(num_lines=20):
     """Obtiene las últimas líneas del archivo de log"""
+    flush_log()
     try:
         if not log_filename or not log_filename.exists():
             return ["No hay archivo de registro disponible"]
@@ -77,14 +182,19 @@ def cleanup_old_logs(days_to_keep=7):
         cutoff_date = now - timedelta(days=days_to_keep)
 
         # Patrones de archivos de log a limpiar
-        log_patterns = ["ll_*.log", "*.log.gz", "20??-??-??-?.log.gz"]
+        log_patterns = [
+            "ll_*.log",
+            "ll_events_*.jsonl",
+            "*.log.gz",
+            "20??-??-??-?.log.gz",
+        ]
 
         for pattern in log_patterns:
             for log_file in LOGS_DIR.glob(pattern):
                 try:
-                    # Para archivos con formato ll_YYYYMMDD_HHMMSS.log
+                    # Para archivos con formato ll_[events_]YYYYMMDD_HHMMSS.log
                     if log_file.name.startswith("ll_"):
-                        file_date_str = log_file.stem.split("_")[1]
+                        file_date_str = log_file.stem.split("_")[-2]
                         file_date = datetime.strptime(file_date_str, "%Y%m%d")
                     # Para archivos con formato YYYY-MM-DD-N.log.gz
                     elif "-" in log_file.name:
@@ -103,7 +213,10 @@ def cleanup_old_logs(days_to_keep=7):
 
                     if file_date < cutoff_date:
                         log_file.unlink()
-                        log(f"Eliminado log antiguo: {log_file.name}")
+                        log(
+                            f"Eliminado log antiguo: {log_file.name}",
+                            console_output=False,
+                        )
                 except (IndexError, ValueError):
                     # Si el formato del nombre no coincide, ignoramos el archivo
                     continue